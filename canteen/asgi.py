@@ -2,6 +2,7 @@
 ASGI config for canteen project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django as usual; websockets (chat) go through Channels.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +14,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'canteen.settings')
 
-application = get_asgi_application()
+# Initialise Django (app registry) before importing anything that touches models.
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from canteenApp.authentication import CookieJWTAuthMiddleware  # noqa: E402
+from canteenApp.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': OriginValidator(
+        CookieJWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+        settings.CORS_ALLOWED_ORIGINS,
+    ),
+})
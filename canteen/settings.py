@@ -10,12 +10,21 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from dotenv import load_dotenv
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Variables in .env (see .env.example) fill in whatever the real environment
+# does not set. API credentials are read from it lazily by
+# canteenApp/providers.py, which re-reads the file when it changes.
+ENV_FILE = BASE_DIR / '.env'
+load_dotenv(ENV_FILE)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -42,6 +51,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework.authtoken',
+    'rest_framework_simplejwt.token_blacklist',
     'dj_rest_auth',
     'dj_rest_auth.registration',
     'allauth',
@@ -49,6 +59,7 @@ INSTALLED_APPS = [
     'allauth.socialaccount',
     'allauth.socialaccount.providers.google',
     'allauth.socialaccount.providers.github',
+    'channels',
 ]
 
 SITE_ID = 1
@@ -79,6 +90,25 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_SAMESITE': 'none',
 }
 
+# Stateless mode for CookieJWTAuthentication: request.user is built from the
+# token claims and the real User/profile is only loaded (and cached locally
+# for JWT_USER_CACHE_TTL seconds) when a view touches something else.
+JWT_STATELESS_USER = os.environ.get('JWT_STATELESS_USER', '0') == '1'
+JWT_USER_CACHE_TTL = 30
+
+# Verified access tokens kept per process (0 disables the cache). A cached
+# token is re-checked against the shared revocation list (logouts in other
+# processes) at most every JWT_REVOCATION_RECHECK_SECONDS.
+JWT_VERIFIED_TOKEN_CACHE_SIZE = 4096
+JWT_REVOCATION_RECHECK_SECONDS = 5.0
+
+# Refresh token blacklist bloom filter (canteenApp/blacklist.py).
+# Purge expired rows with `manage.py purge_token_blacklist`.
+JWT_BLACKLIST_REBUILD_SECONDS = 600
+JWT_BLACKLIST_SYNC_SECONDS = 5
+JWT_BLACKLIST_SYNC_OVERLAP_SECONDS = 60
+JWT_BLACKLIST_ERROR_RATE = 0.001
+
 
 
 # ✅ ENABLE username again if you want it entered manually
@@ -126,6 +156,41 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request profiling (canteenApp/profiling.py; on by default only with DEBUG,
+# REQUEST_PROFILING=1 in production): per-view query count, DB time,
+# serializer time and response size, exported at /metrics (Prometheus text,
+# METRICS_TOKEN as bearer token; DEBUG only without one). SERVER_TIMING adds
+# a Server-Timing header. QUERY_BUDGETS caps queries per url name; over budget
+# logs a warning, or raises with QUERY_BUDGET_STRICT=1 (set it in CI).
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', '1' if DEBUG else '0') == '1'
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1' if DEBUG else '0') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', '0') == '1'
+QUERY_BUDGETS = {
+    'auth-status': 1,
+    'video-list-create': 7,
+    'video-detail': 7,
+    'video-recommended': 14,  # 10 with interests and skills, +4 if the snapshot reloads
+    # catalog: 0 from the taxonomy snapshot, 4 when it reloads
+    'catalog-fields': 4,
+    'catalog-interests-by-field': 4,
+    'catalog-skills-by-field': 4,
+    'catalog-suggest': 11,  # 0 normally; snapshot reload plus popularity counts
+    'classroom-me': 7,  # 3; 7 on the first visit, which creates the classroom
+    'classroom-item-list': 4,
+    'classroom-continue': 2,
+    'chat-history': 3,
+    'chat-inbox': 2,
+    'my-profile': 3,
+    'update-profile': 4,
+    # cached per user: auth only on a hit, +3 on a miss, +4 if the snapshot reloads
+    'get-my-selection': 8,
+    'profile-bootstrap': 8,
+}
+
+if REQUEST_PROFILING:
+    MIDDLEWARE.insert(0, 'canteenApp.profiling.RequestProfilingMiddleware')
+
 ROOT_URLCONF = 'canteen.urls'
 
 TEMPLATES = [
@@ -145,6 +210,33 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'canteen.wsgi.application'
+ASGI_APPLICATION = 'canteen.asgi.application'
+
+# Serve the I/O-bound endpoints (AI tutor, GitHub login, auth status, video
+# and classroom reads) with the async views in canteenApp/async_views.py.
+# Only worth it under an ASGI server (uvicorn/daphne); under WSGI every async
+# view runs in its own event loop, so leave it off there.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', '0') == '1'
+
+
+# Channel layer for websocket chat fan-out.
+# In-memory by default (single process, dev/tests). Set CHANNEL_REDIS_URL
+# (and `pip install channels_redis`) so every worker shares one layer.
+CHANNEL_REDIS_URL = os.environ.get('CHANNEL_REDIS_URL')
+
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
 
 
 CORS_ALLOW_CREDENTIALS = True
@@ -168,12 +260,115 @@ SECURE_CROSS_ORIGIN_OPENER_POLICY = "same-origin"  # or "same-origin-allow-popup
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgres for production (pip install "psycopg[binary,pool]"):
+# persistent connections checked before reuse, or Django's psycopg pool with
+# DB_POOL=1. DB_REPLICA_HOSTS (comma separated, same credentials) adds
+# replica_N aliases that canteenApp.dbrouters.ReplicaRouter uses for catalog
+# reads. Without DB_ENGINE it's the local SQLite file, in WAL mode so readers
+# don't block the writer, waiting up to 20s for the write lock instead of
+# failing with "database is locked".
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+    postgres = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'canteen'),
+        'USER': os.environ.get('DB_USER', 'canteen'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # the pool hands connections back itself, so it needs CONN_MAX_AGE=0
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
-}
+    if DB_POOL:
+        postgres['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX', '20')),
+            'timeout': 10,
+        }
+    DATABASES = {'default': postgres}
+    replica_hosts = [h.strip() for h in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+    for i, host in enumerate(replica_hosts):
+        DATABASES[f'replica_{i}'] = {
+            **postgres,
+            'HOST': host,
+            'OPTIONS': dict(postgres['OPTIONS']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': 20,
+                # take the write lock at BEGIN instead of failing on upgrade
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': 'PRAGMA journal_mode=WAL;',
+            },
+        }
+    }
+
+DATABASE_ROUTERS = ['canteenApp.dbrouters.ReplicaRouter']
+
+# Cache (canteenApp/cache.py builds cache-aside and versioned namespaces on
+# it). CACHE_BACKEND: locmem (default, per process), file (shared by the
+# workers of one host, CACHE_DIR) or redis (shared by all, CACHE_REDIS_URL;
+# needs `pip install redis`). Invalidation bumps namespace versions in this
+# cache, so multi-worker deployments want file or redis.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        },
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'canteen',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+CACHES['default'].update({'KEY_PREFIX': 'canteen', 'TIMEOUT': 300})
+
+# Opt-in SQLite profile for small deployments (canteenApp/sqlite.py): every
+# connection gets WAL, synchronous=NORMAL, mmap and a busy timeout, and the hot
+# write paths (progress pings, AI history, friend/team actions) go through a
+# single in-process writer thread. `manage.py bench_sqlite_writes` compares it.
+SQLITE_HIGH_CONCURRENCY = os.environ.get('SQLITE_HIGH_CONCURRENCY', '0') == '1'
+SQLITE_BUSY_TIMEOUT_MS = 20000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+# AI tutor limits (canteenApp/ratelimit.py). Each client (user from the access
+# cookie, else IP; behind NUM_PROXIES proxies the X-Forwarded-For entry they
+# added) gets a token bucket of AI_TUTOR_BURST requests refilled at
+# AI_TUTOR_RATE_PER_MINUTE, kept in the cache (shared on Redis, per process
+# otherwise). Each
+# process runs at most AI_TUTOR_CONCURRENCY_PER_PROCESS tutor requests at once
+# (not a global cap: N workers allow N times as many); up to AI_TUTOR_MAX_QUEUE
+# more wait AI_TUTOR_QUEUE_TIMEOUT seconds for a slot in that process.
+# Anything beyond gets 429 with Retry-After.
+AI_TUTOR_RATE_PER_MINUTE = float(os.environ.get('AI_TUTOR_RATE_PER_MINUTE', '6'))
+AI_TUTOR_BURST = int(os.environ.get('AI_TUTOR_BURST', '3'))
+AI_TUTOR_CONCURRENCY_PER_PROCESS = int(os.environ.get('AI_TUTOR_CONCURRENCY_PER_PROCESS', '8'))
+AI_TUTOR_MAX_QUEUE = int(os.environ.get('AI_TUTOR_MAX_QUEUE', '16'))
+AI_TUTOR_QUEUE_TIMEOUT = float(os.environ.get('AI_TUTOR_QUEUE_TIMEOUT', '10'))
+NUM_PROXIES = int(os.environ.get('NUM_PROXIES', '0'))
 
 AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend',          # default
@@ -223,6 +418,36 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'    # for collectstatic (e.g., for product
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'  # where uploaded files will be saved
 
+# collectstatic writes content-hashed names plus .gz (and .br with the optional
+# `brotli` package) copies (canteenApp/staticstorage.py). With SERVE_FILES,
+# Django serves STATIC_ROOT and MEDIA_ROOT itself (canteenApp/fileserving.py):
+# ETag/Last-Modified, byte ranges, precompressed static, and a year of
+# immutable caching for hashed static names and MEDIA_IMMUTABLE_PATTERNS.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'canteenApp.staticstorage.CompressedManifestStaticFilesStorage'},
+}
+SERVE_FILES = os.environ.get('SERVE_FILES', '1' if DEBUG else '0') == '1'
+MEDIA_IMMUTABLE_PATTERNS = [
+    r'^profile_photos/[^/]+/[0-9a-f]{20}\.\w+$',  # canteenApp/images.py
+]
+
+# Chunked chat attachments (see canteenApp/chatuploadviews.py)
+CHAT_UPLOAD_MAX_BYTES = 50 * 1024 * 1024          # per file
+CHAT_UPLOAD_CHUNK_MAX_BYTES = 5 * 1024 * 1024     # per PUT
+CHAT_UPLOAD_USER_QUOTA_BYTES = 500 * 1024 * 1024  # all uploads of one user
+
+# Profile photos are validated in the request and processed by the background
+# pool (canteenApp/background.py; 0 workers runs jobs inline): canteenApp/images.py
+# strips metadata, downsizes to PROFILE_PHOTO_MAX_DIMENSION and writes square
+# PROFILE_PHOTO_SIZES thumbnails, each as JPEG/PNG and WebP, under
+# content-hashed (immutable) names.
+PROFILE_PHOTO_MAX_BYTES = 5 * 1024 * 1024
+PROFILE_PHOTO_MAX_DIMENSION = 1024
+PROFILE_PHOTO_SIZES = {'thumb': 64, 'small': 160, 'medium': 320}
+PROFILE_PHOTO_QUALITY = 82
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', '2'))
+
 
 
 # Default primary key field type
@@ -3,6 +3,7 @@ from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from dj_rest_auth.registration.views import SocialLoginView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from .tokenserializer import CustomTokenSerializer
 from rest_framework.response import Response
 from datetime import datetime
 
@@ -18,7 +19,7 @@ class GoogleCookieLogin(SocialLoginView):
         print("google login view hit!")
 
         user = self.user
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenSerializer.get_token(user)
         access = refresh.access_token
 
         max_age = int(access["exp"] - datetime.utcnow().timestamp())
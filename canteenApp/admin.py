@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.utils.html import format_html
+from .images import photo_url
 from .models import *
 
 
@@ -34,7 +36,8 @@ class UserProfileAdmin(admin.ModelAdmin):
 
     def photo_preview(self, obj):
         if obj.photo:
-            return f'<img src="{obj.photo.url}" style="max-height:100px; border-radius:5px;" />'
+            url = photo_url(obj.photo.name, obj.photo_variants, "medium")
+            return format_html('<img src="{}" style="max-height:100px; border-radius:5px;" />', url)
         return "(No Image)"
 
     photo_preview.allow_tags = True
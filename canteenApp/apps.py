@@ -7,6 +7,7 @@ class CanteenappConfig(AppConfig):
     
     def ready(self):
         import canteenApp.signals
+        import canteenApp.sqlite  # connection_created pragmas
 
 
 
@@ -0,0 +1,177 @@
+# Async versions of the I/O-bound read endpoints (wired in urls.py when
+# settings.ASYNC_VIEWS is on). GET runs on the event loop with the async ORM;
+# every other method is handed to the regular DRF view in a thread, so writes
+# keep their serializers, permissions and error handling unchanged.
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+
+from .auth_views import AuthStatusView, status_payload
+from .authentication import USER_CLAIMS, CookieJWTAuthentication, acached_photo_url
+from .cache import CATALOG_NAMESPACE, acache_aside
+from .classroomserializer import (
+    ClassroomContinueSerializer,
+    ClassroomItemSerializer,
+    ClassroomSerializer,
+)
+from .classroomviews import (
+    ClassroomContinueView,
+    ClassroomItemListView,
+    ClassroomMeView,
+    classroom_with_items,
+    continue_watching,
+    parse_limit,
+)
+from .models import Classroom, ClassroomItem, CourseVideo
+from .taxonomy import snapshot
+from .youtubevideoserializer import CourseVideoSerializer
+from .youtubevideoviews import (
+    VIDEO_PREFETCH,
+    CourseVideoDetailView,
+    CourseVideoListCreateView,
+    filter_videos,
+    video_detail_key,
+    video_list_key,
+)
+
+User = get_user_model()
+
+NOT_AUTHENTICATED = "Authentication credentials were not provided."
+
+
+def request_data(request):
+    """request.data for plain async views: JSON body or form fields."""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def unauthorized(request, detail):
+    response = JsonResponse({"detail": str(detail)}, status=401)
+    response["WWW-Authenticate"] = CookieJWTAuthentication().authenticate_header(request)
+    return response
+
+
+def async_read_view(fallback, login_required=True):
+    """
+    Serve GET/HEAD with the decorated coroutine, called as
+    handler(request, user, *args, **kwargs); other methods go to `fallback`
+    (the sync view) via sync_to_async. Authentication mirrors
+    CookieJWTAuthentication: a bad cookie is a 401 even on public views.
+    """
+    def decorator(handler):
+        @csrf_exempt
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await sync_to_async(fallback)(request, *args, **kwargs)
+            try:
+                auth = await CookieJWTAuthentication().aauthenticate(request)
+            except AuthenticationFailed as exc:
+                return unauthorized(request, exc.detail)
+            user = auth[0] if auth else None
+            if login_required and user is None:
+                return unauthorized(request, NOT_AUTHENTICATED)
+            return await handler(request, user, *args, **kwargs)
+        return view
+    return decorator
+
+
+@csrf_exempt
+async def auth_status(request):
+    """GET /auth/status/ (see AuthStatusView)."""
+    if request.method not in ("GET", "HEAD"):
+        return await sync_to_async(AuthStatusView.as_view())(request)
+
+    try:
+        token = await CookieJWTAuthentication().aget_validated_token(request.COOKIES.get('access_token'))
+        user_id = token['user_id']
+
+        if all(claim in token for claim in USER_CLAIMS):
+            info = {claim: token[claim] for claim in USER_CLAIMS}
+        else:
+            user = await User.objects.aget(id=user_id)
+            info = {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+        return JsonResponse(status_payload(token, info, await acached_photo_url(user_id)))
+    except Exception:
+        return JsonResponse({'authenticated': False}, status=401)
+
+
+# --- videos ---
+
+
+@async_read_view(CourseVideoListCreateView.as_view(), login_required=False)
+async def video_list(request, user):
+    """GET /api/videos/ (filters as CourseVideoListCreateView)."""
+    async def load():
+        qs = filter_videos(
+            CourseVideo.objects.filter(is_published=True).prefetch_related(*VIDEO_PREFETCH),
+            request.GET,
+            await sync_to_async(snapshot)(),
+        )
+        videos = [video async for video in qs]
+        return CourseVideoSerializer(videos, many=True, context={"request": request}).data
+
+    data = await acache_aside(CATALOG_NAMESPACE, video_list_key(request.GET), load)
+    return JsonResponse(data, safe=False)
+
+
+@async_read_view(CourseVideoDetailView.as_view(), login_required=False)
+async def video_detail(request, user, slug):
+    """GET /api/videos/<slug>/"""
+    async def load():
+        try:
+            video = await CourseVideo.objects.prefetch_related(*VIDEO_PREFETCH).aget(slug=slug)
+        except CourseVideo.DoesNotExist:
+            return None
+        return CourseVideoSerializer(video, context={"request": request}).data
+
+    data = await acache_aside(CATALOG_NAMESPACE, video_detail_key(slug), load)
+    if data is None:
+        return JsonResponse({"detail": "No CourseVideo matches the given query."}, status=404)
+    return JsonResponse(data)
+
+
+# --- classroom ---
+
+
+@async_read_view(ClassroomMeView.as_view())
+async def classroom_me(request, user):
+    """GET /api/classroom/ (auto-creates it, like ClassroomMeView)."""
+    cls = await classroom_with_items().filter(user_id=user.pk).afirst()
+    if cls is None:
+        created, _ = await Classroom.objects.aget_or_create(
+            user_id=user.pk, defaults={"name": "My AI Classroom"}
+        )
+        cls = await classroom_with_items().aget(pk=created.pk)
+    return JsonResponse(ClassroomSerializer(cls).data)
+
+
+@async_read_view(ClassroomItemListView.as_view())
+async def classroom_items(request, user):
+    """GET /api/classroom/items/list/"""
+    items = [
+        item async for item in
+        ClassroomItem.objects.filter(classroom__user_id=user.pk).select_related("video")
+    ]
+    return JsonResponse(ClassroomItemSerializer(items, many=True).data, safe=False)
+
+
+@async_read_view(ClassroomContinueView.as_view())
+async def classroom_continue(request, user):
+    """GET /api/classroom/continue/?limit=10"""
+    limit = parse_limit(
+        request.GET.get("limit"), ClassroomContinueView.default_limit, ClassroomContinueView.max_limit
+    )
+    items = [item async for item in continue_watching(user.pk, limit)]
+    return JsonResponse(ClassroomContinueSerializer(items, many=True).data, safe=False)
@@ -5,12 +5,22 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from dj_rest_auth.views import LogoutView
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
+from .tokenserializer import CustomTokenSerializer, set_user_claims
 from django.conf import settings
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from datetime import datetime
+from functools import lru_cache
 import json
 import base64
+from .authentication import (
+    USER_CLAIMS,
+    CookieJWTAuthentication,
+    cached_photo_url,
+    revoke_access_token,
+)
+from .blacklist import CheckedRefreshToken, token_blacklist
 
 User = get_user_model()
 
@@ -20,7 +30,7 @@ class CookieLoginView(LoginView):
         response = super().get_response()
 
         # Create refresh + access tokens
-        refresh = RefreshToken.for_user(self.user)
+        refresh = CustomTokenSerializer.get_token(self.user)
         access = refresh.access_token
 
         # Set HttpOnly cookies
@@ -53,6 +63,16 @@ class CookieLogoutView(APIView):
     def post(self, request):
         response = Response({"message": "Logged out"})
 
+        if request.auth is not None:
+            revoke_access_token(request.auth)
+
+        refresh_token = request.COOKIES.get('refresh_token')
+        if refresh_token:
+            try:
+                token_blacklist.blacklist(CheckedRefreshToken(refresh_token))
+            except TokenError:
+                pass  # already invalid
+
         # Only use key and path here (extra args not allowed!)
         response.delete_cookie(
             'access_token',
@@ -74,39 +94,59 @@ class CookieLogoutView(APIView):
         return response
     
 
+@lru_cache(maxsize=4096)
+def encode_public_status(username, is_staff, is_superuser):
+    public_data = {
+        "is_authenticated": True,
+        "is_staff": is_staff,
+        "is_superuser": is_superuser,
+        "username": username,
+    }
+    public_data_json = json.dumps(public_data, separators=(',', ':'))
+    return base64.b64encode(public_data_json.encode()).decode()
+
+
+def status_payload(token, info, photo):
+    """Body of /auth/status/ (shared with async_views.auth_status)."""
+    return {
+        "authenticated": True,
+        "userId": token['user_id'],
+        "username": info["username"],
+        "is_staff": info["is_staff"],
+        "is_superuser": info["is_superuser"],
+        "email": info["email"],
+        "photo": photo,
+        "exp": token["exp"],
+        "user_status_encoded": encode_public_status(
+            info["username"], info["is_staff"], info["is_superuser"]
+        ),
+    }
+
+
 class AuthStatusView(APIView):
+    """
+    GET /auth/status/
+    Built from the access token claims (see CustomTokenSerializer) plus a
+    cached photo URL: no queries for tokens issued with claims. Older tokens
+    without claims fall back to loading the user.
+    """
     permission_classes = []
+    authentication_classes = []  # reads the cookie itself; skip the user lookup
 
     def get(self, request):
         access_token = request.COOKIES.get('access_token')
 
         try:
-            token = AccessToken(access_token)
+            token = CookieJWTAuthentication().get_validated_token(access_token)
             user_id = token['user_id']
-            user = User.objects.get(id=user_id)
-
-             # Set public cookie data
-            public_data = {
-                "is_authenticated": True,
-                "is_staff": user.is_staff,
-                "is_superuser": user.is_superuser,
-                "username": user.username,
-            }
-            
-            public_data_json = json.dumps(public_data, separators=(',', ':'))
-            public_data_base64 = base64.b64encode(public_data_json.encode()).decode()
-            
-            response = Response({
-                "authenticated": True,
-                "userId": user.id,
-                "username": user.username,
-                "is_staff": user.is_staff,
-                "is_superuser": user.is_superuser,
-                "email": user.email,
-                "photo": user.profile.photo.url if user.profile.photo else None,
-                "exp": token["exp"],
-                "user_status_encoded": public_data_base64,
-            })
+
+            if all(claim in token for claim in USER_CLAIMS):
+                info = {claim: token[claim] for claim in USER_CLAIMS}
+            else:
+                user = User.objects.get(id=user_id)
+                info = {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+            response = Response(status_payload(token, info, cached_photo_url(user_id)))
             
             return response
 
@@ -118,6 +158,7 @@ class AuthStatusView(APIView):
 
 class RefreshTokenView(APIView):
     permission_classes = []
+    authentication_classes = []
 
     def post(self, request):
         refresh_token = request.COOKIES.get('refresh_token')
@@ -125,9 +166,15 @@ class RefreshTokenView(APIView):
             return Response({'detail': 'Refresh token missing'}, status=401)
 
         try:
-            refresh = RefreshToken(refresh_token)
+            # blacklist check goes through the bloom filter, not a query
+            refresh = CheckedRefreshToken(refresh_token)
             user_id = refresh['user_id']
-            user = User.objects.get(id=user_id)
+            user = User.objects.filter(id=user_id, is_active=True).only(*USER_CLAIMS).first()
+            if user is None:
+                return Response({'detail': 'Invalid refresh token'}, status=401)
+            # the claims may have changed since login (renamed, staff revoked):
+            # re-read them so neither new token carries stale ones
+            set_user_claims(refresh, user)
             access_token = str(refresh.access_token)
 
             response = Response({'message': 'Token refreshed'})
@@ -140,6 +187,23 @@ class RefreshTokenView(APIView):
                 path='/',
                 max_age=60 * 15
             )
+
+            if jwt_settings.ROTATE_REFRESH_TOKENS:
+                if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                    token_blacklist.blacklist(refresh)
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
+                refresh.outstand()
+                response.set_cookie(
+                    key='refresh_token',
+                    value=str(refresh),
+                    httponly=True,
+                    secure=True,
+                    samesite='None',
+                    path='/',
+                    max_age=86400
+                )
             return response
 
         except TokenError:
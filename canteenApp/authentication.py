@@ -1,6 +1,267 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http.cookie import parse_cookie
+from django.utils.functional import SimpleLazyObject
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework.exceptions import AuthenticationFailed
 
+from .cache import acache_aside, cache_aside, cache_delete
+from .images import photo_url
+from .models import UserProfile
+
+User = get_user_model()
+
+# Claims copied onto the token-backed user (see tokenserializer.CustomTokenSerializer)
+USER_CLAIMS = ("username", "email", "is_staff", "is_superuser")
+
+_user_cache = {}  # user_id -> (expires_at, user with profile preloaded)
+_user_cache_lock = threading.Lock()
+
+
+def forget_user(user_id):
+    """Drop a user from this process' cache (called on User/UserProfile saves)."""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+PHOTO_URL_NAMESPACE = "auth-photo"
+PHOTO_URL_TTL = 60 * 60
+
+
+def cached_photo_url(user_id):
+    """Profile photo URL (or None) for the auth status payload, cached."""
+    def load():
+        row = UserProfile.objects.filter(user_id=user_id).values_list("photo", "photo_variants").first()
+        return photo_url(*row, "thumb") if row else None
+
+    return cache_aside(PHOTO_URL_NAMESPACE, user_id, load, PHOTO_URL_TTL)
+
+
+async def acached_photo_url(user_id):
+    """Async twin of cached_photo_url, for the async views."""
+    async def load():
+        row = await UserProfile.objects.filter(user_id=user_id).values_list("photo", "photo_variants").afirst()
+        return photo_url(*row, "thumb") if row else None
+
+    return await acache_aside(PHOTO_URL_NAMESPACE, user_id, load, PHOTO_URL_TTL)
+
+
+def forget_photo_url(user_id):
+    cache_delete(PHOTO_URL_NAMESPACE, user_id)
+
+
+def _detached_copy(user):
+    # Hand every request its own instances so one view mutating
+    # request.user / request.user.profile can't leak into another.
+    clone = copy.copy(user)
+    profile = user._state.fields_cache.get("profile")
+    if profile is not None:
+        profile = copy.copy(profile)
+        profile._state.fields_cache["user"] = clone
+        clone._state.fields_cache["profile"] = profile
+    return clone
+
+
+def _cached_user(user_id):
+    hit = _user_cache.get(user_id)
+    if hit is not None and hit[0] > time.monotonic():
+        return _detached_copy(hit[1])
+    return None
+
+
+def _remember_user(user_id, user):
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed("User is inactive.")
+    ttl = getattr(settings, "JWT_USER_CACHE_TTL", 30)
+    if ttl > 0:
+        with _user_cache_lock:
+            _user_cache[user_id] = (time.monotonic() + ttl, user)
+    return _detached_copy(user)
+
+
+def load_user(user_id):
+    """Full User (with profile) for `user_id`, through a short-TTL local cache."""
+    user = _cached_user(user_id)
+    if user is not None:
+        return user
+    try:
+        user = User.objects.select_related("profile").get(pk=user_id)
+    except User.DoesNotExist:
+        raise AuthenticationFailed("User not found.")
+    return _remember_user(user_id, user)
+
+
+async def aload_user(user_id):
+    """load_user for async code: same cache, async ORM on a miss."""
+    user = _cached_user(user_id)
+    if user is not None:
+        return user
+    try:
+        user = await User.objects.select_related("profile").aget(pk=user_id)
+    except User.DoesNotExist:
+        raise AuthenticationFailed("User not found.")
+    return _remember_user(user_id, user)
+
+
+class TokenBackedUser(SimpleLazyObject):
+    """
+    request.user built from the access token alone. id/pk, username, email,
+    is_staff and is_superuser come from the signed claims; anything else
+    (profile, relations, passing it to the ORM...) loads the real User once.
+    """
+
+    def __init__(self, validated_token):
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        super().__init__(lambda: load_user(user_id))
+        claims = {"id": user_id, "pk": user_id, "is_authenticated": True, "is_anonymous": False}
+        for claim in USER_CLAIMS:
+            if claim in validated_token:
+                claims[claim] = validated_token[claim]
+        # bypass LazyObject.__setattr__, which would load the wrapped user
+        self.__dict__.update(claims)
+
+    def __bool__(self):
+        # LazyObject forwards bool() to the wrapped user, and IsAuthenticated
+        # calls it on every request
+        return True
+
+
+def revoked_cache_key(jti):
+    return f"jwt:revoked:{jti}"
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already verified access tokens, keyed by a hash of the raw
+    token and kept until the token's own `exp`, so a token is parsed and
+    HMAC-checked once per process instead of on every request.
+
+    Revoked jtis (logout) are remembered locally and in the cache backend.
+    A hit checks the local set every time and the shared backend at most
+    every `recheck` seconds per token, so a logout in another process takes
+    effect here within that delay; a revoked token is evicted and refused.
+    """
+
+    def __init__(self, maxsize, recheck=5.0):
+        self.maxsize = maxsize
+        self.recheck = recheck
+        self.entries = OrderedDict()  # digest -> [exp, jti, token, checked_at]
+        self.revoked = {}  # jti -> exp
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def digest(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def _lookup(self, raw_token):
+        """(key, entry) of a live, locally unrevoked hit; (None, None) otherwise."""
+        if self.maxsize <= 0:
+            return None, None
+        key = self.digest(raw_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, None
+            exp, jti, token, checked_at = entry
+            if exp <= time.time() or jti in self.revoked:
+                del self.entries[key]
+                return None, None
+            self.entries.move_to_end(key)
+            return key, entry
+
+    def _rechecked(self, key, entry, revoked):
+        with self.lock:
+            if revoked:
+                self.entries.pop(key, None)
+                return None
+            entry[3] = time.monotonic()
+            return entry[2]
+
+    def get(self, raw_token):
+        key, entry = self._lookup(raw_token)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[3] < self.recheck:
+            return entry[2]
+        return self._rechecked(key, entry, self.is_revoked(entry[1]))
+
+    async def aget(self, raw_token):
+        """get() with the shared revocation check on the async cache API."""
+        key, entry = self._lookup(raw_token)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[3] < self.recheck:
+            return entry[2]
+        return self._rechecked(key, entry, await self.ais_revoked(entry[1]))
+
+    def put(self, raw_token, token):
+        if self.maxsize <= 0:
+            return
+        key = self.digest(raw_token)
+        with self.lock:
+            # put right after the full verification, which checked revocation
+            self.entries[key] = [token.get("exp", 0), token.get(jwt_settings.JTI_CLAIM), token, time.monotonic()]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        if jti in self.revoked:
+            return True
+        return bool(cache.get(revoked_cache_key(jti)))
+
+    async def ais_revoked(self, jti):
+        if not jti:
+            return False
+        if jti in self.revoked:
+            return True
+        return bool(await cache.aget(revoked_cache_key(jti)))
+
+    def revoke(self, token):
+        jti = token.get(jwt_settings.JTI_CLAIM)
+        if not jti:
+            return
+        exp = token.get("exp", 0)
+        now = time.time()
+        cache.set(revoked_cache_key(jti), 1, max(1, int(exp - now)))
+        with self.lock:
+            self.revoked = {j: e for j, e in self.revoked.items() if e > now}
+            self.revoked[jti] = exp
+            for key in [k for k, entry in self.entries.items() if entry[1] == jti]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(
+    getattr(settings, "JWT_VERIFIED_TOKEN_CACHE_SIZE", 4096),
+    getattr(settings, "JWT_REVOCATION_RECHECK_SECONDS", 5.0),
+)
+
+
+def revoke_access_token(token):
+    """Stop accepting `token` (a validated access token) before it expires."""
+    verified_tokens.revoke(token)
+
+
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
         raw_token = request.COOKIES.get('access_token')
@@ -13,3 +274,92 @@ class CookieJWTAuthentication(JWTAuthentication):
             return self.get_user(validated_token), validated_token
         except Exception:
             raise AuthenticationFailed("Invalid or expired token.")
+
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is not None:
+            return token
+        token = super().get_validated_token(raw_token)
+        if verified_tokens.is_revoked(token.get(jwt_settings.JTI_CLAIM)):
+            raise InvalidToken("Token has been revoked.")
+        verified_tokens.put(raw_token, token)
+        return token
+
+    async def aget_validated_token(self, raw_token):
+        """get_validated_token() with the revocation lookups on the async cache API."""
+        token = await verified_tokens.aget(raw_token)
+        if token is not None:
+            return token
+        token = super().get_validated_token(raw_token)
+        if await verified_tokens.ais_revoked(token.get(jwt_settings.JTI_CLAIM)):
+            raise InvalidToken("Token has been revoked.")
+        verified_tokens.put(raw_token, token)
+        return token
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views: the token check is CPU only (and
+        usually an LRU hit), the revocation lookup goes through the async
+        cache API and the user comes from the async ORM, never a thread.
+        """
+        raw_token = request.COOKIES.get('access_token')
+
+        if raw_token is None:
+            return None
+
+        try:
+            validated_token = await self.aget_validated_token(raw_token)
+            return await self.aget_user(validated_token), validated_token
+        except Exception:
+            raise AuthenticationFailed("Invalid or expired token.")
+
+    async def aget_user(self, validated_token):
+        """
+        get_user() for async views. Stateless mode accepts aload_user's
+        short-lived cache; otherwise the user is read on every request, so a
+        deactivated or deleted user is refused at once.
+        """
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        if getattr(settings, "JWT_STATELESS_USER", False):
+            return await aload_user(user_id)
+        try:
+            user = await User.objects.select_related("profile").aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found.")
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive.")
+        return user
+
+    def get_user(self, validated_token):
+        if getattr(settings, "JWT_STATELESS_USER", False):
+            if jwt_settings.USER_ID_CLAIM not in validated_token:
+                raise AuthenticationFailed("Token contained no recognizable user identification")
+            return TokenBackedUser(validated_token)
+        return super().get_user(validated_token)
+
+
+@database_sync_to_async
+def get_cookie_user(raw_token):
+    if not raw_token:
+        return AnonymousUser()
+    auth = CookieJWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except Exception:
+        return AnonymousUser()
+
+
+class CookieJWTAuthMiddleware(BaseMiddleware):
+    """
+    Channels middleware: sets scope["user"] from the same access_token cookie
+    the REST API uses, so websockets need no separate login.
+    """
+
+    async def __call__(self, scope, receive, send):
+        cookies = {}
+        for name, value in scope.get("headers", []):
+            if name == b"cookie":
+                cookies = parse_cookie(value.decode("latin1"))
+                break
+        scope = dict(scope, user=await get_cookie_user(cookies.get("access_token")))
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,54 @@
+# Small in-process background pool for work that should not hold up the
+# response (saving uploaded photos, ...). Jobs run on daemon threads with
+# their own DB connections; with BACKGROUND_WORKERS = 0 they run inline.
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+                thread_name_prefix="background",
+            )
+        return _executor
+
+
+def _run(fn, args, kwargs):
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("background job %s failed", getattr(fn, "__qualname__", fn))
+        raise
+    finally:
+        close_old_connections()
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the pool; returns its Future."""
+    if getattr(settings, "BACKGROUND_WORKERS", 2) <= 0:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            logger.exception("background job %s failed", getattr(fn, "__qualname__", fn))
+            future.set_exception(exc)
+        return future
+    return executor().submit(_run, fn, args, kwargs)
+
+
+def submit_on_commit(fn, *args, **kwargs):
+    """submit() once the current transaction commits (right away outside one)."""
+    transaction.on_commit(lambda: submit(fn, *args, **kwargs))
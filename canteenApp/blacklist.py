@@ -0,0 +1,149 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+VERSION_KEY = "jwt:blacklist:version"
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (double hashing on blake2b)."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.size = int(-capacity * math.log(error_rate) / (math.log(2) ** 2)) + 1
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+def bump_version():
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:  # evicted between add and incr
+        cache.set(VERSION_KEY, 1, None)
+
+
+class TokenBlacklist:
+    """
+    simplejwt's BlacklistedToken table behind a process-local bloom filter.
+
+    A miss in the filter means "not blacklisted" with no query; a hit is
+    confirmed against the table (false positives cost one query). The filter
+    is rebuilt from unexpired entries every JWT_BLACKLIST_REBUILD_SECONDS and
+    picks up entries added by other processes whenever the shared version
+    key moves or at least every JWT_BLACKLIST_SYNC_SECONDS. Ids are not
+    committed in order, so each sync also re-reads everything blacklisted
+    within JWT_BLACKLIST_SYNC_OVERLAP_SECONDS of the previous one.
+    """
+
+    def __init__(self):
+        self.filter = None
+        self.version = None
+        self.last_id = 0
+        self.built_at = 0.0
+        self.synced_at = 0.0
+        self.synced_since = None
+        self.lock = threading.Lock()
+
+    def _mark_synced(self, started):
+        overlap = getattr(settings, "JWT_BLACKLIST_SYNC_OVERLAP_SECONDS", 60)
+        self.synced_since = started - timedelta(seconds=overlap)
+        self.synced_at = time.monotonic()
+
+    def _rebuild(self, version):
+        started = timezone.now()
+        rows = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=started)
+            .values_list("id", "token__jti")
+        )
+        bloom = BloomFilter(
+            max(len(rows) * 2, 1024), getattr(settings, "JWT_BLACKLIST_ERROR_RATE", 0.001)
+        )
+        for _, jti in rows:
+            bloom.add(jti)
+        self.last_id = max((row_id for row_id, _ in rows), default=self.last_id)
+        self.filter, self.version = bloom, version
+        self._mark_synced(started)
+        self.built_at = self.synced_at
+
+    def _sync(self, version):
+        started = timezone.now()
+        rows = BlacklistedToken.objects.filter(
+            Q(id__gt=self.last_id) | Q(blacklisted_at__gte=self.synced_since)
+        ).values_list("id", "token__jti")
+        for row_id, jti in rows:
+            self.filter.add(jti)
+            self.last_id = max(self.last_id, row_id)
+        self.version = version
+        self._mark_synced(started)
+
+    def current_filter(self):
+        version = cache.get(VERSION_KEY, 0)
+        now = time.monotonic()
+        rebuild_after = getattr(settings, "JWT_BLACKLIST_REBUILD_SECONDS", 600)
+        sync_after = getattr(settings, "JWT_BLACKLIST_SYNC_SECONDS", 5)
+        if self.filter is None or now - self.built_at > rebuild_after:
+            with self.lock:
+                if self.filter is None or now - self.built_at > rebuild_after:
+                    self._rebuild(version)
+        elif version != self.version or now - self.synced_at > sync_after:
+            with self.lock:
+                self._sync(version)
+        return self.filter
+
+    def is_blacklisted(self, jti):
+        if jti not in self.current_filter():
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def blacklist(self, token):
+        """Blacklist a RefreshToken and tell the other processes about it."""
+        entry, _ = token.blacklist()
+        jti = token.payload[jwt_settings.JTI_CLAIM]
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+        bump_version()
+        return entry
+
+    def reset(self):
+        """Force a full rebuild on next use (after purges)."""
+        with self.lock:
+            self.filter = None
+            self.last_id = 0
+
+
+token_blacklist = TokenBlacklist()
+
+
+class CheckedRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check goes through the bloom filter."""
+
+    def check_blacklist(self):
+        if token_blacklist.is_blacklisted(self.payload[jwt_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
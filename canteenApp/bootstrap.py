@@ -0,0 +1,89 @@
+# Per-user profile state (profile, selected field, interests, skills) cached
+# for the profile bootstrap and my-selection endpoints. Only ids and levels
+# are cached; names and the field catalog come from the taxonomy snapshot, so
+# taxonomy edits never leave a user's cached entry stale.
+from django.db import transaction
+
+from .cache import cache_aside, cache_delete
+from .models import UserInterest, UserProfile, UserSkill
+from .serializers import UserProfileSerializer
+from .taxonomy import snapshot
+
+PROFILE_NAMESPACE = "profile"
+PROFILE_TTL = 10 * 60
+
+
+def state_key(user_id):
+    return f"state:{user_id}"
+
+
+def load_state(user_id):
+    """Three queries: profile, interest ids, skill ids with levels."""
+    profile, _ = UserProfile.objects.select_related("user").get_or_create(user_id=user_id)
+    return {
+        "profile": UserProfileSerializer(profile).data,
+        "field_id": profile.selected_field_id,
+        "interest_ids": list(
+            UserInterest.objects.filter(user_id=user_id).values_list("interest_id", flat=True)
+        ),
+        "skills": list(
+            UserSkill.objects.filter(user_id=user_id).values_list("skill_id", "level")
+        ),
+    }
+
+
+def user_state(user):
+    # by id only, so a token-backed request.user is never loaded
+    return cache_aside(
+        PROFILE_NAMESPACE, state_key(user.pk), lambda: load_state(user.pk), PROFILE_TTL
+    )
+
+
+def forget_state(user_id):
+    """Drop the cached state once the current transaction (if any) commits."""
+    transaction.on_commit(lambda: cache_delete(PROFILE_NAMESPACE, state_key(user_id)))
+
+
+def selection_payload(state, snap):
+    """UserSelectionReadSerializer's output, built from the snapshot."""
+    field_id = state["field_id"]
+    interests = sorted(
+        (snap.interests[pk] for pk in state["interest_ids"] if pk in snap.interests),
+        key=lambda t: t.name,
+    )
+    skills = sorted(
+        ((snap.skills[pk], level) for pk, level in state["skills"] if pk in snap.skills),
+        key=lambda item: item[0].name,
+    )
+    return {
+        "field": snap.field_data(field_id) if field_id in snap.fields else None,
+        "interests": [
+            {"id": t.id, "name": t.name, "field": snap.field_data(t.field_id)} for t in interests
+        ],
+        "skills": [
+            {
+                "skill": {"id": t.id, "name": t.name, "field": snap.field_data(t.field_id)},
+                "level": level,
+            }
+            for t, level in skills
+        ],
+    }
+
+
+def selection(user):
+    return selection_payload(user_state(user), snapshot())
+
+
+def bootstrap(user):
+    """Profile, selection and the selected field's catalog in one payload."""
+    state = user_state(user)
+    snap = snapshot()
+    field_id = state["field_id"]
+    return {
+        "profile": state["profile"],
+        "selection": selection_payload(state, snap),
+        "catalog": {
+            "interests": snap.interest_payload.get(field_id, []),
+            "skills": snap.skill_payload.get(field_id, []),
+        },
+    }
@@ -0,0 +1,242 @@
+# Cache-aside helpers on top of django.core.cache (see CACHES in settings).
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, TypeVar
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+T = TypeVar("T")
+
+# Namespaces shared across modules; signals.py bumps them when their models change.
+CATALOG_NAMESPACE = "catalog"  # videos as served by the video endpoints
+TAXONOMY_NAMESPACE = "taxonomy"  # fields, interests, skills
+
+DEFAULT_TIMEOUT = 300
+LOCK_TIMEOUT = 10  # seconds a loader may hold a key's lock
+WAIT_STEP = 0.05
+
+# --- instrumentation ---
+
+_stats = defaultdict(lambda: defaultdict(float))  # namespace -> event -> count
+_stats_lock = threading.Lock()
+
+
+def record(namespace, event, amount=1):
+    with _stats_lock:
+        _stats[namespace][event] += amount
+
+
+def cache_stats():
+    """
+    {namespace: {event: count}}. Events: hit, miss, early_refresh, stale_hit
+    (served the old value while another worker refreshed), wait (waited on
+    another worker's load), load, load_seconds, invalidate.
+    """
+    with _stats_lock:
+        return {ns: dict(events) for ns, events in _stats.items()}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# --- versioned namespaces ---
+
+
+def version_key(namespace):
+    return f"ns:{namespace}:version"
+
+
+def namespace_version(namespace):
+    version = cache.get(version_key(namespace))
+    if version is None:
+        cache.add(version_key(namespace), 1, None)
+        version = cache.get(version_key(namespace), 1)
+    return version
+
+
+async def _anamespace_version(namespace):
+    version = await cache.aget(version_key(namespace))
+    if version is None:
+        await cache.aadd(version_key(namespace), 1, None)
+        version = await cache.aget(version_key(namespace), 1)
+    return version
+
+
+def bump_namespace(namespace):
+    """Invalidate every key of `namespace` at once (old keys just age out)."""
+    record(namespace, "invalidate")
+    try:
+        cache.incr(version_key(namespace))
+    except ValueError:
+        cache.add(version_key(namespace), 2, None)
+
+
+def namespaced_key(namespace, key, version=None):
+    if version is None:
+        version = namespace_version(namespace)
+    return f"{namespace}:v{version}:{key}"
+
+
+def cache_delete(namespace, key):
+    cache.delete(namespaced_key(namespace, key))
+
+
+def params_key(params, names):
+    """Stable short key for the query parameters `names` of a request."""
+    raw = "&".join(f"{name}={params.get(name, '')}" for name in sorted(names))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def invalidate_on(namespace, *models):
+    """
+    Bump `namespace` whenever any of `models` (or their M2M links) change,
+    once the change is committed, so no reader can reload the old rows
+    under the new version.
+    """
+    def bump(sender, **kwargs):
+        if kwargs.get("action", "post_").startswith("post_"):
+            transaction.on_commit(lambda: bump_namespace(namespace), using=kwargs.get("using"))
+
+    for model in models:
+        uid = f"cache-ns:{namespace}:{model._meta.label_lower}"
+        post_save.connect(bump, sender=model, weak=False, dispatch_uid=uid + ":save")
+        post_delete.connect(bump, sender=model, weak=False, dispatch_uid=uid + ":delete")
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(
+                bump, sender=field.remote_field.through, weak=False,
+                dispatch_uid=f"{uid}:{field.name}:m2m",
+            )
+
+
+# --- cache-aside ---
+
+
+def _fresh(entry, beta):
+    # XFetch (probabilistic early expiration): the closer to expiry and the
+    # slower the load, the likelier one reader refreshes early, so a hot key
+    # is rebuilt before it expires instead of by everyone at once after.
+    _, delta, expires_at = entry
+    return time.time() - delta * beta * math.log(random.random() or 1e-12) < expires_at
+
+
+def _entry(value, delta, timeout):
+    return value, delta, time.time() + timeout
+
+
+def _store(key, value, delta, timeout):
+    cache.set(key, _entry(value, delta, timeout), timeout)
+
+
+async def _astore(key, value, delta, timeout):
+    await cache.aset(key, _entry(value, delta, timeout), timeout)
+
+
+def cache_aside(
+    namespace: str,
+    key: str,
+    loader: Callable[[], T],
+    timeout: int = DEFAULT_TIMEOUT,
+    beta: float = 1.0,
+) -> T:
+    """
+    Value of `key` in `namespace`, calling `loader()` to build and store it on
+    a miss. Only one worker loads a given key at a time (cache.add lock, so it
+    holds across processes with a shared backend); the others wait for its
+    result or, if they have a stale copy, keep serving that.
+    """
+    full_key = namespaced_key(namespace, key)
+    entry = cache.get(full_key)
+    if entry is not None:
+        if _fresh(entry, beta):
+            record(namespace, "hit")
+            return entry[0]
+        record(namespace, "early_refresh")
+    else:
+        record(namespace, "miss")
+
+    lock_key = f"{full_key}:lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    waited = False
+    while not (locked := cache.add(lock_key, 1, LOCK_TIMEOUT)):
+        if entry is not None:
+            record(namespace, "stale_hit")
+            return entry[0]
+        if not waited:
+            record(namespace, "wait")
+            waited = True
+        time.sleep(WAIT_STEP)
+        entry = cache.get(full_key)
+        if entry is not None:
+            return entry[0]
+        if time.monotonic() > deadline:
+            break  # lock holder died; load it ourselves, leaving its lock alone
+
+    try:
+        started = time.perf_counter()
+        value = loader()
+        delta = time.perf_counter() - started
+        record(namespace, "load")
+        record(namespace, "load_seconds", delta)
+        _store(full_key, value, delta, timeout)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+async def acache_aside(
+    namespace: str,
+    key: str,
+    loader: Callable[[], Awaitable[T]],
+    timeout: int = DEFAULT_TIMEOUT,
+    beta: float = 1.0,
+) -> T:
+    """cache_aside for async code: `loader` is a coroutine function."""
+    full_key = f"{namespace}:v{await _anamespace_version(namespace)}:{key}"
+    entry = await cache.aget(full_key)
+    if entry is not None:
+        if _fresh(entry, beta):
+            record(namespace, "hit")
+            return entry[0]
+        record(namespace, "early_refresh")
+    else:
+        record(namespace, "miss")
+
+    lock_key = f"{full_key}:lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    waited = False
+    while not (locked := await cache.aadd(lock_key, 1, LOCK_TIMEOUT)):
+        if entry is not None:
+            record(namespace, "stale_hit")
+            return entry[0]
+        if not waited:
+            record(namespace, "wait")
+            waited = True
+        await asyncio.sleep(WAIT_STEP)
+        entry = await cache.aget(full_key)
+        if entry is not None:
+            return entry[0]
+        if time.monotonic() > deadline:
+            break
+
+    try:
+        started = time.perf_counter()
+        value = await loader()
+        delta = time.perf_counter() - started
+        record(namespace, "load")
+        record(namespace, "load_seconds", delta)
+        await _astore(full_key, value, delta, timeout)
+        return value
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+
@@ -0,0 +1,58 @@
+# chat/serializers.py
+from rest_framework import serializers
+from .models import ChatMessage, ChatUpload, ConversationSummary
+from .serializers import UserSerializer
+
+
+class ChatMessageSerializer(serializers.ModelSerializer):
+    sender = UserSerializer(read_only=True)
+
+    class Meta:
+        model = ChatMessage
+        fields = ["id", "sender", "receiver", "team", "message", "file", "timestamp"]
+        read_only_fields = fields
+
+
+class ConversationSummarySerializer(serializers.ModelSerializer):
+    peer = UserSerializer(read_only=True)
+    team = serializers.SerializerMethodField()
+    last_message = ChatMessageSerializer(read_only=True)
+
+    class Meta:
+        model = ConversationSummary
+        fields = [
+            "conversation_key",
+            "peer",
+            "team",
+            "last_message",
+            "last_timestamp",
+            "unread_count",
+            "last_read_message_id",
+        ]
+
+    def get_team(self, obj):
+        if obj.team_id is None:
+            return None
+        return {"id": obj.team_id, "name": obj.team.name}
+
+
+class ChatUploadInitSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True)
+
+
+class ChatUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source="received", read_only=True)
+
+    class Meta:
+        model = ChatUpload
+        fields = ["id", "filename", "size", "offset", "status", "content_hash", "file", "created_at"]
+        read_only_fields = fields
+
+
+class ChatUploadFinalizeSerializer(serializers.Serializer):
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True)
+    receiver = serializers.IntegerField(required=False)
+    team = serializers.IntegerField(required=False)
+    message = serializers.CharField(required=False, allow_blank=True)
@@ -0,0 +1,345 @@
+# chat/views_upload.py
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.shortcuts import get_object_or_404
+from django.utils.text import get_valid_filename
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .chatserializer import (
+    ChatMessageSerializer,
+    ChatUploadFinalizeSerializer,
+    ChatUploadInitSerializer,
+    ChatUploadSerializer,
+)
+from .models import ChatMessage, ChatUpload, Team
+
+User = get_user_model()
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkTooLarge(Exception):
+    pass
+
+
+class CappedStream:
+    """Reads at most `limit` bytes from `stream`; more than that is an error."""
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.read_bytes = 0
+
+    def read(self, size=-1):
+        want = READ_SIZE if size is None or size < 0 else size
+        data = self.stream.read(min(want, self.limit - self.read_bytes + 1))
+        self.read_bytes += len(data)
+        if self.read_bytes > self.limit:
+            raise ChunkTooLarge()
+        return data
+
+
+class PartsStream:
+    """File-like object reading the stored parts of an upload back to back."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.current = None
+        self.hasher = hashlib.sha256()
+
+    def read(self, size=-1):
+        size = READ_SIZE if size is None or size < 0 else size
+        while self.names or self.current:
+            if self.current is None:
+                self.current = default_storage.open(self.names.pop(0), "rb")
+            data = self.current.read(size)
+            if data:
+                self.hasher.update(data)
+                return data
+            self.current.close()
+            self.current = None
+        return b""
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+
+
+def hash_parts(upload):
+    stream = PartsStream(upload.part_names())
+    while stream.read(READ_SIZE):
+        pass
+    return stream.hasher.hexdigest()
+
+
+def delete_parts(upload, sweep=False):
+    """Delete the recorded parts; `sweep` also drops unrecorded leftovers (aborted PUTs)."""
+    names = set(upload.part_names())
+    if sweep:
+        folder = f"chat_uploads/{upload.id}"
+        try:
+            names.update(f"{folder}/{name}" for name in default_storage.listdir(folder)[1])
+        except (FileNotFoundError, NotImplementedError):
+            pass
+    for name in names:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def user_upload_usage(user):
+    return ChatUpload.objects.filter(owner=user).aggregate(total=Sum("size"))["total"] or 0
+
+
+class ChatUploadInitView(APIView):
+    """
+    POST /api/chat/uploads/
+    { "filename": "notes.pdf", "size": 1048576, "sha256": "<optional hex>" }
+    → 201 { "id": "...", "offset": 0, "chunk_size": 5242880, ... }
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        ser = ChatUploadInitSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        size = ser.validated_data["size"]
+
+        if size > settings.CHAT_UPLOAD_MAX_BYTES:
+            return Response(
+                {"error": f"File exceeds the {settings.CHAT_UPLOAD_MAX_BYTES} byte limit."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if user_upload_usage(request.user) + size > settings.CHAT_UPLOAD_USER_QUOTA_BYTES:
+            return Response(
+                {"error": "Upload quota exceeded."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        upload = ChatUpload.objects.create(
+            owner=request.user,
+            filename=get_valid_filename(os.path.basename(ser.validated_data["filename"])) or "file",
+            size=size,
+            sha256=(ser.validated_data.get("sha256") or "").lower(),
+        )
+        data = ChatUploadSerializer(upload).data
+        data["chunk_size"] = settings.CHAT_UPLOAD_CHUNK_MAX_BYTES
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class ChatUploadChunkView(APIView):
+    """
+    GET    /api/chat/uploads/<id>/             → current offset (resume point)
+    PUT    /api/chat/uploads/<id>/?offset=N    raw bytes in the body
+    DELETE /api/chat/uploads/<id>/             → abort, drop stored parts
+
+    Chunks must arrive in order: `offset` has to equal the bytes already
+    received, otherwise 409 with the offset to resume from. The body is
+    streamed straight into default_storage, never buffered whole, and the
+    upload row is only locked afterwards, to record the part.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, upload_id, *args, **kwargs):
+        upload = get_object_or_404(ChatUpload, pk=upload_id, owner=request.user)
+        return Response(ChatUploadSerializer(upload).data)
+
+    def put(self, request, upload_id, *args, **kwargs):
+        # checked here without a lock to refuse early, and again under the
+        # lock once the body is stored: no row lock is held while streaming
+        upload = get_object_or_404(ChatUpload, pk=upload_id, owner=request.user)
+        if upload.status != ChatUpload.PENDING:
+            return Response({"error": "Upload already finalized."}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            offset = int(request.query_params.get("offset", upload.received))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid offset."}, status=status.HTTP_400_BAD_REQUEST)
+        if offset != upload.received:
+            return Response(
+                {"error": "Offset mismatch.", "offset": upload.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        remaining = upload.size - upload.received
+        limit = min(remaining, settings.CHAT_UPLOAD_CHUNK_MAX_BYTES)
+        if length <= 0 or length > limit:
+            return Response(
+                {"error": f"Chunk must be 1..{limit} bytes.", "offset": upload.received},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        # each attempt writes its own file, so concurrent PUTs of one offset
+        # never touch each other's; the one accepted below is recorded
+        name = upload.part_name(offset, attempt=uuid.uuid4().hex[:12])
+        stream = CappedStream(request.stream, length)
+        try:
+            saved = default_storage.save(name, File(stream, name=name))
+        except ChunkTooLarge:
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            return Response(
+                {"error": "Chunk larger than Content-Length.", "offset": upload.received},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if stream.read_bytes != length:
+            default_storage.delete(saved)
+            return Response(
+                {"error": "Incomplete chunk, resend it.", "offset": upload.received},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            upload = ChatUpload.objects.select_for_update().filter(pk=upload.pk).first()
+            accepted = (
+                upload is not None
+                and upload.status == ChatUpload.PENDING
+                and upload.received == offset
+            )
+            if accepted:
+                upload.parts = upload.parts + [[offset, length, saved]]
+                upload.received = offset + length
+                upload.save(update_fields=["parts", "received", "updated_at"])
+        if not accepted:  # finalized, aborted or another PUT got this offset first
+            default_storage.delete(saved)
+            if upload is None:
+                return Response({"error": "Upload aborted."}, status=status.HTTP_404_NOT_FOUND)
+            if upload.status != ChatUpload.PENDING:
+                return Response({"error": "Upload already finalized."}, status=status.HTTP_409_CONFLICT)
+            return Response(
+                {"error": "Offset mismatch.", "offset": upload.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(ChatUploadSerializer(upload).data)
+
+    def delete(self, request, upload_id, *args, **kwargs):
+        upload = get_object_or_404(ChatUpload, pk=upload_id, owner=request.user)
+        if upload.status == ChatUpload.PENDING:
+            delete_parts(upload, sweep=True)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ChatUploadFinalizeView(APIView):
+    """
+    POST /api/chat/uploads/<id>/finalize/
+    { "sha256": "<hex, unless given at init>", "receiver": 7 | "team": 3, "message": "optional" }
+
+    Verifies size and checksum, stores the file under chat_files/<hash>/ (or
+    reuses an identical file already stored) and, when a receiver or team is
+    given, posts it as a ChatMessage. Finalizing again returns the same
+    upload and message.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, upload_id, *args, **kwargs):
+        ser = ChatUploadFinalizeSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        data = ser.validated_data
+
+        # the row lock keeps a PUT from recording a part mid-finalize and makes
+        # a repeated finalize wait for, then return, the first one's result
+        with transaction.atomic():
+            upload = get_object_or_404(
+                ChatUpload.objects.select_for_update(), pk=upload_id, owner=request.user
+            )
+            if upload.status == ChatUpload.PENDING:
+                error = self.complete(upload, (data.get("sha256") or upload.sha256).lower())
+                if error:
+                    return error
+
+            payload = {"upload": ChatUploadSerializer(upload).data}
+            message = upload.message
+            if message is None and (data.get("receiver") or data.get("team")):
+                message, error = self.post_message(request.user, upload, data)
+                if error:
+                    return error
+                upload.message = message
+                upload.save(update_fields=["message", "updated_at"])
+            if message is not None:
+                payload["message"] = ChatMessageSerializer(message).data
+        return Response(payload)
+
+    def complete(self, upload, expected):
+        if upload.received != upload.size:
+            return Response(
+                {"error": "Upload incomplete.", "offset": upload.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if not expected:
+            return Response({"error": "sha256 is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        digest = hash_parts(upload)
+        if digest != expected:
+            delete_parts(upload)
+            upload.parts, upload.received = [], 0
+            upload.save(update_fields=["parts", "received", "updated_at"])
+            return Response(
+                {"error": "Checksum mismatch, upload restarted.", "offset": 0},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        existing = (
+            ChatUpload.objects.filter(content_hash=digest, status=ChatUpload.COMPLETE)
+            .exclude(file="")
+            .values_list("file", flat=True)
+            .first()
+        )
+        if existing and default_storage.exists(existing):
+            name = existing
+        else:
+            target = f"chat_files/{digest[:2]}/{digest}/{upload.filename}"
+            stream = PartsStream(upload.part_names())
+            try:
+                # long filenames are cut to fit the column
+                name = default_storage.save(
+                    target,
+                    File(stream, name=target),
+                    max_length=ChatUpload._meta.get_field("file").max_length,
+                )
+            finally:
+                stream.close()
+
+        delete_parts(upload, sweep=True)
+        upload.file.name = name
+        upload.content_hash = digest
+        upload.status = ChatUpload.COMPLETE
+        upload.save(update_fields=["file", "content_hash", "status", "updated_at"])
+        return None
+
+    def post_message(self, user, upload, data):
+        text = (data.get("message") or "").strip() or upload.filename
+        if data.get("team"):
+            is_member = Team.objects.filter(
+                Q(pk=data["team"]) & (Q(leader=user) | Q(members__user=user))
+            ).exists()
+            if not is_member:
+                return None, Response(
+                    {"error": "You are not a member of this team."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            fields = {"team_id": data["team"]}
+        else:
+            if data["receiver"] == user.id:
+                return None, Response(
+                    {"error": "You cannot message yourself."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if not User.objects.filter(pk=data["receiver"]).exists():
+                return None, Response(
+                    {"error": "Receiver not found."}, status=status.HTTP_400_BAD_REQUEST
+                )
+            fields = {"receiver_id": data["receiver"]}
+        message = ChatMessage(sender=user, message=text, **fields)
+        message.file.name = upload.file.name
+        message.save()
+        return message, None
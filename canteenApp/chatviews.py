@@ -0,0 +1,170 @@
+# chat/views.py
+import base64
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Q
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .chatserializer import ChatMessageSerializer, ConversationSummarySerializer
+from .inbox import mark_read
+from .models import ChatMessage, ConversationSummary, Team
+
+
+def encode_cursor(message):
+    ts = int(message.timestamp.timestamp() * 1_000_000)
+    return base64.urlsafe_b64encode(f"{ts}:{message.id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, id) or raises ValueError."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    ts, msg_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+    try:
+        when = datetime.fromtimestamp(int(ts) / 1_000_000, tz=dt_timezone.utc)
+    except (OverflowError, OSError) as exc:  # a timestamp out of datetime's (or the OS') range
+        raise ValueError(f"invalid cursor timestamp: {ts}") from exc
+    msg_id = int(msg_id)
+    if not 0 < msg_id < 2 ** 63:  # beyond a bigint the database driver overflows
+        raise ValueError(f"invalid cursor id: {msg_id}")
+    return when, msg_id
+
+
+def conversation_key_for(request, params=None):
+    """
+    Resolve ?user=<id> / ?team=<id> to a conversation key the caller may read.
+    Returns (key, error_response).
+    """
+    user = request.user
+    params = request.query_params if params is None else params
+    team_id = params.get("team")
+    other_id = params.get("user")
+    try:
+        if team_id:
+            team_id = int(team_id)
+            allowed = Team.objects.filter(
+                Q(pk=team_id) & (Q(leader=user) | Q(members__user=user))
+            ).exists()
+            if not allowed:
+                return None, Response(
+                    {"error": "You are not a member of this team."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            return ChatMessage.team_key(team_id), None
+        if other_id:
+            return ChatMessage.private_key(user.id, int(other_id)), None
+    except (TypeError, ValueError):
+        pass
+    return None, Response(
+        {"error": "Pass ?user=<id> or ?team=<id>."}, status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+class ChatHistoryView(APIView):
+    """
+    GET /api/chat/history/?user=7            → latest page of the private thread
+    GET /api/chat/history/?team=3&before=... → older page
+    GET /api/chat/history/?user=7&after=...  → newer messages (catch-up)
+
+    Keyset pagination on (conversation_key, timestamp, id), so every page is a
+    range scan on chatmessage_conversation_idx regardless of thread size.
+    Results are always oldest → newest.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 30
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        key, error = conversation_key_for(request)
+        if error:
+            return error
+
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        before = request.query_params.get("before")
+        after = request.query_params.get("after")
+        try:
+            before = decode_cursor(before) if before else None
+            after = decode_cursor(after) if after else None
+        except (TypeError, ValueError, UnicodeDecodeError):
+            return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = ChatMessage.objects.filter(conversation_key=key).select_related("sender")
+        if after:
+            ts, msg_id = after
+            qs = qs.filter(Q(timestamp__gt=ts) | Q(timestamp=ts, id__gt=msg_id))
+            page = list(qs.order_by("timestamp", "id")[: limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
+        else:
+            if before:
+                ts, msg_id = before
+                qs = qs.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=msg_id))
+            page = list(qs.order_by("-timestamp", "-id")[: limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit][::-1]
+
+        return Response({
+            "results": ChatMessageSerializer(page, many=True).data,
+            "before": encode_cursor(page[0]) if page else None,
+            "after": encode_cursor(page[-1]) if page else None,
+            "has_more": has_more,
+        })
+
+
+class ChatInboxView(APIView):
+    """
+    GET /api/chat/inbox/?limit=50
+    Latest message and unread count per conversation, newest first.
+    One indexed read of ConversationSummary.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 50
+    max_limit = 200
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        rows = (
+            ConversationSummary.objects.filter(user=request.user)
+            .select_related("peer", "team", "last_message__sender")
+            .order_by("-last_timestamp")[:limit]
+        )
+        return Response(ConversationSummarySerializer(rows, many=True).data)
+
+
+class ChatMarkReadView(APIView):
+    """
+    POST /api/chat/read/
+    { "user": 7 } or { "team": 3 }, optionally "message_id": 120
+    Moves the read cursor (default: to the latest message).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        key, error = conversation_key_for(request, request.data)
+        if error:
+            return error
+        message_id = request.data.get("message_id")
+        try:
+            message_id = int(message_id) if message_id is not None else None
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid message_id."}, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = mark_read(request.user, key, message_id)
+        if summary is None:
+            return Response({"error": "No such conversation."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "conversation_key": summary.conversation_key,
+            "unread_count": summary.unread_count,
+            "last_read_message_id": summary.last_read_message_id,
+        })
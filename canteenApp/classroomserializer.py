@@ -30,6 +30,19 @@ class ClassroomItemSerializer(serializers.ModelSerializer):
             "last_watched_at",
         )
 
+class ClassroomContinueSerializer(serializers.ModelSerializer):
+    """
+    Read-only row for the continue-watching feed. `segment_title` is annotated
+    by the view (title of the context segment covering the resume second).
+    """
+    video = CourseVideoMiniSerializer(read_only=True)
+    resume_seconds = serializers.IntegerField(source="progress_seconds", read_only=True)
+    segment_title = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = ClassroomItem
+        fields = ("id", "video", "resume_seconds", "segment_title", "last_watched_at")
+
 class ClassroomSerializer(serializers.ModelSerializer):
     items = ClassroomItemSerializer(many=True, read_only=True)
     active_video = CourseVideoMiniSerializer(read_only=True)
@@ -1,15 +1,18 @@
 # videos/views_classroom.py
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import permissions, status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Classroom, ClassroomItem, VideoContext
+from .models import Classroom, ClassroomItem, VideoContext, VideoContextSegment
 from .models import CourseVideo
+from .sqlite import write
 from .classroomserializer import (
     ClassroomSerializer,
     ClassroomItemSerializer,
+    ClassroomContinueSerializer,
     VideoContextSerializer,
     VideoContextWriteSerializer,
 )
@@ -18,6 +21,50 @@ def get_user_classroom(user):
     cls, _ = Classroom.objects.get_or_create(user=user, defaults={"name": "My AI Classroom"})
     return cls
 
+def classroom_with_items():
+    """Classrooms with what ClassroomSerializer reads: active video, items and their videos."""
+    return Classroom.objects.select_related("active_video").prefetch_related(
+        Prefetch("items", queryset=ClassroomItem.objects.select_related("video"))
+    )
+
+def get_user_classroom_with_items(user):
+    cls = classroom_with_items().filter(user_id=user.pk).first()
+    if cls is None:  # first visit: created empty, nothing to prefetch
+        cls = get_user_classroom(user)
+    return cls
+
+def parse_limit(raw, default, maximum):
+    try:
+        limit = int(raw if raw is not None else default)
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+def continue_watching(user_id, limit):
+    """
+    In-progress items of `user_id`, most recently watched first, annotated with
+    `segment_title` (context segment covering the resume second). One query.
+    """
+    segment_title = (
+        VideoContextSegment.objects.filter(
+            context__video=OuterRef("video"),
+            start_seconds__lte=OuterRef("progress_seconds"),
+            end_seconds__gte=OuterRef("progress_seconds"),
+        )
+        .order_by("-start_seconds")
+        .values("title")[:1]
+    )
+    return (
+        ClassroomItem.objects.filter(
+            classroom__user_id=user_id,
+            completed=False,
+            last_watched_at__isnull=False,
+        )
+        .select_related("video")
+        .annotate(segment_title=Subquery(segment_title))
+        .order_by("-last_watched_at")[:limit]
+    )
+
 # --- One classroom per user ---
 
 class ClassroomMeView(APIView):
@@ -28,11 +75,11 @@ class ClassroomMeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        cls = get_user_classroom(request.user)
+        cls = get_user_classroom_with_items(request.user)
         return Response(ClassroomSerializer(cls).data)
 
     def patch(self, request, *args, **kwargs):
-        cls = get_user_classroom(request.user)
+        cls = get_user_classroom_with_items(request.user)
         serializer = ClassroomSerializer(cls, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -70,6 +117,22 @@ class ClassroomItemListView(generics.ListAPIView):
         cls = get_user_classroom(self.request.user)
         return ClassroomItem.objects.filter(classroom=cls).select_related("video")
 
+class ClassroomContinueView(APIView):
+    """
+    GET /api/classroom/continue/?limit=10
+    In-progress items, most recently watched first, with the resume second
+    and the title of the context segment that second falls into.
+    One query, served by classroomitem_continue_idx.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        limit = parse_limit(request.query_params.get("limit"), self.default_limit, self.max_limit)
+        items = continue_watching(request.user.pk, limit)
+        return Response(ClassroomContinueSerializer(items, many=True).data)
+
 class ClassroomItemDeleteView(APIView):
     """
     DELETE /api/classroom/items/<int:item_id>/
@@ -118,5 +181,5 @@ class ClassroomItemProgressView(APIView):
             item.completed = bool(completed)
             changed = True
         if changed:
-            item.save(update_fields=["progress_seconds", "completed", "last_watched_at"])
+            write(item.save, update_fields=["progress_seconds", "completed", "last_watched_at"])
         return Response(ClassroomItemSerializer(item).data)
@@ -3,6 +3,9 @@ from typing import Dict, List
 from rest_framework import serializers
 from django.db import transaction
 from .models import Field, Interest2 as Interest, Skill2 as Skill, UserProfile, UserInterest, UserSkill
+from .models import normalize_name
+from .bootstrap import forget_state
+from .taxonomy import resolve_field, resolve_names
 
 
 class FieldSerializer(serializers.ModelSerializer):
@@ -83,70 +86,73 @@ class UserSelectionWriteSerializer(serializers.Serializer):
     def create(self, validated_data):
         """
         Upsert field, ensure interests/skills belong to that field, then
-        replace user's selections with the new ones.
+        bring the user's selections in line with the new ones. Set-based:
+        names are resolved from the taxonomy snapshot (or with one name_key
+        IN (...) lookup per model), missing ones are bulk-inserted, and only
+        the rows that changed are written.
         """
         user = self.context["request"].user
-        field_name = validated_data["field"]
-        interest_names = validated_data["interests"]
-        skill_names = validated_data["skills"]
-        skill_levels = validated_data.get("skill_level", {})
-
-        # Field
-        field, _ = Field.objects.get_or_create(
-            name__iexact=field_name, defaults={"name": field_name}
-        )
-        if isinstance(field, tuple):  # in case of get_or_create with name__iexact trick
-            field = Field.objects.get(name__iexact=field_name)
-
-        # Ensure slug exists (if created via iexact)
-        if not field.slug:
-            field.save()
-
-        # Interests (tie to field)
-        interests = []
-        for name in interest_names:
-            obj, _ = Interest.objects.get_or_create(
-                field=field, name__iexact=name, defaults={"name": name}
-            )
-            if isinstance(obj, tuple):
-                obj = Interest.objects.get(field=field, name__iexact=name)
-            interests.append(obj)
-
-        # Skills (tie to field)
-        skills = []
-        for name in skill_names:
-            obj, _ = Skill.objects.get_or_create(
-                field=field, name__iexact=name, defaults={"name": name}
-            )
-            if isinstance(obj, tuple):
-                obj = Skill.objects.get(field=field, name__iexact=name)
-            skills.append(obj)
+        skill_levels = {
+            normalize_name(name): level
+            for name, level in validated_data.get("skill_level", {}).items()
+        }
+
+        field = resolve_field(validated_data["field"])
+        interests = resolve_names(Interest, validated_data["interests"], field=field)
+        skills = resolve_names(Skill, validated_data["skills"], field=field)
 
         # Save to user profile
-        profile, _ = UserProfile.objects.get_or_create(user=user)
-        profile.selected_field = field
-        profile.save()
-
-        # Replace user interests
-        UserInterest.objects.filter(user=user).delete()
-        UserInterest.objects.bulk_create(
-            [UserInterest(user=user, interest=i) for i in interests]
+        try:
+            profile = user.profile
+        except UserProfile.DoesNotExist:
+            profile, _ = UserProfile.objects.get_or_create(user=user)
+        if profile.selected_field_id != field.pk:
+            profile.selected_field = field
+            profile.save(update_fields=["selected_field"])
+
+        # Interests: insert added, delete removed
+        wanted = {i.pk for i in interests}
+        current = set(
+            UserInterest.objects.filter(user=user).values_list("interest_id", flat=True)
         )
+        if current - wanted:
+            UserInterest.objects.filter(
+                user=user, interest_id__in=current - wanted
+            ).delete()
+        if wanted - current:
+            UserInterest.objects.bulk_create(
+                [UserInterest(user=user, interest_id=pk) for pk in wanted - current],
+                ignore_conflicts=True,
+            )
 
-        # Replace user skills
-        UserSkill.objects.filter(user=user).delete()
-        level_default = UserSkill.BEGINNER
-        to_create = []
+        # Skills: same, plus bulk_update of changed levels
+        current = {us.skill_id: us for us in UserSkill.objects.filter(user=user)}
+        selection, to_create, to_update = [], [], []
         for s in skills:
-            lvl = skill_levels.get(s.name, level_default)
-            to_create.append(UserSkill(user=user, skill=s, level=lvl))
-        UserSkill.objects.bulk_create(to_create)
+            lvl = skill_levels.get(s.name_key, UserSkill.BEGINNER)
+            row = current.pop(s.pk, None)
+            if row is None:
+                row = UserSkill(user=user, skill=s, level=lvl)
+                to_create.append(row)
+            elif row.level != lvl:
+                row.level = lvl
+                to_update.append(row)
+            row.skill = s
+            selection.append(row)
+        if current:
+            UserSkill.objects.filter(user=user, skill_id__in=current).delete()
+        if to_create:
+            UserSkill.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_update:
+            UserSkill.objects.bulk_update(to_update, ["level"])
+        # bulk writes send no signals
+        forget_state(user.pk)
 
         # Return a normalized representation
         return {
             "field": field,
             "interests": interests,
-            "skills": to_create,  # include user levels
+            "skills": selection,  # include user levels
         }
 
     def to_representation(self, instance):
@@ -1,14 +1,13 @@
 # profiles/views.py
-from rest_framework import generics, permissions, status
+from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import Field, Interest2 as Interest, Skill2 as Skill
 from .models import UserInterest, UserProfile, UserInterest, UserSkill
+from .bootstrap import bootstrap, selection
+from .taxonomy import SUGGEST_KINDS, snapshot, suggest_index
 from .completeprofileserializer import (
-    FieldSerializer,
-    InterestSerializer,
-    SkillSerializer,
     UserSelectionWriteSerializer,
     UserSelectionReadSerializer,
 )
@@ -20,49 +19,75 @@ class IsAuthenticated(permissions.IsAuthenticated):
 
 # --- Catalog Endpoints ---
 
-
-class FieldListView(generics.ListAPIView):
-    queryset = Field.objects.all()
-    serializer_class = FieldSerializer
+class FieldListView(APIView):
+    """GET /api/catalog/fields/ (from the taxonomy snapshot, no queries)"""
     permission_classes = [permissions.AllowAny]
 
+    def get(self, request, *args, **kwargs):
+        return Response(snapshot().field_payload)
+
 
-class InterestListByFieldView(generics.ListAPIView):
-    serializer_class = InterestSerializer
+class InterestListByFieldView(APIView):
+    """
+    /api/catalog/interests/?field=IT  (by name)
+    /api/catalog/interests/?field_id=3 (by id)
+    Served from the taxonomy snapshot, no queries; a filter is required.
+    """
     permission_classes = [permissions.AllowAny]
+    payload = "interest_payload"
+
+    def get(self, request, *args, **kwargs):
+        snap = snapshot()
+        field_id = snap.field_id(
+            name=request.query_params.get("field"),
+            field_id=request.query_params.get("field_id"),
+        )
+        return Response(getattr(snap, self.payload).get(field_id, []))
+
+
+class SkillListByFieldView(InterestListByFieldView):
+    """
+    /api/catalog/skills/?field=IT
+    /api/catalog/skills/?field_id=3
+    """
+    payload = "skill_payload"
+
 
-    def get_queryset(self):
-        """
-        /api/catalog/interests/?field=IT  (by name)
-        /api/catalog/interests/?field_id=3 (by id)
-        """
-        qs = Interest.objects.select_related("field").all()
-        field_name = self.request.query_params.get("field")
-        field_id = self.request.query_params.get("field_id")
-        if field_id:
-            return qs.filter(field_id=field_id)
-        if field_name:
-            return qs.filter(field__name__iexact=field_name)
-        return qs.none()  # require filter
-
-
-class SkillListByFieldView(generics.ListAPIView):
-    serializer_class = SkillSerializer
+class CatalogSuggestView(APIView):
+    """
+    GET /api/catalog/suggest/?q=reac&type=skill,keyword&field_id=3&limit=10
+    → {"q": "reac", "results": [{"type", "id", "name", "field"?, "popularity"}]}
+    Typeahead over field, interest, skill and keyword names (any word of the
+    name may match the prefix), most used first. In-memory (taxonomy.SuggestIndex),
+    no queries.
+    """
     permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 50
 
-    def get_queryset(self):
-        """
-        /api/catalog/skills/?field=IT
-        /api/catalog/skills/?field_id=3
-        """
-        qs = Skill.objects.select_related("field").all()
-        field_name = self.request.query_params.get("field")
-        field_id = self.request.query_params.get("field_id")
-        if field_id:
-            return qs.filter(field_id=field_id)
-        if field_name:
-            return qs.filter(field__name__iexact=field_name)
-        return qs.none()
+    def get(self, request, *args, **kwargs):
+        q = request.query_params.get("q", "")
+        kinds = tuple(
+            kind for kind in request.query_params.get("type", "").split(",") if kind in SUGGEST_KINDS
+        ) or SUGGEST_KINDS
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        index = suggest_index()
+        field_id = None
+        if request.query_params.get("field") or request.query_params.get("field_id"):
+            field_id = index.snap.field_id(
+                name=request.query_params.get("field"),
+                field_id=request.query_params.get("field_id"),
+            )
+            if field_id is None:
+                return Response({"q": q, "results": []})
+        return Response(
+            {"q": q, "results": index.suggest(q, kinds=kinds, field_id=field_id, limit=limit)}
+        )
 
 
 # --- Save & Fetch User Selection ---
@@ -100,26 +125,22 @@ class GetMySelectionView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        user = request.user
-        profile, _ = UserProfile.objects.get_or_create(user=user)
+        return Response(selection(request.user))
 
-        field = profile.selected_field
 
-        interests = (
-            Interest.objects.filter(user_links__user=user)
-            .select_related("field")
-            .order_by("name")
-        )
+class ProfileBootstrapView(APIView):
+    """
+    GET /api/profile/bootstrap/ → everything the profile screens load at once:
+    {
+      "profile": {...},                       # as /my-profile/ (relative photo url)
+      "selection": {...},                     # as /api/my-selection/
+      "catalog": {"interests": [...], "skills": [...]}  # of the selected field
+    }
+    Per-user state is cached and dropped on selection/profile saves; names
+    and the catalog come from the taxonomy snapshot.
+    """
 
-        skills = (
-            UserSkill.objects.filter(user=user)
-            .select_related("skill__field")
-            .order_by("skill__name")
-        )
+    permission_classes = [IsAuthenticated]
 
-        payload = {
-            "field": field,
-            "interests": list(interests),
-            "skills": list(skills),  # contains levels
-        }
-        return Response(UserSelectionReadSerializer(payload).data)
+    def get(self, request, *args, **kwargs):
+        return Response(bootstrap(request.user))
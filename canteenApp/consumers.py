@@ -0,0 +1,125 @@
+# chat/consumers.py
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from .chatserializer import ChatMessageSerializer
+from .models import ChatMessage, Team
+
+User = get_user_model()
+
+
+def user_group(user_id):
+    return f"chat.user.{user_id}"
+
+
+def message_recipient_ids(message):
+    """
+    Everyone who should see `message` live: the sender (other tabs/devices)
+    plus the receiver, or every member and the leader of the team.
+    """
+    if message.team_id:
+        ids = set(
+            User.objects.filter(
+                Q(teammember__team_id=message.team_id) | Q(led_teams__id=message.team_id)
+            ).values_list("id", flat=True)
+        )
+    else:
+        ids = {message.receiver_id}
+    ids.add(message.sender_id)
+    ids.discard(None)
+    return ids
+
+
+def broadcast_chat_message(message, recipient_ids=None):
+    """Fan a saved ChatMessage out to its recipients' websocket groups."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    if recipient_ids is None:
+        recipient_ids = message_recipient_ids(message)
+    event = {
+        "type": "chat.message",
+        "message": ChatMessageSerializer(message).data,
+    }
+    group_send = async_to_sync(channel_layer.group_send)
+    for user_id in recipient_ids:
+        group_send(user_group(user_id), event)
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    ws/chat/  (auth: access_token cookie)
+
+    Client → server:
+        {"receiver": 7, "message": "hi", "client_id": "abc"}   # private
+        {"team": 3, "message": "hi team", "client_id": "abc"}  # team
+    Server → client:
+        {"type": "ack", "id": 42, "client_id": "abc"}
+        {"type": "message", "message": {...ChatMessageSerializer...}}
+        {"type": "error", "error": "...", "client_id": "abc"}
+    """
+
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        client_id = content.get("client_id")
+        text = (content.get("message") or "").strip()
+        if not text:
+            await self.send_json({"type": "error", "error": "Message is empty.", "client_id": client_id})
+            return
+
+        error, message_id = await self.create_message(content, text)
+        if error:
+            await self.send_json({"type": "error", "error": error, "client_id": client_id})
+            return
+        # Delivery (including to this socket) happens through the post_save fan-out.
+        await self.send_json({"type": "ack", "id": message_id, "client_id": client_id})
+
+    async def chat_message(self, event):
+        await self.send_json({"type": "message", "message": event["message"]})
+
+    @database_sync_to_async
+    def create_message(self, content, text):
+        user = self.scope["user"]
+        try:
+            team_id = int(content.get("team") or 0)
+            receiver_id = int(content.get("receiver") or 0)
+        except (TypeError, ValueError):
+            return "'receiver' and 'team' must be ids.", None
+
+        if team_id:
+            is_member = Team.objects.filter(
+                Q(pk=team_id) & (Q(leader=user) | Q(members__user=user))
+            ).exists()
+            if not is_member:
+                return "You are not a member of this team.", None
+            msg = ChatMessage.objects.create(sender=user, team_id=team_id, message=text)
+            return None, msg.id
+
+        if receiver_id:
+            if receiver_id == user.id:
+                return "You cannot message yourself.", None
+            receiver = User.objects.filter(pk=receiver_id).first()
+            if receiver is None:
+                return "Receiver not found.", None
+            msg = ChatMessage.objects.create(sender=user, receiver=receiver, message=text)
+            return None, msg.id
+
+        return "Either 'receiver' or 'team' is required.", None
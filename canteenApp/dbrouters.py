@@ -0,0 +1,61 @@
+# Database routing for the Postgres profile (see DATABASES in settings).
+import random
+
+from django.conf import settings
+from django.db import connections
+
+# Catalog tables: written by staff now and then, read by every video page,
+# catalog picker and recommendation query.
+CATALOG_MODELS = {
+    "canteenApp.field",
+    "canteenApp.interest2",
+    "canteenApp.skill2",
+    "canteenApp.videokeyword",
+    "canteenApp.coursevideo",
+    "canteenApp.videocontext",
+    "canteenApp.videocontextsegment",
+}
+
+
+def is_catalog(model):
+    opts = model._meta
+    if opts.auto_created:  # M2M through table, e.g. coursevideo_fields
+        opts = opts.auto_created._meta
+    return opts.label_lower in CATALOG_MODELS
+
+
+class ReplicaRouter:
+    """
+    Sends reads of catalog models to a random `replica_N` alias when any are
+    configured. User data (profiles, selections, classroom, chat) and every
+    write stay on `default`, and so does every read inside a transaction on
+    `default` (a replica may not have its writes yet); related lookups from
+    an instance stay on the database it was loaded from. Code that reads
+    back its own catalog writes outside a transaction must use
+    .using("default").
+    """
+
+    def __init__(self):
+        self.replicas = [alias for alias in settings.DATABASES if alias.startswith("replica_")]
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or not is_catalog(model):
+            return None
+        if connections["default"].in_atomic_block:
+            return "default"
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas mirror default, so objects from any alias may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db.startswith("replica_"):
+            return False
+        return None
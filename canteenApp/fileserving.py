@@ -0,0 +1,160 @@
+# Static and media files served by Django itself (settings.SERVE_FILES), for
+# deployments without a web server in front: ETag/Last-Modified revalidation,
+# single byte ranges, precompressed .br/.gz siblings for static files, and
+# far-future immutable caching for content-hashed names.
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.static import was_modified_since
+
+# collectstatic's manifest names: "app.3f2a9c1b7d4e.css"
+HASHED_STATIC = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"  # may be stored, but checked (ETag) before each use
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+ARCHIVE_TYPES = {"gzip": "application/gzip", "br": "application/x-brotli", "bzip2": "application/x-bzip", "xz": "application/x-xz"}
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def byte_range(header, size):
+    """(start, end) inclusive for a single "bytes=a-b" range; None to ignore the header; ValueError if unsatisfiable."""
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None  # multiple ranges or another unit: send the whole file
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = int(last)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError
+    return start, end
+
+
+def read_range(fh, start, length):
+    try:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def serve_file(request, path, document_root, cache_control, precompressed=False):
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    try:
+        fullpath = Path(safe_join(document_root, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not fullpath.is_file():
+        raise Http404
+
+    content_type, encoding = mimetypes.guess_type(fullpath.name)
+    if encoding is not None:  # an archive (x.tar.gz) is served as is, not decoded by the client
+        content_type = ARCHIVE_TYPES.get(encoding, "application/octet-stream")
+    content_type = content_type or "application/octet-stream"
+    served, content_encoding = fullpath, None
+    if precompressed and encoding is None:
+        accepted = accepted_encodings(request)
+        for name, suffix in ENCODINGS:
+            candidate = fullpath.with_name(fullpath.name + suffix)
+            if name in accepted and candidate.is_file():
+                served, content_encoding = candidate, name
+                break
+
+    stat = served.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": cache_control,
+    }
+    if precompressed:
+        headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        fresh = "*" in parse_etags(if_none_match) or etag in parse_etags(if_none_match)
+    else:
+        fresh = not was_modified_since(request.headers.get("If-Modified-Since"), stat.st_mtime)
+    if fresh:
+        response = HttpResponseNotModified()
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    size = stat.st_size
+    requested = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if requested and content_encoding is None and (if_range is None or if_range == etag):
+        try:
+            span = byte_range(requested, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if span is not None:
+            start, end = span
+            response = FileResponse(
+                read_range(served.open("rb"), start, end - start + 1),
+                status=206, content_type=content_type,
+            )
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Accept-Ranges"] = "bytes"
+            for key, value in headers.items():
+                response[key] = value
+            return response
+
+    response = FileResponse(served.open("rb"), content_type=content_type, filename=fullpath.name)
+    response["Content-Length"] = str(size)
+    if content_encoding:
+        response["Content-Encoding"] = content_encoding
+    else:
+        response["Accept-Ranges"] = "bytes"  # ranges of a compressed body are not offered
+    for key, value in headers.items():
+        response[key] = value
+    return response
+
+
+def media_cache_control(path):
+    patterns = getattr(settings, "MEDIA_IMMUTABLE_PATTERNS", ())
+    return IMMUTABLE if any(re.search(p, path) for p in patterns) else REVALIDATE
+
+
+def serve_media(request, path):
+    """GET /media/<path>: uploads; content-hashed ones (MEDIA_IMMUTABLE_PATTERNS) cached for a year."""
+    return serve_file(request, path, settings.MEDIA_ROOT, media_cache_control(path))
+
+
+def serve_static(request, path):
+    """GET /static/<path>: collectstatic output, precompressed; hashed names cached for a year."""
+    cache_control = IMMUTABLE if HASHED_STATIC.search(path) else REVALIDATE
+    return serve_file(request, path, settings.STATIC_ROOT, cache_control, precompressed=True)
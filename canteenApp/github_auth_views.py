@@ -1,11 +1,16 @@
 # views.py
 from allauth.socialaccount.providers.github.views import GitHubOAuth2Adapter
 from dj_rest_auth.registration.views import SocialLoginView
-import requests
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from .tokenserializer import CustomTokenSerializer
 from rest_framework.response import Response
 from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from .async_views import request_data
+from .providers import ProviderNotConfigured, provider
 
 User = get_user_model()
 
@@ -13,23 +18,19 @@ class GitHubCookieLogin(SocialLoginView):
     adapter_class = GitHubOAuth2Adapter
     
     def post(self, request, *args, **kwargs):
-        code = request.data.get('code')
-        if not code:
-            return Response({"error": "Missing code"}, status=400)
-
-        # Exchange code for access token
-        client_id = 'Ov23li2EaARy6c1mz8NK'
-        client_secret = '6fce52903bb75ac5adaaf9de939353abc81cce70'
-        token_url = "https://github.com/login/oauth/access_token"
+        # github_login_async already did the exchange without blocking a thread
+        access_token = getattr(request, 'github_access_token', None)
 
-        token_res = requests.post(token_url, data={
-            'client_id': client_id,
-            'client_secret': client_secret,
-            'code': code,
-        }, headers={'Accept': 'application/json'})
+        if not access_token:
+            code = request.data.get('code')
+            if not code:
+                return Response({"error": "Missing code"}, status=400)
 
-        token_data = token_res.json()
-        access_token = token_data.get('access_token')
+            # Exchange code for access token
+            try:
+                access_token = provider("github").exchange_code(code)
+            except ProviderNotConfigured:
+                return Response({"error": "GitHub login is not configured"}, status=503)
 
         if not access_token:
             return Response({"error": "Failed to get access token"}, status=400)
@@ -46,7 +47,7 @@ class GitHubCookieLogin(SocialLoginView):
         print("✅ GitHub login view hit!")
 
         user = self.user
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenSerializer.get_token(user)
         access = refresh.access_token
 
         max_age = int(access["exp"] - datetime.utcnow().timestamp())
@@ -72,3 +73,26 @@ class GitHubCookieLogin(SocialLoginView):
         )
         
         return response
+
+
+@csrf_exempt
+async def github_login_async(request):
+    """
+    POST /auth/github/ when settings.ASYNC_VIEWS is on: the code → token
+    exchange with GitHub is awaited here, then GitHubCookieLogin (allauth is
+    sync) finishes the login in a thread with `request.github_access_token` set.
+    """
+    if request.method == "POST":
+        payload = request_data(request)
+        code = payload.get('code')
+        if not code:
+            return JsonResponse({"error": "Missing code"}, status=400)
+
+        try:
+            request.github_access_token = await provider("github").aexchange_code(code)
+        except ProviderNotConfigured:
+            return JsonResponse({"error": "GitHub login is not configured"}, status=503)
+        if not request.github_access_token:
+            return JsonResponse({"error": "Failed to get access token"}, status=400)
+
+    return await sync_to_async(GitHubCookieLogin.as_view())(request)
@@ -0,0 +1,23 @@
+# Shared outbound HTTP clients for the async views.
+import asyncio
+import weakref
+
+import httpx
+
+UPSTREAM_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+UPSTREAM_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+
+# One AsyncClient per event loop: a client (and its connection pool) can't be
+# shared across loops, and under ASGI each worker runs exactly one loop, so
+# this is effectively one pooled client per process.
+_clients = weakref.WeakKeyDictionary()
+
+
+def async_client():
+    """Pooled httpx.AsyncClient bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT, limits=UPSTREAM_LIMITS)
+        _clients[loop] = client
+    return client
@@ -0,0 +1,150 @@
+# Profile photo pipeline: uploads are re-encoded without metadata, downsized,
+# and turned into square thumbnails, each in WebP plus JPEG (PNG when the
+# image has transparency). Files are named after a hash of their bytes, so a
+# name never changes content and can be cached forever (see
+# UserProfile.photo_variants).
+import hashlib
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .background import submit_on_commit
+from .models import UserProfile
+
+PHOTO_DIR = "profile_photos"
+FULL = "full"
+WEBP = "webp"
+
+
+def photo_sizes():
+    """{variant name: square edge in px} of the thumbnails."""
+    return getattr(settings, "PROFILE_PHOTO_SIZES", {"thumb": 64, "small": 160, "medium": 320})
+
+
+def _encode(image, fmt):
+    quality = getattr(settings, "PROFILE_PHOTO_QUALITY", 82)
+    buf = io.BytesIO()
+    if fmt == "jpeg":
+        image.convert("RGB").save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+    elif fmt == "png":
+        image.save(buf, "PNG", optimize=True)
+    else:
+        image.save(buf, "WEBP", quality=quality, method=4)
+    # no exif=/icc_profile= passed: the re-encoded file carries no metadata
+    return buf.getvalue()
+
+
+def _encodings(image, fmt):
+    return {fmt: _encode(image, fmt), WEBP: _encode(image, WEBP)}
+
+
+def render_photo(content):
+    """
+    {variant: {format: bytes}} for an uploaded image: FULL (downsized to
+    PROFILE_PHOTO_MAX_DIMENSION, aspect kept) and one center-cropped square
+    per photo_sizes() entry.
+    """
+    with Image.open(io.BytesIO(content)) as source:
+        source.draft("RGB", (4096, 4096))  # JPEG: decode at reduced scale when huge
+        image = ImageOps.exif_transpose(source)  # apply the rotation before the exif goes
+    alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if alpha else "RGB")
+    fmt = "png" if alpha else "jpeg"
+
+    edge = getattr(settings, "PROFILE_PHOTO_MAX_DIMENSION", 1024)
+    full = image.copy()
+    full.thumbnail((edge, edge), Image.LANCZOS)
+    rendered = {FULL: _encodings(full, fmt)}
+    for name, size in photo_sizes().items():
+        square = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        rendered[name] = _encodings(square, fmt)
+    return rendered
+
+
+def hashed_name(variant, fmt, data):
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    ext = "jpg" if fmt == "jpeg" else fmt
+    return posixpath.join(PHOTO_DIR, variant, f"{digest}.{ext}")
+
+
+def save_rendered(rendered):
+    """Store the files (unless already there: same name, same bytes); {variant: {format: name}}."""
+    names = {}
+    for variant, encodings in rendered.items():
+        names[variant] = {}
+        for fmt, data in encodings.items():
+            name = hashed_name(variant, fmt, data)
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(data))
+            names[variant][fmt] = name
+    return names
+
+
+def fallback_name(variants, variant=FULL):
+    """Storage name of the JPEG/PNG of `variant`, or None."""
+    formats = (variants or {}).get(variant) or {}
+    return next((name for fmt, name in formats.items() if fmt != WEBP), None)
+
+
+def variant_urls(variants, build=None):
+    """{variant: {format: url}} for photo_variants; `build` makes URLs absolute."""
+    build = build or (lambda url: url)
+    return {
+        variant: {fmt: build(default_storage.url(name)) for fmt, name in formats.items()}
+        for variant, formats in (variants or {}).items()
+    }
+
+
+def photo_url(name, variants, variant="small"):
+    """URL of a photo's `variant` (JPEG/PNG), else of the stored photo, else None."""
+    chosen = fallback_name(variants, variant) or name
+    return default_storage.url(chosen) if chosen else None
+
+
+def source_hash(content):
+    """UserProfile.photo_source of an upload: set it when queueing the upload's job."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def store_profile_photo(profile_id, content, source=None):
+    """
+    Background job: process an uploaded photo and point the profile at the
+    results, unless the profile's photo_source is no longer `source` (by
+    default the hash of `content`): a later upload won, and its own job
+    saves it. Skipped results stay in storage; the names are content-hashed.
+    """
+    source = source_hash(content) if source is None else source
+    variants = save_rendered(render_photo(content))
+    with transaction.atomic():
+        profile = UserProfile.objects.select_for_update().filter(pk=profile_id).first()
+        if profile is None or profile.photo_source != source:
+            return
+        profile.photo.name = fallback_name(variants)
+        profile.photo_variants = variants
+        profile.save(update_fields=["photo", "photo_variants"])
+
+
+def set_profile_photo(profile, photo, update_fields=()):
+    """
+    Save `profile` (its `update_fields` plus the photo columns) with `photo`,
+    an upload from a request, or None to remove the photo. An upload is
+    processed by store_profile_photo after commit; a removal also clears
+    photo_source, so a job still pending for an earlier upload is dropped.
+    """
+    if photo is None:
+        profile.photo = None
+        profile.photo_variants = {}
+        profile.photo_source = ""
+        profile.save(update_fields=[*update_fields, "photo", "photo_variants", "photo_source"])
+        return
+    # the upload's temp file is gone once the request ends: hand over the bytes
+    photo.seek(0)
+    content = photo.read()
+    profile.photo_source = source_hash(content)
+    profile.save(update_fields=[*update_fields, "photo_source"])
+    submit_on_commit(store_profile_photo, profile.pk, content)
@@ -0,0 +1,95 @@
+# chat/inbox.py
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+
+from .models import ChatMessage, ConversationSummary
+
+
+def record_message(message, recipient_ids):
+    """
+    Fold a newly created ChatMessage into its recipients' inbox rows:
+    make sure every recipient has a row, then move last_message forward and
+    bump unread_count for everyone but the sender. Three statements however
+    many recipients there are. last_message only ever moves to a newer
+    message, so a commit that lands out of order cannot take it back.
+    """
+    key = message.conversation_key
+    rows = []
+    for user_id in recipient_ids:
+        peer_id = None
+        if not message.team_id:
+            peer_id = message.receiver_id if user_id == message.sender_id else message.sender_id
+        rows.append(
+            ConversationSummary(
+                user_id=user_id,
+                conversation_key=key,
+                peer_id=peer_id,
+                team_id=message.team_id,
+            )
+        )
+    ConversationSummary.objects.bulk_create(rows, ignore_conflicts=True)
+
+    newer = Q(last_message__isnull=True) | Q(last_message_id__lt=message.id)
+    recent = {
+        "last_message_id": Case(
+            When(newer, then=Value(message.id)),
+            default=F("last_message_id"),
+            output_field=ChatMessage._meta.pk,
+        ),
+        "last_timestamp": Case(
+            When(newer, then=Value(message.timestamp)),
+            default=F("last_timestamp"),
+            output_field=ConversationSummary._meta.get_field("last_timestamp"),
+        ),
+    }
+    ConversationSummary.objects.filter(
+        conversation_key=key, user_id__in=recipient_ids
+    ).exclude(user_id=message.sender_id).update(
+        unread_count=F("unread_count") + 1, **recent
+    )
+    # sending reads the conversation up to this message, unless a newer one is already in
+    ConversationSummary.objects.filter(
+        newer, conversation_key=key, user_id=message.sender_id
+    ).update(unread_count=0, last_read_message_id=message.id, **recent)
+
+
+def mark_read(user, key, message_id=None):
+    """
+    Move the user's read cursor to `message_id` (default: latest message)
+    and recompute unread_count from there. Returns the summary, or None if
+    the user has no row for this conversation. The row stays locked until the
+    new count is written, so a record_message() increment for a message
+    arriving meanwhile waits instead of being overwritten.
+    """
+    with transaction.atomic():
+        summary = (
+            ConversationSummary.objects.select_for_update()
+            .filter(user=user, conversation_key=key)
+            .first()
+        )
+        if summary is None:
+            return None
+
+        latest = summary.last_message_id or 0
+        cursor = latest if message_id is None else min(int(message_id), latest)
+        if cursor <= summary.last_read_message_id:
+            return summary
+
+        if cursor == latest:
+            unread = 0
+        else:
+            anchor = ChatMessage.objects.filter(pk=cursor, conversation_key=key).values("timestamp").first()
+            if anchor is None:
+                return summary
+            unread = (
+                ChatMessage.objects.filter(
+                    conversation_key=key, timestamp__gte=anchor["timestamp"], id__gt=cursor
+                )
+                .exclude(sender=user)
+                .count()
+            )
+
+        summary.last_read_message_id = cursor
+        summary.unread_count = unread
+        summary.save(update_fields=["last_read_message_id", "unread_count"])
+        return summary
@@ -0,0 +1,95 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from canteenApp.authentication import CookieJWTAuthentication, VerifiedTokenCache
+from canteenApp import authentication
+from canteenApp.blacklist import CheckedRefreshToken
+from canteenApp.tokenserializer import CustomTokenSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark of per-request cookie JWT authentication cost, or with "
+        "--refresh of the refresh-token blacklist check (needs a migrated DB)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Time CookieJWTAuthentication.authenticate() (includes get_user) "
+            "for the first user in the database instead of token validation only.",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Compare simplejwt's per-refresh blacklist query with the bloom filter.",
+        )
+
+    def handle(self, *args, **options):
+        if options["refresh"]:
+            return self.bench_refresh(min(options["iterations"], 5000))
+
+        n = options["iterations"]
+        if options["full"]:
+            user = User.objects.order_by("pk").first()
+            if user is None:
+                self.stderr.write("No users in the database.")
+                return
+        else:
+            # unsaved user: nothing is written, only the token is needed
+            user = User(pk=1, username="bench", email="bench@example.com")
+        access = str(CustomTokenSerializer.token_class.access_token_class.for_user(user))
+        request = RequestFactory().get("/", HTTP_COOKIE=f"access_token={access}")
+        auth = CookieJWTAuthentication()
+
+        if options["full"]:
+            def call():
+                auth.authenticate(request)
+        else:
+            def call():
+                auth.get_validated_token(access)
+
+        original = authentication.verified_tokens
+        results = {}
+        try:
+            for label, size in (("uncached", 0), ("cached", original.maxsize or 4096)):
+                authentication.verified_tokens = VerifiedTokenCache(size, original.recheck)
+                call()  # warm up
+                start = time.perf_counter()
+                for _ in range(n):
+                    call()
+                results[label] = (time.perf_counter() - start) / n * 1e6
+        finally:
+            authentication.verified_tokens = original
+
+        stage = "authenticate()" if options["full"] else "get_validated_token()"
+        self.stdout.write(f"{stage} x {n}")
+        for label, micros in results.items():
+            self.stdout.write(f"  {label:<9} {micros:8.2f} us/request")
+        self.stdout.write(f"  speedup   {results['uncached'] / results['cached']:8.1f}x")
+
+    def bench_refresh(self, n):
+        token = RefreshToken()  # not outstanding: no rows are written
+        token["user_id"] = 1
+        raw = str(token)
+        results = {}
+        for label, token_class in (("db", RefreshToken), ("bloom", CheckedRefreshToken)):
+            token_class(raw)  # warm up (builds the filter)
+            start = time.perf_counter()
+            for _ in range(n):
+                token_class(raw)
+            results[label] = (time.perf_counter() - start) / n * 1e6
+
+        self.stdout.write(f"refresh token verify + blacklist check x {n}")
+        for label, micros in results.items():
+            self.stdout.write(f"  {label:<9} {micros:8.2f} us/refresh")
+        self.stdout.write(f"  speedup   {results['db'] / results['bloom']:8.1f}x")
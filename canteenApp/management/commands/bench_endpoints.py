@@ -0,0 +1,308 @@
+import json
+import logging
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import URLPattern, reverse
+
+from canteenApp import urls
+from canteenApp.models import (
+    ClassroomItem,
+    ConversationSummary,
+    CourseVideo,
+    Field,
+    FriendRequest,
+)
+from canteenApp.profiling import metrics_snapshot
+from canteenApp.tokenserializer import CustomTokenSerializer
+
+from .seed_benchdata import PREFIX
+
+User = get_user_model()
+
+# Differences below this are noise whatever the ratio.
+MIN_REGRESSION_MS = 1.0
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * p // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency (p50/p95/p99) and throughput of every GET endpoint in "
+        "canteenApp/urls.py, through the Django test client as a seeded user "
+        "(see seed_benchdata). Routes that do not allow GET, or need an id the "
+        "data does not have, are skipped. --output writes the results as JSON; "
+        "--compare reports p95 regressions against such a file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--concurrency", type=int, default=1, help="Client threads.")
+        parser.add_argument("--user", help=f"Username to log in as (default: first {PREFIX} user).")
+        parser.add_argument("--only", nargs="+", metavar="URL_NAME", help="Only these url names.")
+        parser.add_argument("--output", help="Write results to this JSON file.")
+        parser.add_argument("--compare", help="Baseline JSON file from an earlier --output.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Relative p95 increase that counts as a regression (default 0.2 = 20%%).",
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true",
+            help="Exit with an error when --compare finds a regression.",
+        )
+
+    def handle(self, *args, **options):
+        user = self.bench_user(options["user"])
+        cookies = self.auth_cookies(user)
+        kwargs, query = self.samples(user)
+
+        # statuses and budget overruns are in the report; not one log line per request
+        loggers = [logging.getLogger(name) for name in ("django.request", "canteenApp.profiling")]
+        levels = [logger.level for logger in loggers]
+        for logger in loggers:
+            logger.setLevel(logging.CRITICAL)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                results = self.run_routes(options, cookies, kwargs, query)
+        finally:
+            for logger, level in zip(loggers, levels):
+                logger.setLevel(level)
+
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "database": connection.vendor,
+                "async_views": settings.ASYNC_VIEWS,
+                "cache": settings.CACHES["default"]["BACKEND"],
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "user": user.username,
+            },
+            "endpoints": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"wrote {options['output']}")
+        if options["compare"]:
+            self.compare(report, options["compare"], options["threshold"], options["fail_on_regression"])
+
+    def run_routes(self, options, cookies, kwargs, query):
+        results = {}
+        for name, converters in self.routes(options["only"]):
+            missing = [arg for arg in converters if kwargs.get(name, {}).get(arg) is None]
+            if missing:
+                self.stdout.write(f"  skip {name}: no sample {', '.join(missing)}")
+                continue
+            path = reverse(name, kwargs={arg: kwargs[name][arg] for arg in converters})
+            result = self.bench(
+                name, path, query.get(name, {}), cookies,
+                options["requests"], options["warmup"], options["concurrency"],
+            )
+            if result is None:
+                self.stdout.write(f"  skip {name}: GET not allowed")
+                continue
+            results[name] = result
+            self.report(name, result)
+        return results
+
+    # --- setup ---
+
+    def bench_user(self, username):
+        users = User.objects.select_related("profile")
+        user = (
+            users.filter(username=username).first() if username
+            else users.filter(username__startswith=PREFIX).order_by("id").first()
+        )
+        if user is None:
+            raise CommandError("No benchmark user; run `manage.py seed_benchdata` first or pass --user.")
+        return user
+
+    def auth_cookies(self, user):
+        refresh = CustomTokenSerializer.get_token(user)
+        return {"access_token": str(refresh.access_token), "refresh_token": str(refresh)}
+
+    def samples(self, user):
+        """
+        ({url name: {kwarg: value}}, {url name: query params}) for the routes
+        that need them, picked from the user's own data.
+        """
+        video = (
+            CourseVideo.objects.filter(slug__startswith="bench-").order_by("id").first()
+            or CourseVideo.objects.order_by("id").first()
+        )
+        item = ClassroomItem.objects.filter(classroom__user=user).order_by("id").first()
+        friend_request = FriendRequest.objects.filter(sender=user).order_by("id").first()
+        thread = (
+            ConversationSummary.objects.filter(user=user, peer__isnull=False)
+            .order_by("-last_timestamp").first()
+        )
+        field = getattr(user.profile, "selected_field", None) or Field.objects.order_by("id").first()
+
+        slug = video.slug if video else None
+        item_id = item.pk if item else None
+        kwargs = {
+            "video-detail": {"slug": slug},
+            "video-context": {"slug": slug},
+            "video-context-upsert": {"slug": slug},
+            "classroom-item-delete": {"item_id": item_id},
+            "classroom-item-progress": {"item_id": item_id},
+            "friendrequest-detail": {"pk": friend_request.pk if friend_request else None},
+        }
+        query = {
+            "catalog-interests-by-field": {"field_id": field.pk} if field else {},
+            "catalog-skills-by-field": {"field_id": field.pk} if field else {},
+            "catalog-suggest": {"q": "re"},
+            "chat-history": {"user": thread.peer_id} if thread else {},
+        }
+        return kwargs, query
+
+    def routes(self, only):
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue  # includes (allauth, dj_rest_auth) are not ours
+            if only and pattern.name not in only:
+                continue
+            yield pattern.name, list(pattern.pattern.converters)
+
+    # --- measuring ---
+
+    def client(self, cookies):
+        client = Client(secure=True, raise_request_exception=False)
+        for key, value in cookies.items():
+            client.cookies[key] = value
+        return client
+
+    def bench(self, name, path, params, cookies, n, warmup, concurrency):
+        client = self.client(cookies)
+        probe = client.get(path, params)
+        if probe.status_code == 405:
+            return None
+        for _ in range(warmup):
+            client.get(path, params)
+
+        def run(count):
+            own = self.client(cookies)
+            timings, statuses = [], {}
+            for _ in range(count):
+                started = time.perf_counter()
+                response = own.get(path, params)
+                timings.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            return timings, statuses
+
+        before = metrics_snapshot().get((name, "GET"))
+        started = time.perf_counter()
+        if concurrency <= 1:
+            chunks = [run(n)]
+        else:
+            share = [n // concurrency + (i < n % concurrency) for i in range(concurrency)]
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                chunks = list(pool.map(run, share))
+        elapsed = time.perf_counter() - started
+        after = metrics_snapshot().get((name, "GET"))
+
+        timings = sorted(t for chunk, _ in chunks for t in chunk)
+        statuses = {}
+        for _, chunk_statuses in chunks:
+            for code, count in chunk_statuses.items():
+                statuses[str(code)] = statuses.get(str(code), 0) + count
+
+        queries = over_budget = None
+        if after is not None:  # REQUEST_PROFILING is on
+            before = before or {"requests": {}, "queries": 0, "budget_exceeded": 0}
+            served = sum(after["requests"].values()) - sum(before["requests"].values())
+            if served:
+                queries = (after["queries"] - before["queries"]) / served
+                over_budget = after["budget_exceeded"] - before["budget_exceeded"]
+
+        ms = 1000
+        return {
+            "path": path,
+            "params": params,
+            "status": statuses,
+            "requests": len(timings),
+            "mean_ms": round(sum(timings) / len(timings) * ms, 3) if timings else 0.0,
+            "p50_ms": round(percentile(timings, 50) * ms, 3),
+            "p95_ms": round(percentile(timings, 95) * ms, 3),
+            "p99_ms": round(percentile(timings, 99) * ms, 3),
+            "max_ms": round(timings[-1] * ms, 3) if timings else 0.0,
+            "rps": round(len(timings) / elapsed, 1) if elapsed else 0.0,
+            "queries": queries,
+            "over_budget": over_budget,
+            "bytes": len(probe.content) if not probe.streaming else None,
+        }
+
+    # --- reporting ---
+
+    def report(self, name, r):
+        statuses = ",".join(f"{code}x{count}" for code, count in sorted(r["status"].items()))
+        queries = "-" if r["queries"] is None else f"{r['queries']:g}"
+        budget = " over budget" if r["over_budget"] else ""
+        self.stdout.write(
+            f"{name:<28} p50 {r['p50_ms']:8.2f}  p95 {r['p95_ms']:8.2f}  p99 {r['p99_ms']:8.2f} ms  "
+            f"{r['rps']:8.1f} req/s  {queries:>4} q  [{statuses}]{budget}"
+        )
+
+    def compare(self, report, baseline_path, threshold, fail):
+        try:
+            with open(baseline_path) as fh:
+                baseline = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {baseline_path}: {exc}")
+
+        old_commit = baseline.get("meta", {}).get("commit") or "baseline"
+        new_commit = report["meta"]["commit"] or "current"
+        self.stdout.write(f"\np95 {old_commit} → {new_commit}")
+        for key in ("database", "async_views", "cache", "concurrency"):
+            if baseline.get("meta", {}).get(key) != report["meta"][key]:
+                self.stdout.write(self.style.WARNING(
+                    f"  runs differ in {key}: {baseline['meta'].get(key)} vs {report['meta'][key]}"
+                ))
+        regressions = []
+        for name, new in sorted(report["endpoints"].items()):
+            old = baseline.get("endpoints", {}).get(name)
+            if old is None:
+                self.stdout.write(f"  {name:<28} new endpoint")
+                continue
+            before, after = old["p95_ms"], new["p95_ms"]
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if change > threshold and after - before > MIN_REGRESSION_MS:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            queries = ""
+            if old.get("queries") is not None and new["queries"] is not None and old["queries"] != new["queries"]:
+                queries = f"  queries {old['queries']:g} → {new['queries']:g}"
+            self.stdout.write(
+                f"  {name:<28} {before:8.2f} → {after:8.2f} ms ({change:+.0%}){queries}{flag}"
+            )
+        if regressions and fail:
+            raise CommandError(f"p95 regressed: {', '.join(regressions)}")
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from canteenApp.sqlite import SingleWriter, apply_pragmas
+
+SCHEMA = """
+CREATE TABLE item (id INTEGER PRIMARY KEY, progress_seconds INTEGER, last_watched_at REAL);
+CREATE TABLE ai_message (id INTEGER PRIMARY KEY, role TEXT, content TEXT, created_at REAL);
+"""
+
+MODES = ("legacy", "wal", "immediate", "queue")
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent write benchmark on a scratch SQLite file. Compares the old "
+        "settings (rollback journal, 5s timeout), the SQLITE_HIGH_CONCURRENCY "
+        "pragmas with deferred and with IMMEDIATE transactions (the DATABASES "
+        "default), and the pragmas plus the single-writer queue. Each write is a "
+        "read-modify-write transaction like a progress ping plus an AI message."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--writes", type=int, default=200, help="Writes per thread.")
+        parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+
+    def handle(self, *args, **options):
+        modes = MODES if options["mode"] == "all" else (options["mode"],)
+        self.stdout.write(f"{options['threads']} threads x {options['writes']} writes")
+        for mode in modes:
+            with tempfile.TemporaryDirectory() as tmp:
+                ok, errors, elapsed, latencies = self.run_mode(
+                    mode, os.path.join(tmp, "bench.sqlite3"), options["threads"], options["writes"]
+                )
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+            self.stdout.write(
+                f"{mode:>9}: {ok:6d} ok  {errors:5d} locked  "
+                f"{ok / elapsed:8.0f} writes/s  "
+                f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.2f} ms  "
+                f"p95 {p95 * 1000:7.2f} ms"
+            )
+
+    def connect(self, mode, path):
+        if mode == "legacy":
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            apply_pragmas(conn)
+        return conn
+
+    def run_mode(self, mode, path, threads, writes):
+        setup = sqlite3.connect(path, isolation_level=None)
+        setup.execute("PRAGMA journal_mode=DELETE" if mode == "legacy" else "PRAGMA journal_mode=WAL")
+        setup.executescript(SCHEMA)
+        setup.executemany(
+            "INSERT INTO item (id, progress_seconds, last_watched_at) VALUES (?, 0, 0)",
+            [(i,) for i in range(1, threads + 1)],
+        )
+        setup.close()
+
+        writer = SingleWriter(name="bench-writer")
+        local = threading.local()
+
+        def transaction(item_id):
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = local.conn = self.connect(mode, path)
+            conn.execute("BEGIN IMMEDIATE" if mode == "immediate" else "BEGIN")
+            try:
+                (progress,) = conn.execute(
+                    "SELECT progress_seconds FROM item WHERE id = ?", (item_id,)
+                ).fetchone()
+                now = time.time()
+                conn.execute(
+                    "UPDATE item SET progress_seconds = ?, last_watched_at = ? WHERE id = ?",
+                    (progress + 5, now, item_id),
+                )
+                conn.execute(
+                    "INSERT INTO ai_message (role, content, created_at) VALUES ('user', 'hi', ?)",
+                    (now,),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+        counts = {"ok": 0, "errors": 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def worker(item_id):
+            ok = errors = 0
+            mine = []
+            for _ in range(writes):
+                start = time.perf_counter()
+                try:
+                    if mode == "queue":
+                        writer.run(transaction, item_id)
+                    else:
+                        transaction(item_id)
+                except sqlite3.OperationalError as exc:
+                    if "locked" not in str(exc) and "busy" not in str(exc):
+                        raise
+                    errors += 1
+                    continue
+                mine.append(time.perf_counter() - start)
+                ok += 1
+            with lock:
+                counts["ok"] += ok
+                counts["errors"] += errors
+                latencies.extend(mine)
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(1, threads + 1)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - start
+        if writer.executor is not None:
+            writer.executor.shutdown()
+        return counts["ok"], counts["errors"], elapsed, latencies
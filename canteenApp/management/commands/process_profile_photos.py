@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from canteenApp.images import store_profile_photo
+from canteenApp.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Run profile photos uploaded before the image pipeline (no "
+        "photo_variants yet) through it: strip metadata, downsize, thumbnails "
+        "and WebP. --all reprocesses every photo, e.g. after changing "
+        "PROFILE_PHOTO_SIZES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Also photos that already have variants.")
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.exclude(photo="").exclude(photo__isnull=True)
+        if not options["all"]:
+            profiles = profiles.filter(photo_variants={})
+        done = failed = 0
+        for profile in profiles.only("id", "photo", "photo_source").iterator():
+            try:
+                with profile.photo.open("rb") as fh:
+                    # skipped if the user uploads a new photo meanwhile
+                    store_profile_photo(profile.pk, fh.read(), source=profile.photo_source)
+            except Exception as exc:  # missing file, not an image...
+                failed += 1
+                self.stderr.write(f"profile {profile.pk} ({profile.photo.name}): {exc}")
+                continue
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {done} photos, {failed} failed."))
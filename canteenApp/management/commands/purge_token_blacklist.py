@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from canteenApp.blacklist import bump_version, token_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding/blacklisted JWTs in batches and make every "
+        "process rebuild its blacklist bloom filter. Run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options["batch_size"]
+        total = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            # BlacklistedToken rows go with them (on_delete=CASCADE)
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            total += len(ids)
+
+        token_blacklist.reset()
+        bump_version()
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} expired tokens."))
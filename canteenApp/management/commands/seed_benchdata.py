@@ -0,0 +1,374 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from canteenApp.bootstrap import PROFILE_NAMESPACE
+from canteenApp.cache import CATALOG_NAMESPACE, TAXONOMY_NAMESPACE, bump_namespace
+from canteenApp.models import (
+    ChatMessage,
+    Classroom,
+    ClassroomItem,
+    ConversationSummary,
+    CourseVideo,
+    Field,
+    FriendRequest,
+    Interest2,
+    Skill2,
+    Team,
+    TeamMember,
+    UserInterest,
+    UserProfile,
+    UserSkill,
+    VideoContext,
+    VideoContextSegment,
+    VideoKeyword,
+    normalize_name,
+)
+from canteenApp.taxonomy import resolve_names
+
+User = get_user_model()
+
+PREFIX = "bench_"  # usernames, and slugs as "bench-..."
+PASSWORD = "bench-password"
+
+TAXONOMY = {
+    "IT": (
+        ["Web Development", "Mobile Apps", "Cloud", "Security", "Data Science", "Game Development"],
+        ["Python", "JavaScript", "React", "Django", "SQL", "Docker", "Linux", "Git"],
+    ),
+    "Design": (
+        ["UI Design", "UX Research", "Illustration", "Motion Graphics"],
+        ["Figma", "Photoshop", "Typography", "Prototyping", "Color Theory"],
+    ),
+    "Business": (
+        ["Marketing", "Finance", "Entrepreneurship", "Project Management"],
+        ["Excel", "Accounting", "Public Speaking", "Negotiation", "Sales"],
+    ),
+    "Science": (
+        ["Physics", "Biology", "Chemistry", "Statistics"],
+        ["Calculus", "Lab Work", "Research Writing", "R"],
+    ),
+}
+CATEGORIES = ["Frontend", "Backend", "DevOps", "Design", "Business", "Science", "Career"]
+WORDS = (
+    "intro advanced guide crash course tutorial basics deep dive project build "
+    "api testing deploy performance patterns tips beginners interview explained"
+).split()
+SENTENCES = [
+    "Did you finish the assignment?",
+    "Let's pair on the project tonight.",
+    "Here is the link to the video I mentioned.",
+    "The deadline moved to Friday.",
+    "Can you review my pull request?",
+    "Meeting in the lab after class.",
+]
+FACULTIES = [code for code, _ in UserProfile.FACULTY_CHOICES]
+GENDERS = [code for code, _ in UserProfile.GENDER_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic benchmark data: users with profiles, skills and "
+        "interests, videos with keywords and contexts, classrooms, chat "
+        f"messages, friend requests and teams. Users are named {PREFIX}NNNN "
+        f"(password '{PASSWORD}'), videos get 'bench-' slugs; --flush removes them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--videos", type=int, default=500)
+        parser.add_argument("--messages", type=int, default=5000)
+        parser.add_argument("--friend-requests", type=int, default=5, help="Per user.")
+        parser.add_argument("--classroom-items", type=int, default=15, help="Per user.")
+        parser.add_argument("--teams", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--flush", action="store_true", help="Delete earlier bench data first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        if options["flush"]:
+            self.flush()
+
+        with transaction.atomic():
+            fields, interests, skills = self.seed_taxonomy()
+            users = self.seed_users(options["users"], fields, interests, skills)
+            videos = self.seed_videos(options["videos"], fields, interests, skills)
+            self.seed_classrooms(users, videos, options["classroom_items"])
+            self.seed_friend_requests(users, options["friend_requests"])
+            teams = self.seed_teams(users, options["teams"])
+            self.seed_messages(users, teams, options["messages"])
+
+        # bulk_create sends no signals: drop whatever the caches hold
+        bump_namespace(CATALOG_NAMESPACE)
+        bump_namespace(TAXONOMY_NAMESPACE)
+        bump_namespace(PROFILE_NAMESPACE)
+
+    def flush(self):
+        users = User.objects.filter(username__startswith=PREFIX)
+        # inbox rows and messages go with their users (CASCADE)
+        counts = [
+            CourseVideo.objects.filter(slug__startswith="bench-").delete()[0],
+            users.delete()[0],
+        ]
+        self.stdout.write(f"flushed {sum(counts)} rows")
+
+    # --- taxonomy ---
+
+    def seed_taxonomy(self):
+        fields, interests, skills = [], [], []
+        for name, (interest_names, skill_names) in TAXONOMY.items():
+            field, _ = Field.objects.get_or_create(
+                name_key=normalize_name(name), defaults={"name": name}
+            )
+            fields.append(field)
+            interests += resolve_names(Interest2, interest_names, field=field)
+            skills += resolve_names(Skill2, skill_names, field=field)
+        resolve_names(VideoKeyword, WORDS)
+        return fields, interests, skills
+
+    # --- users ---
+
+    def seed_users(self, count, fields, interests, skills):
+        start = User.objects.filter(username__startswith=PREFIX).count()
+        password = make_password(PASSWORD)  # hashed once, not per user
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{PREFIX}{i:04d}",
+                    email=f"{PREFIX}{i:04d}@example.com",
+                    first_name=f"Bench{i}",
+                    password=password,
+                )
+                for i in range(start, start + count)
+            ],
+            batch_size=500,
+        )
+        users = list(
+            User.objects.filter(username__startswith=PREFIX).order_by("id")[start:start + count]
+        )
+
+        rng = self.rng
+        UserProfile.objects.bulk_create(
+            [
+                UserProfile(
+                    user=user,
+                    full_name=f"Bench User {user.pk}",
+                    semester=rng.randint(1, 8),
+                    year=rng.randint(1, 4),
+                    faculty=rng.choice(FACULTIES),
+                    gender=rng.choice(GENDERS),
+                    bio=" ".join(rng.choices(WORDS, k=12)),
+                    college="Bench College",
+                    selected_field=rng.choice(fields),
+                )
+                for user in users
+            ],
+            batch_size=500,
+        )
+
+        links_i, links_s = [], []
+        for user in users:
+            for interest in rng.sample(interests, k=min(4, len(interests))):
+                links_i.append(UserInterest(user=user, interest=interest))
+            for skill in rng.sample(skills, k=min(6, len(skills))):
+                links_s.append(
+                    UserSkill(user=user, skill=skill, level=rng.choice(UserSkill.SKILL_LEVELS)[0])
+                )
+        UserInterest.objects.bulk_create(links_i, batch_size=1000, ignore_conflicts=True)
+        UserSkill.objects.bulk_create(links_s, batch_size=1000, ignore_conflicts=True)
+        self.stdout.write(f"users: {len(users)} (+{len(links_i)} interests, {len(links_s)} skills)")
+        return users
+
+    # --- videos ---
+
+    def seed_videos(self, count, fields, interests, skills):
+        rng = self.rng
+        start = CourseVideo.objects.filter(slug__startswith="bench-").count()
+        videos = []
+        for i in range(start, start + count):
+            title = f"{rng.choice(CATEGORIES)} {' '.join(rng.sample(WORDS, 3))} {i}"
+            youtube_id = f"bench{i:06d}"
+            videos.append(
+                CourseVideo(
+                    title=title.title(),
+                    slug=f"bench-{slugify(title)}"[:240],
+                    description=" ".join(rng.choices(WORDS, k=40)),
+                    category=rng.choice(CATEGORIES),
+                    youtube_url=f"https://www.youtube.com/watch?v={youtube_id}",
+                    youtube_id=youtube_id,
+                )
+            )
+        CourseVideo.objects.bulk_create(videos, batch_size=500)
+        videos = list(
+            CourseVideo.objects.filter(slug__startswith="bench-").order_by("id")[start:start + count]
+        )
+
+        keywords = resolve_names(VideoKeyword, WORDS)
+        through = {
+            name: getattr(CourseVideo, name).through
+            for name in ("fields", "interests", "skills", "keywords")
+        }
+        links = {name: [] for name in through}
+        for video in videos:
+            for name, pool, k, fk in (
+                ("fields", fields, 1, "field_id"),
+                ("interests", interests, 2, "interest2_id"),
+                ("skills", skills, 3, "skill2_id"),
+                ("keywords", keywords, 4, "videokeyword_id"),
+            ):
+                for obj in rng.sample(pool, k=min(k, len(pool))):
+                    links[name].append(through[name](coursevideo_id=video.pk, **{fk: obj.pk}))
+        for name, rows in links.items():
+            through[name].objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+        VideoContext.objects.bulk_create(
+            [
+                VideoContext(
+                    video=video,
+                    summary=" ".join(rng.choices(WORDS, k=30)),
+                    keywords=rng.sample(WORDS, 5),
+                )
+                for video in videos
+            ],
+            batch_size=500,
+        )
+        segments = []
+        for context in VideoContext.objects.filter(video__in=videos):
+            for n in range(rng.randint(3, 8)):
+                segments.append(
+                    VideoContextSegment(
+                        context=context,
+                        start_seconds=n * 120,
+                        end_seconds=(n + 1) * 120,
+                        title=" ".join(rng.sample(WORDS, 2)).title(),
+                        content=" ".join(rng.choices(WORDS, k=25)),
+                        tags=rng.sample(WORDS, 2),
+                    )
+                )
+        VideoContextSegment.objects.bulk_create(segments, batch_size=1000)
+        self.stdout.write(f"videos: {len(videos)} (+{len(segments)} context segments)")
+        return videos
+
+    # --- per-user activity ---
+
+    def seed_classrooms(self, users, videos, per_user):
+        rng = self.rng
+        Classroom.objects.bulk_create(
+            [Classroom(user=user, active_video=rng.choice(videos)) for user in users],
+            ignore_conflicts=True,
+        )
+        now = timezone.now()
+        items = []
+        for classroom in Classroom.objects.filter(user__in=users):
+            for video in rng.sample(videos, k=min(per_user, len(videos))):
+                watched = rng.random() < 0.7
+                items.append(
+                    ClassroomItem(
+                        classroom=classroom,
+                        video=video,
+                        progress_seconds=rng.randint(1, 1800) if watched else 0,
+                        completed=watched and rng.random() < 0.3,
+                        last_watched_at=now - timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+                        if watched else None,
+                    )
+                )
+        ClassroomItem.objects.bulk_create(items, batch_size=1000, ignore_conflicts=True)
+        self.stdout.write(f"classroom items: {len(items)}")
+
+    def seed_friend_requests(self, users, per_user):
+        rng = self.rng
+        statuses = ["pending", "accepted", "rejected"]
+        requests = {}
+        for sender in users:
+            for receiver in rng.sample(users, k=min(per_user + 1, len(users))):
+                if receiver.pk != sender.pk and (receiver.pk, sender.pk) not in requests:
+                    requests[(sender.pk, receiver.pk)] = FriendRequest(
+                        sender=sender, receiver=receiver, status=rng.choice(statuses)
+                    )
+        FriendRequest.objects.bulk_create(requests.values(), batch_size=1000, ignore_conflicts=True)
+        self.stdout.write(f"friend requests: {len(requests)}")
+
+    def seed_teams(self, users, count):
+        rng = self.rng
+        taken = set(TeamMember.objects.filter(user__in=users).values_list("user_id", flat=True))
+        free = [u for u in users if u.pk not in taken]
+        rng.shuffle(free)
+        teams = []
+        for n in range(min(count, len(free) // 4)):
+            members = free[n * 4:(n + 1) * 4]
+            team = Team.objects.create(
+                name=f"Bench Team {n}", description="Synthetic team", leader=members[0]
+            )
+            TeamMember.objects.bulk_create([TeamMember(team=team, user=u) for u in members])
+            teams.append((team, members))
+        self.stdout.write(f"teams: {len(teams)}")
+        return teams
+
+    def seed_messages(self, users, teams, count):
+        """
+        Chat history spread over the last 30 days, weighted so a few pairs
+        have long threads. Inserted with bulk_create, so the inbox rows that
+        the post_save signal would maintain are built here afterwards.
+        """
+        rng = self.rng
+        if len(users) < 2:
+            return
+        pairs = [tuple(rng.sample(users, 2)) for _ in range(max(1, len(users)))]
+        weights = [1 / (i + 1) for i in range(len(pairs))]  # zipf-ish thread sizes
+        now = timezone.now()
+        messages, times = [], []
+        for _ in range(count):
+            if teams and rng.random() < 0.2:
+                team, members = rng.choice(teams)
+                message = ChatMessage(sender=rng.choice(members), team=team)
+            else:
+                a, b = rng.choices(pairs, weights)[0]
+                sender, receiver = (a, b) if rng.random() < 0.5 else (b, a)
+                message = ChatMessage(sender=sender, receiver=receiver)
+            message.message = rng.choice(SENTENCES)
+            message.conversation_key = message.build_conversation_key()
+            messages.append(message)
+            times.append(now - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 30)))
+        times.sort()  # ids follow time, as they would live
+        created = ChatMessage.objects.bulk_create(messages, batch_size=1000)
+        # auto_now_add stamps every row with now; spread them out afterwards
+        for message, at in zip(created, times):
+            message.timestamp = at
+        ChatMessage.objects.bulk_update(created, ["timestamp"], batch_size=1000)
+
+        team_users = {team.pk: {u.pk for u in members} for team, members in teams}
+        summaries = {}
+        for message in created:
+            if message.team_id:
+                recipients = team_users[message.team_id]
+            else:
+                recipients = {message.sender_id, message.receiver_id}
+            for user_id in recipients:
+                row = summaries.get((user_id, message.conversation_key))
+                if row is None:
+                    peer_id = None
+                    if not message.team_id:
+                        peer_id = message.receiver_id if user_id == message.sender_id else message.sender_id
+                    row = summaries[(user_id, message.conversation_key)] = ConversationSummary(
+                        user_id=user_id,
+                        conversation_key=message.conversation_key,
+                        peer_id=peer_id,
+                        team_id=message.team_id,
+                    )
+                row.last_message_id = message.pk
+                row.last_timestamp = message.timestamp
+                if user_id == message.sender_id:
+                    row.last_read_message_id = message.pk
+                    row.unread_count = 0
+                else:
+                    row.unread_count += 1
+        ConversationSummary.objects.bulk_create(
+            summaries.values(), batch_size=1000, ignore_conflicts=True
+        )
+        self.stdout.write(f"chat messages: {len(created)} ({len(summaries)} inbox rows)")
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0009_coursevideo_notes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classroomitem',
+            index=models.Index(fields=['classroom', 'completed', '-last_watched_at'], name='classroomitem_continue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videocontextsegment',
+            index=models.Index(fields=['context', 'start_seconds'], name='canteenApp__context_dc1417_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversation_keys(apps, schema_editor):
+    ChatMessage = apps.get_model('canteenApp', 'ChatMessage')
+    batch = []
+    for msg in ChatMessage.objects.only('id', 'sender_id', 'receiver_id', 'team_id').iterator(chunk_size=2000):
+        if msg.team_id:
+            msg.conversation_key = f"t:{msg.team_id}"
+        else:
+            low, high = sorted((msg.sender_id, msg.receiver_id or 0))
+            msg.conversation_key = f"u:{low}:{high}"
+        batch.append(msg)
+        if len(batch) >= 2000:
+            ChatMessage.objects.bulk_update(batch, ['conversation_key'])
+            batch = []
+    if batch:
+        ChatMessage.objects.bulk_update(batch, ['conversation_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0010_classroomitem_continue_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='conversation_key',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_conversation_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['conversation_key', 'timestamp', 'id'], name='chatmessage_conversation_idx'),
+        ),
+    ]
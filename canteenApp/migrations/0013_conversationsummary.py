@@ -0,0 +1,73 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_summaries(apps, schema_editor):
+    """Seed inbox rows from existing history; old messages count as read."""
+    ChatMessage = apps.get_model('canteenApp', 'ChatMessage')
+    TeamMember = apps.get_model('canteenApp', 'TeamMember')
+    Team = apps.get_model('canteenApp', 'Team')
+    ConversationSummary = apps.get_model('canteenApp', 'ConversationSummary')
+
+    team_users = {}
+    for team_id, leader_id in Team.objects.values_list('id', 'leader_id'):
+        team_users[team_id] = {leader_id}
+    for team_id, user_id in TeamMember.objects.values_list('team_id', 'user_id'):
+        team_users.setdefault(team_id, set()).add(user_id)
+
+    latest = {}  # (user_id, key) -> row
+    messages = ChatMessage.objects.order_by('id').values_list(
+        'id', 'sender_id', 'receiver_id', 'team_id', 'timestamp', 'conversation_key'
+    )
+    for msg_id, sender_id, receiver_id, team_id, ts, key in messages.iterator(chunk_size=2000):
+        if team_id:
+            users = team_users.get(team_id, set()) | {sender_id}
+        else:
+            users = {sender_id, receiver_id} - {None}
+        for user_id in users:
+            peer_id = None
+            if not team_id:
+                peer_id = receiver_id if user_id == sender_id else sender_id
+            latest[(user_id, key)] = ConversationSummary(
+                user_id=user_id,
+                conversation_key=key,
+                peer_id=peer_id,
+                team_id=team_id,
+                last_message_id=msg_id,
+                last_timestamp=ts,
+                last_read_message_id=msg_id,
+            )
+    ConversationSummary.objects.bulk_create(latest.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0012_chatupload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('conversation_key', models.CharField(max_length=64)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_read_message_id', models.PositiveBigIntegerField(default=0)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='canteenApp.chatmessage')),
+                ('peer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='canteenApp.team')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-last_timestamp'], name='conversation_inbox_idx')],
+                'unique_together': {('user', 'conversation_key')},
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0013_conversationsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=120),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='interest2',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=120),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='skill2',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=120),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='videokeyword',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=60),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:40
+
+from django.db import IntegrityError, migrations, transaction
+
+
+def normalize_name(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def repoint(model, fk, keep_id, dup_id):
+    """Move `model` rows from dup_id to keep_id; drop the ones keep_id already has."""
+    for pk in list(model.objects.filter(**{fk: dup_id}).values_list('pk', flat=True)):
+        try:
+            with transaction.atomic():
+                model.objects.filter(pk=pk).update(**{fk: keep_id})
+        except IntegrityError:
+            model.objects.filter(pk=pk).delete()
+
+
+def merge_and_fill_name_keys(apps, schema_editor):
+    """
+    Fold rows whose names only differ in case or spacing into the oldest one
+    (repointing everything that references them), then fill name_key.
+    """
+    Field = apps.get_model('canteenApp', 'Field')
+    Interest2 = apps.get_model('canteenApp', 'Interest2')
+    Skill2 = apps.get_model('canteenApp', 'Skill2')
+    VideoKeyword = apps.get_model('canteenApp', 'VideoKeyword')
+    UserProfile = apps.get_model('canteenApp', 'UserProfile')
+    UserInterest = apps.get_model('canteenApp', 'UserInterest')
+    UserSkill = apps.get_model('canteenApp', 'UserSkill')
+    CourseVideo = apps.get_model('canteenApp', 'CourseVideo')
+
+    def through(name):
+        return CourseVideo._meta.get_field(name).remote_field.through
+
+    links = {
+        Interest2: [(UserInterest, 'interest_id'), (through('interests'), 'interest2_id')],
+        Skill2: [(UserSkill, 'skill_id'), (through('skills'), 'skill2_id')],
+        VideoKeyword: [(through('keywords'), 'videokeyword_id')],
+    }
+
+    def merge(model, keep, dup):
+        for link_model, fk in links[model]:
+            repoint(link_model, fk, keep.pk, dup.pk)
+        dup.delete()
+
+    kept = {}
+    for keyword in VideoKeyword.objects.order_by('id'):
+        keep = kept.setdefault(normalize_name(keyword.name), keyword)
+        if keep.pk != keyword.pk:
+            merge(VideoKeyword, keep, keyword)
+
+    for model in (Interest2, Skill2):
+        kept = {}
+        for obj in model.objects.order_by('id'):
+            keep = kept.setdefault((obj.field_id, normalize_name(obj.name)), obj)
+            if keep.pk != obj.pk:
+                merge(model, keep, obj)
+
+    kept = {}
+    for field in Field.objects.order_by('id'):
+        keep = kept.setdefault(normalize_name(field.name), field)
+        if keep.pk == field.pk:
+            continue
+        UserProfile.objects.filter(selected_field_id=field.pk).update(selected_field_id=keep.pk)
+        repoint(through('fields'), 'field_id', keep.pk, field.pk)
+        for model in (Interest2, Skill2):
+            existing = {normalize_name(o.name): o for o in model.objects.filter(field_id=keep.pk)}
+            for obj in model.objects.filter(field_id=field.pk):
+                if normalize_name(obj.name) in existing:
+                    merge(model, existing[normalize_name(obj.name)], obj)
+                else:
+                    model.objects.filter(pk=obj.pk).update(field_id=keep.pk)
+        field.delete()
+
+    for model in (Field, Interest2, Skill2, VideoKeyword):
+        rows = list(model.objects.only('id', 'name'))
+        for obj in rows:
+            obj.name_key = normalize_name(obj.name)
+        model.objects.bulk_update(rows, ['name_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0014_taxonomy_name_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_and_fill_name_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0015_merge_taxonomy_name_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='field',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=120, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='videokeyword',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=60, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='interest2',
+            constraint=models.UniqueConstraint(fields=('field', 'name_key'), name='interest2_name_key_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='skill2',
+            constraint=models.UniqueConstraint(fields=('field', 'name_key'), name='skill2_name_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0017_userprofile_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='photo_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canteenApp', '0018_userprofile_photo_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatupload',
+            name='message',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='canteenApp.chatmessage'),
+        ),
+    ]
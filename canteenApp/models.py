@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
@@ -5,8 +7,25 @@ from django.conf import settings
 from urllib.parse import urlparse, parse_qs
 
 
-class Field(models.Model):
+def normalize_name(name):
+    """Lookup key for taxonomy names: casefolded, whitespace collapsed."""
+    return " ".join((name or "").split()).casefold()
+
+
+class NameKeyMixin:
+    """Keeps `name_key` (see normalize_name) in step with `name` on save()."""
+
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_key"}
+        super().save(*args, **kwargs)
+
+
+class Field(NameKeyMixin, models.Model):
     name = models.CharField(max_length=120, unique=True , default="IT")
+    name_key = models.CharField(max_length=120, unique=True, editable=False)
     slug = models.SlugField(max_length=140, unique=True, blank=True)
 
     class Meta:
@@ -46,6 +65,11 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     full_name = models.CharField(max_length=100, blank=True, null=True)
     photo = models.ImageField(upload_to="profile_photos/", blank=True, null=True)
+    # {variant: {format: storage name}} written by canteenApp.images
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # sha256 of the latest uploaded photo; a processing job whose upload is
+    # no longer the latest one does not overwrite the newer result
+    photo_source = models.CharField(max_length=64, blank=True, default="", editable=False)
     semester = models.PositiveIntegerField(
         choices=SEMESTER_CHOICES, blank=True, null=True
     )
@@ -76,25 +100,33 @@ class UserProfile(models.Model):
         return self.user.username
 
 
-class Interest2(models.Model):
+class Interest2(NameKeyMixin, models.Model):
     name = models.CharField(max_length=120)
+    name_key = models.CharField(max_length=120, editable=False)
     field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="interests")
 
     class Meta:
         unique_together = ("name", "field")
         ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["field", "name_key"], name="interest2_name_key_uniq"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.field.name})"
 
 
-class Skill2(models.Model):
+class Skill2(NameKeyMixin, models.Model):
     name = models.CharField(max_length=120)
+    name_key = models.CharField(max_length=120, editable=False)
     field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="skills")
 
     class Meta:
         unique_together = ("name", "field")
         ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["field", "name_key"], name="skill2_name_key_uniq"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.field.name})"
@@ -151,8 +183,9 @@ class UserSkill(models.Model):
 # completet profile model completed here---------------------------------------
 
 
-class VideoKeyword(models.Model):
+class VideoKeyword(NameKeyMixin, models.Model):
     name = models.CharField(max_length=60, unique=True)
+    name_key = models.CharField(max_length=60, unique=True, editable=False)
 
     class Meta:
         ordering = ["name"]
@@ -352,6 +385,35 @@ class ChatMessage(models.Model):
     message = models.TextField()
     file = models.FileField(upload_to="chat_files/", blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    # "u:<low id>:<high id>" for private threads, "t:<team id>" for team chat
+    conversation_key = models.CharField(max_length=64, editable=False, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["conversation_key", "timestamp", "id"],
+                name="chatmessage_conversation_idx",
+            ),
+        ]
+
+    @staticmethod
+    def private_key(user_a_id, user_b_id):
+        low, high = sorted((int(user_a_id or 0), int(user_b_id or 0)))
+        return f"u:{low}:{high}"
+
+    @staticmethod
+    def team_key(team_id):
+        return f"t:{int(team_id)}"
+
+    def build_conversation_key(self):
+        if self.team_id:
+            return self.team_key(self.team_id)
+        return self.private_key(self.sender_id, self.receiver_id)
+
+    def save(self, *args, **kwargs):
+        if not self.conversation_key:
+            self.conversation_key = self.build_conversation_key()
+        super().save(*args, **kwargs)
 
     def __str__(self):
         if self.team:
@@ -359,6 +421,79 @@ class ChatMessage(models.Model):
         return f"Private Chat - {self.sender.username} → {self.receiver.username}"
 
 
+class ConversationSummary(models.Model):
+    """
+    One row per (user, conversation): what the inbox shows. Kept up to date
+    on every ChatMessage insert and read receipt (see inbox.py), so the inbox
+    never has to aggregate over ChatMessage.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="conversations"
+    )
+    conversation_key = models.CharField(max_length=64)
+    peer = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )  # private chat
+    team = models.ForeignKey(
+        Team, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )  # team chat
+    last_message = models.ForeignKey(
+        ChatMessage, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_message_id = models.PositiveBigIntegerField(default=0)  # read cursor
+
+    class Meta:
+        unique_together = ("user", "conversation_key")
+        indexes = [
+            models.Index(fields=["user", "-last_timestamp"], name="conversation_inbox_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} · {self.conversation_key} ({self.unread_count} unread)"
+
+
+class ChatUpload(models.Model):
+    """
+    A chunked, resumable upload of a chat attachment. Chunks are written to
+    default_storage as separate parts and assembled on finalize under a
+    content-hashed name, so identical files are stored once.
+    """
+    PENDING = "pending"
+    COMPLETE = "complete"
+    STATUS_CHOICES = [(PENDING, "Pending"), (COMPLETE, "Complete")]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="chat_uploads"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    # [[offset, length, stored name], ...] of the parts written so far, in order
+    parts = models.JSONField(default=list, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    file = models.FileField(upload_to="chat_files/", max_length=255, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # the message posted on finalize, so a repeated finalize returns it
+    message = models.OneToOneField(
+        ChatMessage, on_delete=models.SET_NULL, null=True, blank=True, related_name="upload"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def part_name(self, offset, attempt):
+        return f"chat_uploads/{self.id}/{offset:012d}.{attempt}.part"
+
+    def part_names(self):
+        return [part[2] for part in self.parts]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size}) - {self.owner}"
+
+
 class ChatMessageAi(models.Model):
     role = models.CharField(max_length=20)  # 'system', 'user', 'assistant'
     content = models.TextField()
@@ -415,6 +550,13 @@ class ClassroomItem(models.Model):
     class Meta:
         unique_together = ("classroom", "video")
         ordering = ["-added_at"]
+        indexes = [
+            # continue-watching feed: in-progress items, most recently watched first
+            models.Index(
+                fields=["classroom", "completed", "-last_watched_at"],
+                name="classroomitem_continue_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.classroom} → {self.video}"
@@ -446,6 +588,9 @@ class VideoContextSegment(models.Model):
 
     class Meta:
         ordering = ["start_seconds"]
+        indexes = [
+            models.Index(fields=["context", "start_seconds"]),
+        ]
 
     def __str__(self):
         return f"{self.context.video.title} [{self.start_seconds}-{self.end_seconds}]"
@@ -0,0 +1,295 @@
+# Per-request profiling: query count, DB time, serializer time and response
+# size per view, exported in Prometheus text format at /metrics.
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+from .cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in QUERY_BUDGET_STRICT mode (CI) when a view goes over budget."""
+
+
+class RequestProfile:
+    __slots__ = ("started", "queries", "db_seconds", "serializer_seconds", "serializer_depth")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+
+
+# --- collection ---
+
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper hook: counts and times queries of the current request."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_seconds += time.perf_counter() - started
+
+
+def install_query_wrapper(conn):
+    if record_query not in conn.execute_wrappers:
+        conn.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def profile_new_connection(sender, connection, **kwargs):
+    # every connection, including the ones sync_to_async threads open for
+    # async views; the request is found through the contextvar
+    if getattr(settings, "REQUEST_PROFILING", False):
+        install_query_wrapper(connection)
+
+
+def _timed_data(prop):
+    def data(self):
+        profile = _current.get()
+        if profile is None:
+            return prop.fget(self)
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            profile.serializer_depth -= 1
+            if profile.serializer_depth == 0:  # nested .data is already counted
+                profile.serializer_seconds += time.perf_counter() - started
+    data._profiled = True
+    return property(data)
+
+
+def instrument_serializers():
+    """Time `.data` of every DRF serializer (once RequestProfilingMiddleware is loaded)."""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, "_profiled", False):
+            cls.data = _timed_data(cls.data)
+
+
+# --- aggregation ---
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = defaultdict(int)  # status -> count
+        self.duration_buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.response_bytes = 0
+        self.budget_exceeded = 0
+
+
+_metrics = defaultdict(ViewMetrics)  # (view, method) -> ViewMetrics
+_metrics_lock = threading.Lock()
+
+
+def observe(view, method, status, duration, profile, size, over_budget):
+    with _metrics_lock:
+        m = _metrics[(view, method)]
+        m.requests[status] += 1
+        m.duration_buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+        m.duration_sum += duration
+        m.queries += profile.queries
+        m.db_seconds += profile.db_seconds
+        m.serializer_seconds += profile.serializer_seconds
+        m.response_bytes += size
+        m.budget_exceeded += over_budget
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def metrics_snapshot():
+    """{(view, method): ViewMetrics fields as a plain dict}, copied under the lock."""
+    with _metrics_lock:
+        snapshot = {key: vars(m).copy() for key, m in _metrics.items()}
+        for data in snapshot.values():
+            data["requests"] = dict(data["requests"])
+            data["duration_buckets"] = list(data["duration_buckets"])
+    return snapshot
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route or "unnamed"
+
+
+def response_size(response):
+    if response.streaming:
+        return int(response.get("Content-Length") or 0)
+    return len(response.content)
+
+
+def check_budget(view, profile):
+    budget = getattr(settings, "QUERY_BUDGETS", {}).get(view)
+    if budget is None or profile.queries <= budget:
+        return False
+    message = f"{view} ran {profile.queries} queries (budget {budget})"
+    if getattr(settings, "QUERY_BUDGET_STRICT", False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+    return True
+
+
+def server_timing(profile, total):
+    return ", ".join(
+        [
+            f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.queries} queries"',
+            f"ser;dur={profile.serializer_seconds * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ]
+    )
+
+
+class RequestProfilingMiddleware:
+    """
+    Records query count, DB and serializer time and response size of each
+    request into the /metrics counters, adds a Server-Timing header when
+    settings.SERVER_TIMING, and checks settings.QUERY_BUDGETS
+    ({url name: max queries}). Serializers are only instrumented once this
+    middleware is loaded, i.e. with REQUEST_PROFILING on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        instrument_serializers()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        install_query_wrapper(connection)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        view = view_name(request)
+        over_budget = check_budget(view, profile)
+        observe(
+            view, request.method, response.status_code, total, profile,
+            response_size(response), over_budget,
+        )
+        if getattr(settings, "SERVER_TIMING", False):
+            response["Server-Timing"] = server_timing(profile, total)
+        return response
+
+
+# --- export ---
+
+
+def _labels(**labels):
+    return ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels.items())
+
+
+def render_metrics():
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    snapshot = metrics_snapshot()
+    family("canteen_http_requests_total", "counter", "Requests by view, method and status.")
+    for (view, method), m in sorted(snapshot.items()):
+        for status, count in sorted(m["requests"].items()):
+            lines.append(
+                f"canteen_http_requests_total{{{_labels(view=view, method=method, status=status)}}} {count}"
+            )
+
+    family("canteen_http_request_duration_seconds", "histogram", "Request latency.")
+    for (view, method), m in sorted(snapshot.items()):
+        labels = _labels(view=view, method=method)
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS + ("+Inf",), m["duration_buckets"]):
+            cumulative += count
+            lines.append(
+                f'canteen_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f"canteen_http_request_duration_seconds_sum{{{labels}}} {m['duration_sum']:.6f}")
+        lines.append(f"canteen_http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+    for name, field, help_text in (
+        ("canteen_db_queries_total", "queries", "SQL queries run by the view."),
+        ("canteen_db_seconds_total", "db_seconds", "Time spent in SQL queries."),
+        ("canteen_serializer_seconds_total", "serializer_seconds", "Time spent in serializer .data."),
+        ("canteen_response_bytes_total", "response_bytes", "Response body bytes."),
+        ("canteen_query_budget_exceeded_total", "budget_exceeded", "Requests over QUERY_BUDGETS."),
+    ):
+        family(name, "counter", help_text)
+        for (view, method), m in sorted(snapshot.items()):
+            value = m[field]
+            value = f"{value:.6f}" if isinstance(value, float) else value
+            lines.append(f"{name}{{{_labels(view=view, method=method)}}} {value}")
+
+    family("canteen_cache_events_total", "counter", "Cache-aside events (canteenApp.cache).")
+    for namespace, events in sorted(cache_stats().items()):
+        for event, count in sorted(events.items()):
+            lines.append(f"canteen_cache_events_total{{{_labels(namespace=namespace, event=event)}}} {count:g}")
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    GET /metrics → Prometheus text format (this process only). With
+    settings.METRICS_TOKEN set it needs `Authorization: Bearer <token>`;
+    without one it is only served when DEBUG is on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
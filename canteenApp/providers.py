@@ -0,0 +1,358 @@
+# Outbound API providers (Gemini, ElevenLabs, Hugging Face, GitHub OAuth).
+# Credentials come from the environment, or from the .env file next to
+# manage.py (python-dotenv). Each provider is built on first use, along with
+# its own pooled httpx client, and rebuilt when its configuration changes
+# (the old client is closed once the requests using it are done).
+# Editing .env therefore rotates a key without a restart. With
+# AI_FAKE_PROVIDERS=1, Gemini and ElevenLabs answer locally for offline
+# load tests.
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import httpx
+from django.conf import settings
+from dotenv import load_dotenv
+
+from .httpclients import UPSTREAM_LIMITS, UPSTREAM_TIMEOUT, async_client
+
+ENV_RELOAD_INTERVAL = 5.0  # seconds between .env mtime checks
+
+
+class ProviderError(Exception):
+    """The upstream call failed or returned something unusable."""
+
+
+class ProviderNotConfigured(ProviderError):
+    """A credential the provider needs is not set."""
+
+
+class Provider:
+    """
+    One upstream API. `env` names the variables (with defaults) it is built
+    from; `lease()` / `aclient()` give the reusable HTTP clients to call it
+    with. Subclasses add the calls themselves.
+    """
+
+    name = ""
+    env = {}  # variable -> default
+
+    def __init__(self, config):
+        self.config = config
+        self._client = None
+        self._leases = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def config_from_env(cls):
+        return tuple((key, os.environ.get(key, default)) for key, default in cls.env.items())
+
+    def setting(self, key, required=True):
+        value = dict(self.config)[key]
+        if required and not value:
+            raise ProviderNotConfigured(f"{self.name}: {key} is not set")
+        return value
+
+    def transport(self):
+        return None  # httpx default (network)
+
+    @contextmanager
+    def lease(self):
+        """The pooled sync httpx.Client of this provider, for one request."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=UPSTREAM_TIMEOUT, limits=UPSTREAM_LIMITS, transport=self.transport()
+                )
+            self._leases += 1
+            client = self._client
+        try:
+            yield client
+        finally:
+            with self._lock:
+                self._leases -= 1
+                done = self._retired and self._leases == 0
+            if done:
+                self._close()
+
+    def retire(self):
+        """Replaced in the registry: close the client now, or after its last lease."""
+        with self._lock:
+            self._retired = True
+            done = self._leases == 0
+        if done:
+            self._close()
+
+    def _close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    def aclient(self):
+        """Async client for the running loop (the shared pool, see httpclients)."""
+        return async_client()
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+    env = {
+        "GEMINI_API_KEY": "",
+        "GEMINI_MODEL": "gemini-2.0-flash-lite",
+        "GEMINI_API_BASE": "https://generativelanguage.googleapis.com/v1beta",
+    }
+
+    def request(self, payload):
+        return {
+            "url": f"{self.setting('GEMINI_API_BASE')}/models/{self.setting('GEMINI_MODEL')}:generateContent",
+            # header, not ?key=: keeps the key out of URLs and their logs
+            "headers": {"Content-Type": "application/json", "x-goog-api-key": self.setting("GEMINI_API_KEY")},
+            "json": payload,
+        }
+
+    @staticmethod
+    def reply_text(response):
+        if response.status_code != 200:
+            raise ProviderError(response.text)
+        try:
+            return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError) as exc:
+            raise ProviderError(f"unexpected response: {exc!r}")
+
+    def generate(self, payload):
+        """Reply text for a generateContent body."""
+        try:
+            with self.lease() as client:
+                return self.reply_text(client.post(**self.request(payload)))
+        except httpx.HTTPError as exc:
+            raise ProviderError(str(exc))
+
+    async def agenerate(self, payload):
+        try:
+            return self.reply_text(await self.aclient().post(**self.request(payload)))
+        except httpx.HTTPError as exc:
+            raise ProviderError(str(exc))
+
+
+class ElevenLabsProvider(Provider):
+    name = "elevenlabs"
+    env = {
+        "ELEVENLABS_API_KEY": "",
+        "ELEVENLABS_VOICE_ID": "jqcCZkN6Knx8BJ5TBdYR",
+        "ELEVENLABS_API_BASE": "https://api.elevenlabs.io/v1",
+    }
+
+    def request(self, text):
+        return {
+            "url": f"{self.setting('ELEVENLABS_API_BASE')}/text-to-speech/{self.setting('ELEVENLABS_VOICE_ID')}",
+            "headers": {"Content-Type": "application/json", "xi-api-key": self.setting("ELEVENLABS_API_KEY")},
+            "json": {
+                "text": f"<speak><prosody rate='85%' pitch='0%' volume='100%'>{text}</prosody></speak>",
+                "voice_settings": {"stability": 0.4, "similarity_boost": 0.8},
+            },
+        }
+
+    def speech(self, text):
+        """Audio bytes for `text`, or None if TTS is unavailable (the reply still goes out)."""
+        try:
+            with self.lease() as client:
+                response = client.post(**self.request(text))
+        except (httpx.HTTPError, ProviderNotConfigured):
+            return None
+        return response.content if response.status_code == 200 else None
+
+    async def aspeech(self, text):
+        try:
+            response = await self.aclient().post(**self.request(text))
+        except (httpx.HTTPError, ProviderNotConfigured):
+            return None
+        return response.content if response.status_code == 200 else None
+
+
+class HuggingFaceProvider(Provider):
+    name = "huggingface"
+    env = {
+        "HF_API_KEY": "",
+        "HF_API_URL": "https://router.huggingface.co/v1/chat/completions",
+    }
+
+    def chat(self, payload):
+        """OpenAI-style chat completion body → response JSON."""
+        try:
+            with self.lease() as client:
+                response = client.post(
+                    self.setting("HF_API_URL"),
+                    headers={"Authorization": f"Bearer {self.setting('HF_API_KEY')}"},
+                    json=payload,
+                )
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            raise ProviderError(str(exc))
+
+
+class GitHubOAuthProvider(Provider):
+    name = "github"
+    env = {
+        "GITHUB_CLIENT_ID": "",
+        "GITHUB_CLIENT_SECRET": "",
+        "GITHUB_TOKEN_URL": "https://github.com/login/oauth/access_token",
+    }
+
+    def request(self, code):
+        return {
+            "url": self.setting("GITHUB_TOKEN_URL"),
+            "data": {
+                "client_id": self.setting("GITHUB_CLIENT_ID"),
+                "client_secret": self.setting("GITHUB_CLIENT_SECRET"),
+                "code": code,
+            },
+            "headers": {"Accept": "application/json"},
+        }
+
+    def exchange_code(self, code):
+        """Access token for an OAuth `code`, or None."""
+        try:
+            with self.lease() as client:
+                return client.post(**self.request(code)).json().get("access_token")
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    async def aexchange_code(self, code):
+        try:
+            return (await self.aclient().post(**self.request(code))).json().get("access_token")
+        except (httpx.HTTPError, ValueError):
+            return None
+
+
+# --- fakes (AI_FAKE_PROVIDERS=1) ---
+
+
+class FakeTransportMixin:
+    """
+    Same request building and response parsing as the real provider, but
+    answered in-process by an httpx MockTransport after FAKE_PROVIDER_LATENCY_MS,
+    so load tests exercise the whole view without network or quota. Each fake
+    defines respond(request) → httpx.Response.
+    """
+
+    env_fake = {"FAKE_PROVIDER_LATENCY_MS": "200"}
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._aclients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def config_from_env(cls):
+        base = dict(super().config_from_env())
+        base.update({key: base.get(key) or "fake" for key in cls.env if key.endswith("_KEY")})
+        base.update((key, os.environ.get(key, default)) for key, default in cls.env_fake.items())
+        return tuple(base.items())
+
+    def latency(self):
+        return int(self.setting("FAKE_PROVIDER_LATENCY_MS", required=False) or 0) / 1000
+
+    def transport(self):
+        def handler(request):
+            time.sleep(self.latency())
+            return self.respond(request)
+        return httpx.MockTransport(handler)
+
+    def aclient(self):
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            async def handler(request):
+                await asyncio.sleep(self.latency())
+                return self.respond(request)
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            self._aclients[loop] = client
+        return client
+
+
+class FakeGeminiProvider(FakeTransportMixin, GeminiProvider):
+    def respond(self, request):
+        contents = json.loads(request.content).get("contents") or [{}]
+        asked = contents[-1].get("parts", [{}])[0].get("text", "")
+        text = f"(offline reply) You asked: {asked[:200]}"
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+class FakeElevenLabsProvider(FakeTransportMixin, ElevenLabsProvider):
+    def respond(self, request):
+        return httpx.Response(200, content=b"ID3" + b"\0" * 1024, headers={"Content-Type": "audio/mpeg"})
+
+
+# --- registry ---
+
+
+class Registry:
+    """
+    Provider instances by name, built on first use. Each get() compares the
+    provider's current environment with the one it was built from and
+    rebuilds it on a change, retiring the old one; the .env file is re-read
+    (overriding what it set before) when its mtime changes, checked every
+    ENV_RELOAD_INTERVAL.
+    """
+
+    def __init__(self, providers, fakes):
+        self.providers = providers
+        self.fakes = fakes
+        self.instances = {}
+        self.lock = threading.Lock()
+        self.env_mtime = None
+        self.env_checked = 0.0
+
+    def env_file(self):
+        return getattr(settings, "ENV_FILE", settings.BASE_DIR / ".env")
+
+    def reload_env(self):
+        now = time.monotonic()
+        if now - self.env_checked < ENV_RELOAD_INTERVAL:
+            return
+        self.env_checked = now
+        try:
+            mtime = os.stat(self.env_file()).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self.env_mtime:
+            # settings loaded it without override; here it is the newer source
+            load_dotenv(self.env_file(), override=self.env_mtime is not None)
+            self.env_mtime = mtime
+
+    def provider_class(self, name):
+        if os.environ.get("AI_FAKE_PROVIDERS", "0") == "1" and name in self.fakes:
+            return self.fakes[name]
+        return self.providers[name]
+
+    def get(self, name):
+        replaced = None
+        with self.lock:
+            self.reload_env()
+            cls = self.provider_class(name)
+            config = cls.config_from_env()
+            current = self.instances.get(name)
+            if current is None or type(current) is not cls or current.config != config:
+                replaced, current = current, cls(config)
+                self.instances[name] = current
+        if replaced is not None:
+            replaced.retire()  # in-flight requests keep its client until they finish
+        return current
+
+
+registry = Registry(
+    providers={
+        p.name: p for p in (GeminiProvider, ElevenLabsProvider, HuggingFaceProvider, GitHubOAuthProvider)
+    },
+    fakes={p.name: p for p in (FakeGeminiProvider, FakeElevenLabsProvider)},
+)
+
+
+def provider(name):
+    """The current provider `name` ("gemini", "elevenlabs", "huggingface", "github")."""
+    return registry.get(name)
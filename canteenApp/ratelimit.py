@@ -0,0 +1,297 @@
+# Rate and concurrency limits for views that call paid upstream APIs (the AI
+# tutor). Two layers:
+# - a per-client token bucket in the cache (shared by every process on Redis),
+#   and
+# - a cap on concurrent upstream calls with a short wait queue, per process
+#   (AI_TUTOR_CONCURRENCY_PER_PROCESS).
+# Both answer 429 with Retry-After instead of letting requests pile up.
+import asyncio
+import contextlib
+import math
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.http import JsonResponse
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import CookieJWTAuthentication
+
+
+class Saturated(Exception):
+    """No upstream slot came free in time."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+# --- token bucket ---
+
+# Refill and spend in one step on the server. The state is a plain hash next
+# to the cache's pickled values; tokens come back as a string because Redis
+# truncates Lua numbers to integers.
+REDIS_TAKE = """
+local burst, rate, now, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens, last = tonumber(state[1]), tonumber(state[2])
+if tokens == nil or last == nil then
+    tokens, last = burst, now
+end
+tokens = math.min(burst, tokens + math.max(0, now - last) * rate)
+local spent = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    spent = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {spent, tostring(tokens)}
+"""
+
+
+class TokenBucket:
+    """
+    `burst` tokens per client, refilled continuously at `per_minute` per
+    minute; each request spends one. The state, (tokens, last refill), is
+    one cache entry per client, read and written atomically: by a Lua
+    script on Redis (shared by every process), under a lock elsewhere
+    (consistent within a process, which is all locmem is anyway).
+    """
+
+    def __init__(self, scope, per_minute, burst):
+        self.scope = scope
+        self.burst = max(1, burst)
+        self.rate = max(per_minute, 1e-9) / 60.0  # tokens per second
+        # an entry idle this long has refilled completely: let it expire
+        self.ttl = math.ceil(self.burst / self.rate) + 1
+        self.lock = threading.Lock()
+        self._script = None
+
+    def key(self, ident):
+        return f"ratelimit:{self.scope}:{ident}"
+
+    def refill(self, state, now):
+        """(tokens, last) after refilling `state` (None: a full bucket) up to `now`."""
+        if state is None:
+            return float(self.burst), now
+        tokens, last = state
+        return min(float(self.burst), tokens + max(0.0, now - last) * self.rate), now
+
+    def retry_after(self, tokens):
+        """Seconds until `tokens` reaches one."""
+        return max(1, math.ceil((1 - tokens) / self.rate))
+
+    def _take_redis(self, backend, ident, now):
+        key = backend.make_and_validate_key(self.key(ident))
+        client = backend._cache.get_client(key, write=True)
+        if self._script is None:
+            self._script = client.register_script(REDIS_TAKE)
+        spent, tokens = self._script(
+            keys=[key], args=[self.burst, repr(self.rate), repr(now), self.ttl], client=client
+        )
+        return None if int(spent) else self.retry_after(float(tokens))
+
+    def _take_locked(self, backend, ident, now):
+        key = self.key(ident)
+        with self.lock:
+            tokens, last = self.refill(backend.get(key), now)
+            spent = tokens >= 1
+            if spent:
+                tokens -= 1
+            backend.set(key, (tokens, last), self.ttl)
+        return None if spent else self.retry_after(tokens)
+
+    def take(self, ident, now=None):
+        """Spend a token of `ident`: None if there was one, else seconds to wait."""
+        now = time.time() if now is None else now
+        backend = caches["default"]
+        if isinstance(backend, RedisCache):
+            return self._take_redis(backend, ident, now)
+        return self._take_locked(backend, ident, now)
+
+    async def atake(self, ident, now=None):
+        """take() for async views: in memory with locmem, else in a worker thread."""
+        if isinstance(caches["default"], LocMemCache):
+            return self.take(ident, now)
+        return await sync_to_async(self.take, thread_sensitive=False)(ident, now)
+
+
+# --- concurrency ---
+
+
+class ConcurrencyLimit:
+    """
+    At most `limit` holders at once in this process; up to `max_queue`
+    more wait for a slot, for `timeout` seconds at most. Sync callers block
+    on a condition; async callers poll with a short backoff, so both share
+    one count.
+    """
+
+    def __init__(self, limit, max_queue, timeout):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.cond = threading.Condition()
+
+    def _try(self):
+        if self.active < self.limit:
+            self.active += 1
+            return True
+        return False
+
+    def release(self):
+        with self.cond:
+            self.active -= 1
+            self.cond.notify()
+
+    def _enqueue(self):
+        if self.waiting >= self.max_queue:
+            raise Saturated(self.retry_after())
+        self.waiting += 1
+
+    def retry_after(self):
+        return max(1, math.ceil(self.timeout))
+
+    @contextlib.contextmanager
+    def slot(self):
+        with self.cond:
+            if not self._try():
+                self._enqueue()
+                try:
+                    acquired = self.cond.wait_for(self._try, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not acquired:
+                    raise Saturated(self.retry_after())
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextlib.asynccontextmanager
+    async def aslot(self):
+        with self.cond:
+            acquired = self._try()
+            if not acquired:
+                self._enqueue()
+        if not acquired:
+            deadline = time.monotonic() + self.timeout
+            delay = 0.005
+            try:
+                while not acquired:
+                    if time.monotonic() >= deadline:
+                        raise Saturated(self.retry_after())
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+                    with self.cond:
+                        acquired = self._try()
+            finally:
+                with self.cond:
+                    self.waiting -= 1
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# --- the AI tutor ---
+
+
+def _ident(request, token):
+    if token is not None:
+        return f"user:{token[jwt_settings.USER_ID_CLAIM]}"
+    addr = request.META.get("REMOTE_ADDR", "")
+    proxies = getattr(settings, "NUM_PROXIES", 0)
+    if proxies:
+        forwarded = [a.strip() for a in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if a.strip()]
+        if len(forwarded) >= proxies:
+            addr = forwarded[-proxies]
+    return f"ip:{addr}"
+
+
+def client_ident(request):
+    """"user:<id>" for a valid access cookie (token check only, no query), else "ip:<addr>"."""
+    token = None
+    raw_token = request.COOKIES.get("access_token")
+    if raw_token:
+        try:
+            token = CookieJWTAuthentication().get_validated_token(raw_token)
+        except Exception:
+            pass
+    return _ident(request, token)
+
+
+async def aclient_ident(request):
+    """client_ident() through the async revocation check."""
+    token = None
+    raw_token = request.COOKIES.get("access_token")
+    if raw_token:
+        try:
+            token = await CookieJWTAuthentication().aget_validated_token(raw_token)
+        except Exception:
+            pass
+    return _ident(request, token)
+
+
+tutor_bucket = TokenBucket(
+    "ai-tutor",
+    getattr(settings, "AI_TUTOR_RATE_PER_MINUTE", 6),
+    getattr(settings, "AI_TUTOR_BURST", 3),
+)
+tutor_upstream = ConcurrencyLimit(
+    getattr(settings, "AI_TUTOR_CONCURRENCY_PER_PROCESS", 8),
+    getattr(settings, "AI_TUTOR_MAX_QUEUE", 16),
+    getattr(settings, "AI_TUTOR_QUEUE_TIMEOUT", 10.0),
+)
+
+
+def too_many_requests(retry_after, reason):
+    response = JsonResponse({"error": reason, "retry_after": retry_after}, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def limit_ai_tutor(view):
+    """Rate-limit POSTs to a sync AI tutor view and hold an upstream slot while it runs."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "POST":
+            return view(request, *args, **kwargs)
+        retry_after = tutor_bucket.take(client_ident(request))
+        if retry_after is not None:
+            return too_many_requests(retry_after, "Too many requests, slow down.")
+        try:
+            with tutor_upstream.slot():
+                return view(request, *args, **kwargs)
+        except Saturated as exc:
+            return too_many_requests(exc.retry_after, "The tutor is busy, try again shortly.")
+
+    return wrapper
+
+
+def alimit_ai_tutor(view):
+    """limit_ai_tutor for the async view."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "POST":
+            return await view(request, *args, **kwargs)
+        retry_after = await tutor_bucket.atake(await aclient_ident(request))
+        if retry_after is not None:
+            return too_many_requests(retry_after, "Too many requests, slow down.")
+        try:
+            async with tutor_upstream.aslot():
+                return await view(request, *args, **kwargs)
+        except Saturated as exc:
+            return too_many_requests(exc.retry_after, "The tutor is busy, try again shortly.")
+
+    return wrapper
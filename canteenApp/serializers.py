@@ -1,16 +1,66 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from .images import photo_url, set_profile_photo, variant_urls
 from .models import *
 User = get_user_model()
 
 
 # serializers here
+def _url_builder(serializer):
+    request = serializer.context.get("request")
+    return request.build_absolute_uri if request is not None else None
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
+    photo_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = UserProfile
-        fields = "__all__"
+        exclude = ["photo_source"]
+
+    def get_photo_variants(self, obj):
+        return variant_urls(obj.photo_variants, _url_builder(self))
+
+
+class UserProfileUpdateSerializer(serializers.ModelSerializer):
+    """
+    Partial update of the user's own profile. Only the editable columns are
+    accepted (not user or selected_field), only the ones whose value changed
+    are written, and a new photo is processed (canteenApp.images) in the
+    background after commit; `"photo": null` removes the photo.
+    """
+
+    class Meta:
+        model = UserProfile
+        exclude = ["id", "user", "selected_field", "photo_variants", "photo_source"]
+
+    def validate_photo(self, photo):
+        limit = getattr(settings, "PROFILE_PHOTO_MAX_BYTES", 5 * 1024 * 1024)
+        if photo is not None and photo.size > limit:
+            raise serializers.ValidationError(f"Photo is larger than {limit // (1024 * 1024)} MB.")
+        return photo
+
+    def update(self, instance, validated_data):
+        has_photo = "photo" in validated_data
+        photo = validated_data.pop("photo", None)
+        if photo is None and not (instance.photo or instance.photo_source):
+            has_photo = False  # no photo to remove
+        self.changed = [
+            name for name, value in validated_data.items() if getattr(instance, name) != value
+        ]
+        for name in self.changed:
+            setattr(instance, name, validated_data[name])
+        self.photo_pending = photo is not None
+        if has_photo:
+            set_profile_photo(instance, photo, self.changed)
+            if photo is None:
+                self.changed.append("photo")
+        elif self.changed:
+            instance.save(update_fields=self.changed)
+        return instance
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,7 +86,7 @@ class FriendRequestCreateSerializer(serializers.ModelSerializer):
 class PeerSerializer(serializers.ModelSerializer):
     skills = serializers.SerializerMethodField()
     interests = serializers.SerializerMethodField()
-    photo = serializers.ImageField(source="profile.photo", read_only=True)
+    photo = serializers.SerializerMethodField()
     semester = serializers.IntegerField(source="profile.semester", read_only=True)
     faculty = serializers.CharField(source="profile.faculty", read_only=True)
     year = serializers.IntegerField(source="profile.year", read_only=True)
@@ -54,6 +104,14 @@ class PeerSerializer(serializers.ModelSerializer):
             "interests",
         ]
 
+    def get_photo(self, obj):
+        profile = getattr(obj, "profile", None)
+        if profile is None:
+            return None
+        url = photo_url(profile.photo.name, profile.photo_variants, "small")
+        build = _url_builder(self)
+        return build(url) if url and build else url
+
     def get_skills(self, obj):
         if hasattr(obj, "portfolio"):
             return [skill.name for skill in obj.portfolio.skills.all()]
@@ -1,9 +1,50 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, UserInterest, UserSkill, ChatMessage, CourseVideo, VideoKeyword, Field, Interest2, Skill2
+from .cache import CATALOG_NAMESPACE, TAXONOMY_NAMESPACE, invalidate_on
+from .consumers import broadcast_chat_message, message_recipient_ids
+from .inbox import record_message
+from .authentication import forget_user, forget_photo_url
+from .bootstrap import forget_state
 
 
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
     UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    forget_state(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def forget_cached_profile_user(sender, instance, **kwargs):
+    forget_user(instance.user_id)
+    forget_photo_url(instance.user_id)
+    forget_state(instance.user_id)
+
+
+@receiver(post_save, sender=UserInterest)
+@receiver(post_delete, sender=UserInterest)
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+def forget_cached_selection(sender, instance, **kwargs):
+    forget_state(instance.user_id)
+
+
+@receiver(post_save, sender=ChatMessage)
+def push_chat_message(sender, instance, created, **kwargs):
+    if created:
+        recipient_ids = message_recipient_ids(instance)
+        record_message(instance, recipient_ids)
+        transaction.on_commit(lambda: broadcast_chat_message(instance, recipient_ids))
+
+
+invalidate_on(CATALOG_NAMESPACE, CourseVideo, VideoKeyword, Field, Interest2, Skill2)
+invalidate_on(TAXONOMY_NAMESPACE, Field, Interest2, Skill2, VideoKeyword)
@@ -0,0 +1,88 @@
+# Opt-in SQLite high-concurrency profile (settings.SQLITE_HIGH_CONCURRENCY).
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def enabled():
+    return getattr(settings, "SQLITE_HIGH_CONCURRENCY", False) and connection.vendor == "sqlite"
+
+
+def pragmas():
+    return [
+        "PRAGMA journal_mode=WAL",
+        # with WAL, NORMAL only syncs at checkpoints: still corruption safe
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(getattr(settings, 'SQLITE_BUSY_TIMEOUT_MS', 20000))}",
+        f"PRAGMA mmap_size={int(getattr(settings, 'SQLITE_MMAP_SIZE', 0))}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def apply_pragmas(cursor):
+    for pragma in pragmas():
+        cursor.execute(pragma)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite" and getattr(settings, "SQLITE_HIGH_CONCURRENCY", False):
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor)
+
+
+class SingleWriter:
+    """
+    In-process write queue: callables submitted from any thread run one at a
+    time on a dedicated thread (with its own connection), and the caller
+    blocks for the result. SQLite allows a single writer anyway; queueing the
+    writes here, instead of letting threads race for the lock, means they
+    never hit "database is locked" or a deadlocked lock upgrade.
+    """
+
+    def __init__(self, name="db-writer"):
+        self.name = name
+        self.executor = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+            return self.executor
+
+    def _run(self, fn, args, kwargs):
+        self.local.active = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.local.active = False
+
+    def run(self, fn, *args, **kwargs):
+        if getattr(self.local, "active", False):  # nested write, already on the writer
+            return fn(*args, **kwargs)
+        return self._executor().submit(self._run, fn, args, kwargs).result()
+
+
+writer = SingleWriter()
+
+
+def write(fn, *args, **kwargs):
+    """
+    Run a write (fn(*args, **kwargs)) through the single-writer queue when the
+    SQLite profile is on; otherwise, or inside a transaction (whose lock the
+    writer thread would wait on), call it directly.
+    """
+    if not enabled() or connection.in_atomic_block:
+        return fn(*args, **kwargs)
+    return writer.run(fn, *args, **kwargs)
+
+
+async def awrite(fn, *args, **kwargs):
+    return await sync_to_async(write)(fn, *args, **kwargs)
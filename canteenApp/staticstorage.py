@@ -0,0 +1,72 @@
+# collectstatic storage: Django's manifest storage (content-hashed names),
+# plus .gz and, when the optional `brotli` package is installed, .br copies
+# of every compressible file, served by canteenApp.fileserving.
+import gzip
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml",
+    ".ico", ".ttf", ".otf", ".eot", ".wasm",
+}
+MIN_SIZE = 256  # below this the headers cost more than they save
+MIN_SAVING = 0.05
+
+
+def _write_if_smaller(path, original_size, data):
+    if len(data) < original_size * (1 - MIN_SAVING):
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return True
+    return False
+
+
+def compress_file(path):
+    """Write path.gz (and path.br) next to `path` if compressing pays; returns the encodings written."""
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE:
+        return []
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if len(data) < MIN_SIZE:
+        return []
+    written = []
+    # mtime=0: identical input, identical .gz, so reruns do not change files
+    if _write_if_smaller(path + ".gz", len(data), gzip.compress(data, compresslevel=9, mtime=0)):
+        written.append("gzip")
+    if brotli is not None and getattr(settings, "STATIC_BROTLI", True):
+        if _write_if_smaller(path + ".br", len(data), brotli.compress(data)):
+            written.append("br")
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that precompresses the hashed files after
+    collectstatic. Lenient: a name it cannot hash (no manifest yet, or a file
+    missing from STATIC_ROOT) falls back to the unhashed name instead of
+    raising in {% static %}; manifest_strict=False alone only avoids the
+    manifest lookup error, hashing the file itself still raises ValueError.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if self.exists(name):
+                compress_file(self.path(name))
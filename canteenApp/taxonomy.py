@@ -0,0 +1,383 @@
+# Taxonomy (Field, Interest2, Skill2, VideoKeyword): a process-local snapshot
+# for reads and typeahead, and name lookups through the indexed name_key (see
+# models.normalize_name) for writes.
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from .cache import DEFAULT_TIMEOUT, TAXONOMY_NAMESPACE, bump_namespace, namespace_version, record
+from .models import (
+    CourseVideo,
+    Field,
+    Interest2,
+    Skill2,
+    UserInterest,
+    UserProfile,
+    UserSkill,
+    VideoKeyword,
+    normalize_name,
+)
+
+FieldEntry = namedtuple("FieldEntry", "id name slug name_key")
+TagEntry = namedtuple("TagEntry", "id name name_key field_id")  # field_id is None for keywords
+
+
+class TaxonomySnapshot:
+    """
+    Immutable copy of the taxonomy tables at one namespace version:
+    id → entry, name_key → id and field → children, plus the catalog
+    endpoints' payloads, prebuilt.
+    """
+
+    def __init__(self, version, fields, interests, skills, keywords):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.fields = {f.id: f for f in fields}
+        self.field_by_key = {f.name_key: f.id for f in fields}
+        self.interests = {t.id: t for t in interests}
+        self.skills = {t.id: t for t in skills}
+        self.keywords = {t.id: t for t in keywords}
+        self.interest_by_key = {(t.field_id, t.name_key): t.id for t in interests}
+        self.skill_by_key = {(t.field_id, t.name_key): t.id for t in skills}
+        self.keyword_by_key = {t.name_key: t.id for t in keywords}
+
+        # same order and shape as FieldSerializer / InterestSerializer / SkillSerializer
+        self.field_payload = [self.field_data(f.id) for f in sorted(fields, key=lambda f: f.name)]
+        self.interest_payload = self._children_payload(interests)
+        self.skill_payload = self._children_payload(skills)
+
+    def field_data(self, field_id):
+        f = self.fields[field_id]
+        return {"id": f.id, "name": f.name, "slug": f.slug}
+
+    def _children_payload(self, tags):
+        by_field = {field_id: [] for field_id in self.fields}
+        for t in sorted(tags, key=lambda t: t.name):
+            if t.field_id not in by_field:
+                continue  # field created after the fields were read; the next version has it
+            by_field[t.field_id].append(
+                {"id": t.id, "name": t.name, "field": self.field_data(t.field_id)}
+            )
+        return by_field
+
+    def field_id(self, name=None, field_id=None):
+        """Id of the field given by ?field= (name) or ?field_id=, or None."""
+        if field_id not in (None, ""):
+            try:
+                field_id = int(field_id)
+            except (TypeError, ValueError):
+                return None
+            return field_id if field_id in self.fields else None
+        if name:
+            return self.field_by_key.get(normalize_name(name))
+        return None
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+SNAPSHOT_MAX_AGE = DEFAULT_TIMEOUT  # seconds; also catches bumps lost with an evicted or per-process cache
+
+
+def _current(snap, version):
+    return (
+        snap is not None
+        and snap.version == version
+        and time.monotonic() - snap.loaded_at < SNAPSHOT_MAX_AGE
+    )
+
+
+def load_snapshot(version):
+    # from default, never a replica: a lagging replica would store old rows
+    # under the new version until the next bump
+    fields = [
+        FieldEntry(*row)
+        for row in Field.objects.using("default").values_list("id", "name", "slug", "name_key")
+    ]
+    interests = [
+        TagEntry(*row)
+        for row in Interest2.objects.using("default").values_list("id", "name", "name_key", "field_id")
+    ]
+    skills = [
+        TagEntry(*row)
+        for row in Skill2.objects.using("default").values_list("id", "name", "name_key", "field_id")
+    ]
+    keywords = [
+        TagEntry(id, name, key, None)
+        for id, name, key in VideoKeyword.objects.using("default").values_list("id", "name", "name_key")
+    ]
+    return TaxonomySnapshot(version, fields, interests, skills, keywords)
+
+
+def snapshot():
+    """
+    The current TaxonomySnapshot. Checked against the taxonomy namespace
+    version on every call (one cache read, no query) and reloaded when a
+    write anywhere bumped it; with a shared cache backend that includes
+    writes from other processes. Reloaded after SNAPSHOT_MAX_AGE anyway.
+    """
+    global _snapshot
+    version = namespace_version(TAXONOMY_NAMESPACE)
+    current = _snapshot
+    if _current(current, version):
+        return current
+    with _snapshot_lock:
+        if not _current(_snapshot, version):
+            # version read before loading: a write committed meanwhile bumps
+            # it again, so at worst the next call reloads once more
+            _snapshot = load_snapshot(version)
+            record(TAXONOMY_NAMESPACE, "snapshot_load")
+        return _snapshot
+
+
+def _instance(model, **values):
+    """Model instance for a snapshot entry, usable as an FK target and by serializers."""
+    obj = model(**values)
+    obj._state.adding = False
+    obj._state.db = "default"
+    return obj
+
+
+# --- writes ---
+
+
+def resolve_names(model, names, **scope):
+    """
+    Rows of `model` (within `scope`, e.g. field=...) for `names`, in input
+    order with duplicates dropped, creating the missing ones. Names the
+    snapshot knows cost nothing; otherwise one name_key IN (...) lookup,
+    plus an insert and a re-read if some are new.
+    """
+    wanted = {}
+    for name in names:
+        name = " ".join(name.split())
+        if name:
+            wanted.setdefault(normalize_name(name), name)
+
+    found = _from_snapshot(model, wanted, scope)
+    if found is None:
+        found = {
+            obj.name_key: obj
+            for obj in model.objects.using("default").filter(name_key__in=list(wanted), **scope)
+        }
+    missing = [key for key in wanted if key not in found]
+    if missing:
+        model.objects.bulk_create(
+            [model(name=wanted[key], name_key=key, **scope) for key in missing],
+            ignore_conflicts=True,  # created meanwhile by another request
+        )
+        found.update(
+            (obj.name_key, obj)
+            for obj in model.objects.using("default").filter(name_key__in=missing, **scope)
+        )
+        # bulk_create sends no post_save, so invalidate_on never sees these
+        transaction.on_commit(lambda: bump_namespace(TAXONOMY_NAMESPACE))
+
+    rows = [found[key] for key in wanted if key in found]
+    for obj in rows:
+        for attr, value in scope.items():
+            setattr(obj, attr, value)  # for nested serializers, without a query
+    return rows
+
+
+def _from_snapshot(model, wanted, scope):
+    """{name_key: instance} when the snapshot has every one of `wanted`, else None."""
+    snap = snapshot()
+    field = scope.get("field")
+    if model is VideoKeyword and not scope:
+        ids = [snap.keyword_by_key.get(key) for key in wanted]
+        entries = snap.keywords
+    elif model in (Interest2, Skill2) and set(scope) == {"field"}:
+        by_key = snap.interest_by_key if model is Interest2 else snap.skill_by_key
+        ids = [by_key.get((field.pk, key)) for key in wanted]
+        entries = snap.interests if model is Interest2 else snap.skills
+    else:
+        return None
+    if None in ids:
+        return None
+    found = {}
+    for id in ids:
+        entry = entries[id]
+        values = {"id": entry.id, "name": entry.name, "name_key": entry.name_key}
+        if entry.field_id is not None:
+            values["field_id"] = entry.field_id
+        found[entry.name_key] = _instance(model, **values)
+    return found
+
+
+def resolve_field(name):
+    """The Field named `name` (by name_key), created if it does not exist."""
+    name = " ".join(name.split())
+    key = normalize_name(name)
+    snap = snapshot()
+    field_id = snap.field_by_key.get(key)
+    if field_id is not None:
+        entry = snap.fields[field_id]
+        return _instance(Field, id=entry.id, name=entry.name, slug=entry.slug, name_key=entry.name_key)
+
+    by_key = Field.objects.using("default").filter(name_key=key)
+    field = by_key.first()
+    if field is None:
+        Field.objects.bulk_create(
+            [Field(name=name, name_key=key, slug=slugify(name))], ignore_conflicts=True
+        )
+        field = by_key.first()
+        if field is None:  # slug taken by a differently named field
+            raise serializers.ValidationError({"field": f"Cannot create field '{name}'."})
+        transaction.on_commit(lambda: bump_namespace(TAXONOMY_NAMESPACE))
+    return field
+
+
+# --- typeahead ---
+
+SUGGEST_KINDS = ("field", "interest", "skill", "keyword")
+POPULARITY_TTL = 300  # seconds; popularity also refreshes with every taxonomy version
+TOP_PREFIX_LENGTH = 2  # prefixes up to this long get their ranking precomputed
+TOP_PREFIX_SIZE = 50
+
+
+class SuggestIndex:
+    """
+    Prefix index over every taxonomy name: a sorted array of
+    (word-start suffix of name_key, rank, kind, id), so "dev" finds
+    "Web Development" too. A lookup is a bisect plus a scan of the matching
+    run; the long runs of one- and two-letter prefixes are ranked up front.
+    Rank is popularity (users who picked it + videos tagged with it) desc,
+    then name length and name.
+    """
+
+    def __init__(self, snap, popularity):
+        self.snap = snap
+        self.popularity = popularity
+        entries = {
+            "field": snap.fields.values(),
+            "interest": snap.interests.values(),
+            "skill": snap.skills.values(),
+            "keyword": snap.keywords.values(),
+        }
+        ranked = sorted(
+            ((kind, e) for kind, es in entries.items() for e in es),
+            key=lambda item: (-popularity.get((item[0], item[1].id), 0), len(item[1].name), item[1].name),
+        )
+
+        keys = []
+        for rank, (kind, e) in enumerate(ranked):
+            words = e.name_key.split(" ")
+            for i in range(len(words)):
+                keys.append((" ".join(words[i:]), rank, kind, e.id))
+        keys.sort()
+        self.keys = keys
+        self.prefixes = [k[0] for k in keys]
+
+        self.top = {}
+        for suffix, rank, kind, id in keys:
+            for n in range(1, min(TOP_PREFIX_LENGTH, len(suffix)) + 1):
+                self.top.setdefault(suffix[:n], []).append((rank, kind, id))
+        for prefix, hits in self.top.items():
+            hits.sort()
+            self.top[prefix] = _unique(hits)[:TOP_PREFIX_SIZE]
+
+    def _matches(self, prefix, full=False):
+        """(rank, kind, id) of the entries with a word starting with `prefix`, best first."""
+        if len(prefix) <= TOP_PREFIX_LENGTH and not full:
+            return self.top.get(prefix, [])  # only the best TOP_PREFIX_SIZE
+        start = bisect_left(self.prefixes, prefix)
+        hits = []
+        for suffix, rank, kind, id in self.keys[start:]:
+            if not suffix.startswith(prefix):
+                break
+            hits.append((rank, kind, id))
+        hits.sort()
+        return _unique(hits)
+
+    def suggest(self, q, kinds=SUGGEST_KINDS, field_id=None, limit=10):
+        prefix = normalize_name(q)
+        if not prefix:
+            return []
+        matches = self._matches(prefix)
+        results = self._filter(matches, kinds, field_id, limit)
+        if len(results) < limit and len(matches) == TOP_PREFIX_SIZE:
+            # the filters dropped too many of the precomputed best: scan them all
+            results = self._filter(self._matches(prefix, full=True), kinds, field_id, limit)
+        return results
+
+    def _filter(self, matches, kinds, field_id, limit):
+        results = []
+        for rank, kind, id in matches:
+            if kind not in kinds:
+                continue
+            entry = self.entry(kind, id)
+            if field_id is not None and kind in ("interest", "skill") and entry.field_id != field_id:
+                continue
+            results.append(self.payload(kind, entry))
+            if len(results) == limit:
+                break
+        return results
+
+    def entry(self, kind, id):
+        return getattr(self.snap, f"{kind}s")[id]  # snap.fields, snap.interests, ...
+
+    def payload(self, kind, entry):
+        data = {"type": kind, "id": entry.id, "name": entry.name}
+        if kind in ("interest", "skill"):
+            data["field"] = self.snap.field_data(entry.field_id)
+        data["popularity"] = self.popularity.get((kind, entry.id), 0)
+        return data
+
+
+def _unique(hits):
+    seen = set()
+    out = []
+    for rank, kind, id in hits:
+        if (kind, id) not in seen:
+            seen.add((kind, id))
+            out.append((rank, kind, id))
+    return out
+
+
+def load_popularity():
+    """{(kind, id): users who selected it + videos tagged with it}."""
+    counts = defaultdict(int)
+
+    def add(kind, rows):
+        for id, n in rows:
+            if id is not None:
+                counts[(kind, id)] += n
+
+    def usage(model, column):
+        return model.objects.values_list(column).annotate(n=Count("pk")).order_by()
+
+    add("field", usage(UserProfile, "selected_field_id"))
+    add("interest", usage(UserInterest, "interest_id"))
+    add("skill", usage(UserSkill, "skill_id"))
+    for name, kind, column in (
+        ("fields", "field", "field_id"),
+        ("interests", "interest", "interest2_id"),
+        ("skills", "skill", "skill2_id"),
+        ("keywords", "keyword", "videokeyword_id"),
+    ):
+        add(kind, usage(getattr(CourseVideo, name).through, column))
+    return dict(counts)
+
+
+_suggest = None  # (SuggestIndex, built at)
+_suggest_lock = threading.Lock()
+
+
+def suggest_index():
+    """The SuggestIndex for the current snapshot, rebuilt on version change or after POPULARITY_TTL."""
+    global _suggest
+    snap = snapshot()
+    current = _suggest
+    if current is not None and current[0].snap is snap and time.monotonic() - current[1] < POPULARITY_TTL:
+        return current[0]
+    with _suggest_lock:
+        if _suggest is None or _suggest[0].snap is not snap or time.monotonic() - _suggest[1] >= POPULARITY_TTL:
+            _suggest = (SuggestIndex(snap, load_popularity()), time.monotonic())
+            record(TAXONOMY_NAMESPACE, "suggest_build")
+        return _suggest[0]
@@ -0,0 +1,9 @@
+from ..tokenserializer import CustomTokenSerializer
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"}}
+
+
+def cookie_client(client, user):
+    """`client` with an access cookie for `user`, as the frontend sends it."""
+    client.cookies["access_token"] = str(CustomTokenSerializer.get_token(user).access_token)
+    return client
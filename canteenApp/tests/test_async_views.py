@@ -0,0 +1,80 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from .. import async_views
+from ..models import Classroom, ClassroomItem, CourseVideo
+from ..tokenserializer import CustomTokenSerializer
+from .helpers import LOCMEM, cookie_client
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM)
+class AsyncViewTests(TestCase):
+    """The async views answer like the sync DRF views they stand in for."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("async")
+        self.video = CourseVideo.objects.create(
+            title="Async Intro", category="cs", youtube_url="https://youtu.be/abc"
+        )
+        self.cookie = str(CustomTokenSerializer.get_token(self.user).access_token)
+
+    def call(self, view, method="get", path="/", authenticated=True, **kwargs):
+        request = getattr(RequestFactory(), method)(path, secure=True)
+        if authenticated:
+            request.COOKIES["access_token"] = self.cookie
+        response = async_to_sync(view)(request, **kwargs)
+        if hasattr(response, "render"):  # DRF responses of the sync fallback; the handler renders them
+            response.render()
+        return response.status_code, json.loads(response.content or b"null")
+
+    def sync_json(self, path):
+        response = cookie_client(self.client, self.user).get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_videos_match_the_sync_views(self):
+        self.assertEqual(
+            self.call(async_views.video_list, authenticated=False),
+            (200, self.sync_json("/api/videos/")),
+        )
+        self.assertEqual(
+            self.call(async_views.video_detail, slug=self.video.slug),
+            (200, self.sync_json(f"/api/videos/{self.video.slug}/")),
+        )
+        self.assertEqual(self.call(async_views.video_detail, slug="missing")[0], 404)
+
+    def test_classroom_created_on_first_visit(self):
+        status, body = self.call(async_views.classroom_me)
+        self.assertEqual(status, 200)
+        self.assertEqual(body["id"], Classroom.objects.get(user=self.user).pk)
+        self.assertEqual(self.call(async_views.classroom_me), (200, self.sync_json("/api/classroom/")))
+
+    def test_continue_and_items_match_the_sync_views(self):
+        classroom = Classroom.objects.create(user=self.user)
+        ClassroomItem.objects.create(
+            classroom=classroom, video=self.video, progress_seconds=5, last_watched_at=timezone.now()
+        )
+        self.assertEqual(
+            self.call(async_views.classroom_continue),
+            (200, self.sync_json("/api/classroom/continue/")),
+        )
+        self.assertEqual(
+            self.call(async_views.classroom_items),
+            (200, self.sync_json("/api/classroom/items/list/")),
+        )
+
+    def test_login_required(self):
+        self.assertEqual(self.call(async_views.classroom_me, authenticated=False)[0], 401)
+        self.cookie = "garbage"
+        self.assertEqual(self.call(async_views.video_list)[0], 401)
+
+    def test_other_methods_go_to_the_sync_view(self):
+        self.assertEqual(self.call(async_views.classroom_continue, method="post")[0], 405)
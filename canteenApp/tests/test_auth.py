@@ -0,0 +1,123 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import async_views
+from ..authentication import (
+    CookieJWTAuthentication,
+    TokenBackedUser,
+    revoked_cache_key,
+    verified_tokens,
+)
+from ..tokenserializer import CustomTokenSerializer
+from .helpers import LOCMEM, cookie_client
+
+User = get_user_model()
+
+
+def user_queries(captured):
+    return [q["sql"] for q in captured if '"auth_user"' in q["sql"]]
+
+
+class StatelessUserTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw", is_staff=True)
+
+    @override_settings(JWT_STATELESS_USER=True)
+    def test_authenticated_view_runs_no_user_query(self):
+        client = cookie_client(self.client, self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/classroom/continue/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries(queries.captured_queries), [])
+
+    def test_claims_answer_without_loading(self):
+        token = CustomTokenSerializer.get_token(self.user).access_token
+        user = TokenBackedUser(token)
+        with self.assertNumQueries(0):
+            self.assertTrue(user)
+            self.assertTrue(user.is_authenticated)
+            self.assertEqual((user.pk, user.username, user.is_staff), (self.user.pk, "alice", True))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.get_full_name(), "")
+
+
+class AsyncAuthenticateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bob", "bob@example.com", "pw")
+        self.request = RequestFactory().get("/")
+        self.request.COOKIES["access_token"] = str(CustomTokenSerializer.get_token(self.user).access_token)
+        self.auth = CookieJWTAuthentication()
+
+    def test_deactivated_user_refused_at_once(self):
+        user, _ = async_to_sync(self.auth.aauthenticate)(self.request)
+        self.assertEqual(user.pk, self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            async_to_sync(self.auth.aauthenticate)(self.request)
+
+
+@override_settings(CACHES=LOCMEM)
+class AsyncAuthStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("carol", "carol@example.com", "pw")
+        self.token = CustomTokenSerializer.get_token(self.user).access_token
+        self.request = RequestFactory().get("/auth/status/")
+        self.request.COOKIES["access_token"] = str(self.token)
+
+    def status(self):
+        return async_to_sync(async_views.auth_status)(self.request).status_code
+
+    def test_revocation_checked_on_the_async_cache(self):
+        with mock.patch.object(verified_tokens, "is_revoked", side_effect=AssertionError("sync lookup")):
+            self.assertEqual(self.status(), 200)
+
+    def test_revoked_elsewhere_is_refused(self):
+        # as another process's logout leaves it: only the shared cache knows
+        cache.set(revoked_cache_key(self.token["jti"]), 1, 60)
+        self.assertEqual(self.status(), 401)
+
+
+@override_settings(CACHES=LOCMEM)
+class AuthStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("dave", "dave@example.com", "pw")
+        self.refresh = CustomTokenSerializer.get_token(self.user)
+
+    def test_answers_from_the_token_claims(self):
+        self.client.cookies["access_token"] = str(self.refresh.access_token)
+        self.client.get("/auth/status/", secure=True)  # loads the photo URL
+        with self.assertNumQueries(0):
+            response = self.client.get("/auth/status/", secure=True)
+        body = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (body["userId"], body["username"], body["email"], body["is_staff"], body["photo"]),
+            (self.user.pk, "dave", "dave@example.com", False, None),
+        )
+
+    def test_bad_cookie(self):
+        self.client.cookies["access_token"] = "garbage"
+        self.assertEqual(self.client.get("/auth/status/", secure=True).status_code, 401)
+
+    def test_refresh_rereads_claims_and_rotates(self):
+        User.objects.filter(pk=self.user.pk).update(username="david", is_staff=True)
+        self.client.cookies["refresh_token"] = str(self.refresh)
+        response = self.client.post("/token/refresh/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.cookies["access_token"].value)
+        self.assertEqual((access["username"], access["is_staff"]), ("david", True))
+        self.assertNotEqual(response.cookies["refresh_token"].value, str(self.refresh))
+
+        # the rotated-out refresh token is blacklisted
+        self.client.cookies["refresh_token"] = str(self.refresh)
+        self.assertEqual(self.client.post("/token/refresh/", secure=True).status_code, 401)
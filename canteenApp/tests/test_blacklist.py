@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from ..blacklist import BloomFilter, TokenBlacklist, bump_version
+from .helpers import LOCMEM
+
+User = get_user_model()
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(100)
+        for i in range(100):
+            bloom.add(f"jti-{i}")
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(100)))
+        self.assertNotIn("never-added", bloom)
+
+
+@override_settings(CACHES=LOCMEM)
+class TokenBlacklistSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="bl", password="pw")
+        self.blacklist = TokenBlacklist()
+
+    def blacklist_row(self, jti, **kwargs):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=jti, expires_at=timezone.now() + timedelta(days=1)
+        )
+        return BlacklistedToken.objects.create(token=token, **kwargs)
+
+    def test_picks_up_entries_from_other_processes(self):
+        self.blacklist_row("early")
+        self.blacklist.current_filter()
+        self.blacklist_row("later")
+        bump_version()
+        self.assertTrue(self.blacklist.is_blacklisted("early"))
+        self.assertTrue(self.blacklist.is_blacklisted("later"))
+        self.assertFalse(self.blacklist.is_blacklisted("never"))
+
+    def test_late_commit_with_lower_id_is_not_missed(self):
+        self.blacklist_row("high", id=10)
+        self.blacklist.current_filter()
+        self.assertEqual(self.blacklist.last_id, 10)
+        # A transaction that drew id 5 commits after id 10 was already seen.
+        self.blacklist_row("low", id=5)
+        bump_version()
+        self.assertTrue(self.blacklist.is_blacklisted("low"))
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .. import cache as cache_module
+from ..cache import acache_aside, bump_namespace, cache_aside, namespaced_key
+from .helpers import LOCMEM
+
+
+class Loader:
+    def __init__(self, value="fresh"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+    async def acall(self):
+        return self()
+
+
+@override_settings(CACHES=LOCMEM)
+@mock.patch.object(cache_module, "WAIT_STEP", 0.01)
+@mock.patch.object(cache_module, "LOCK_TIMEOUT", 0.1)
+class CacheAsideTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def hold_lock(self, key):
+        self.assertTrue(cache.add(f"{namespaced_key('tests', key)}:lock", "other", 60))
+
+    def lock_holder(self, key):
+        return cache.get(f"{namespaced_key('tests', key)}:lock")
+
+    def test_loads_once_then_hits(self):
+        loader = Loader()
+        self.assertEqual(cache_aside("tests", "k", loader), "fresh")
+        self.assertEqual(cache_aside("tests", "k", loader), "fresh")
+        self.assertEqual(loader.calls, 1)
+        self.assertIsNone(self.lock_holder("k"))
+
+    def test_bump_namespace_reloads(self):
+        loader = Loader()
+        cache_aside("tests", "k", loader)
+        bump_namespace("tests")
+        cache_aside("tests", "k", loader)
+        self.assertEqual(loader.calls, 2)
+
+    def test_stale_copy_served_while_another_worker_loads(self):
+        cache_aside("tests", "k", Loader("stale"), beta=0)
+        self.hold_lock("k")
+        loader = Loader()
+        # beta=inf makes every entry due for an early refresh
+        self.assertEqual(cache_aside("tests", "k", loader, beta=float("inf")), "stale")
+        self.assertEqual(loader.calls, 0)
+
+    def test_wait_timeout_keeps_the_other_workers_lock(self):
+        self.hold_lock("k")
+        loader = Loader()
+        self.assertEqual(cache_aside("tests", "k", loader), "fresh")
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(self.lock_holder("k"), "other")
+
+    def test_async_wait_timeout_keeps_the_other_workers_lock(self):
+        self.hold_lock("k")
+        loader = Loader()
+        self.assertEqual(async_to_sync(acache_aside)("tests", "k", loader.acall), "fresh")
+        self.assertEqual(self.lock_holder("k"), "other")
+        self.assertEqual(async_to_sync(acache_aside)("tests", "k", loader.acall), "fresh")
+        self.assertEqual(loader.calls, 1)
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from ..chatviews import decode_cursor, encode_cursor
+from ..inbox import mark_read, record_message
+from ..models import ChatMessage, ChatUpload, ConversationSummary
+from .helpers import cookie_client
+
+User = get_user_model()
+
+
+class DecodeCursorTests(TestCase):
+    @staticmethod
+    def raw(text):
+        return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+    def test_round_trip(self):
+        when = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor(SimpleNamespace(timestamp=when, id=42))), (when, 42))
+
+    def test_invalid(self):
+        for cursor in ("!!", self.raw("abc"), self.raw("1:x"), self.raw("9" * 30 + ":1"),
+                       self.raw("-" + "9" * 20 + ":1"), self.raw("1:" + "9" * 30)):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_history_answers_400(self):
+        alice = User.objects.create_user("alice")
+        bob = User.objects.create_user("bob")
+        client = cookie_client(self.client, alice)
+        for cursor in ("!!", self.raw("9" * 30 + ":1")):
+            response = client.get("/api/chat/history/", {"user": bob.pk, "before": cursor}, secure=True)
+            self.assertEqual(response.status_code, 400)
+
+
+class InboxTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.key = ChatMessage.private_key(self.alice.pk, self.bob.pk)
+
+    def send(self, sender, receiver, text="hi"):
+        return ChatMessage.objects.create(sender=sender, receiver=receiver, message=text)
+
+    def summary(self, user):
+        return ConversationSummary.objects.get(user=user, conversation_key=self.key)
+
+    def test_counts(self):
+        first = self.send(self.alice, self.bob)
+        self.send(self.alice, self.bob)
+        last = self.send(self.alice, self.bob)
+        bob = self.summary(self.bob)
+        self.assertEqual((bob.unread_count, bob.last_message_id), (3, last.pk))
+        self.assertEqual(self.summary(self.alice).unread_count, 0)
+
+        self.assertEqual(mark_read(self.bob, self.key, first.pk).unread_count, 2)
+        self.assertEqual(mark_read(self.bob, self.key).unread_count, 0)
+        self.assertEqual(self.summary(self.bob).last_read_message_id, last.pk)
+
+        reply = self.send(self.bob, self.alice)
+        alice = self.summary(self.alice)
+        self.assertEqual((alice.unread_count, alice.last_message_id), (1, reply.pk))
+
+    def test_late_commit_does_not_move_last_message_back(self):
+        older = self.send(self.alice, self.bob)
+        newer = self.send(self.bob, self.alice)
+        record_message(older, [self.alice.pk, self.bob.pk])  # lands after `newer`
+        alice = self.summary(self.alice)
+        self.assertEqual(alice.last_message_id, newer.pk)
+        self.assertEqual(alice.unread_count, 1)  # not reset by her own older message
+        self.assertEqual(self.summary(self.bob).last_message_id, newer.pk)
+
+    def test_inbox_view(self):
+        self.send(self.alice, self.bob, "hello")
+        response = cookie_client(self.client, self.bob).get("/api/chat/inbox/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["unread_count"] for row in response.json()], [1])
+
+
+class ChatUploadTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.client = cookie_client(self.client, self.alice)
+
+    def upload(self, filename, body):
+        response = self.client.post(
+            "/api/chat/uploads/", {"filename": filename, "size": len(body)}, secure=True
+        )
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.json()["id"]
+        response = self.client.put(
+            f"/api/chat/uploads/{upload_id}/?offset=0", body,
+            content_type="application/octet-stream", secure=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        return upload_id
+
+    def finalize(self, upload_id, body, **extra):
+        return self.client.post(
+            f"/api/chat/uploads/{upload_id}/finalize/",
+            {"sha256": hashlib.sha256(body).hexdigest(), **extra}, secure=True,
+        )
+
+    def test_repeated_finalize_returns_the_same_message(self):
+        body = b"hello " * 100
+        upload_id = self.upload("notes.txt", body)
+        first = self.finalize(upload_id, body, receiver=self.bob.pk)
+        second = self.finalize(upload_id, body, receiver=self.bob.pk)
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(first.json()["message"]["id"], second.json()["message"]["id"])
+        self.assertEqual(ChatMessage.objects.count(), 1)
+        self.assertEqual(ChatUpload.objects.get(pk=upload_id).status, ChatUpload.COMPLETE)
+
+    def test_long_filename_fits_the_file_column(self):
+        body = b"x" * 10
+        upload_id = self.upload("a" * 250 + ".pdf", body)
+        self.assertEqual(self.finalize(upload_id, body).status_code, 200)
+        name = ChatUpload.objects.get(pk=upload_id).file.name
+        self.assertLessEqual(len(name), 255)
+        self.assertTrue(name.endswith(".pdf"))
+
+    def test_checksum_mismatch_restarts(self):
+        upload_id = self.upload("notes.txt", b"abc")
+        response = self.finalize(upload_id, b"abd")
+        self.assertEqual(response.status_code, 422)
+        upload = ChatUpload.objects.get(pk=upload_id)
+        self.assertEqual((upload.received, upload.parts), (0, []))
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from ..classroomviews import continue_watching
+from ..models import Classroom, ClassroomItem, CourseVideo, VideoContext, VideoContextSegment
+from .helpers import cookie_client
+
+User = get_user_model()
+
+
+class ContinueWatchingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("learner")
+        self.classroom = Classroom.objects.create(user=self.user)
+        self.video = CourseVideo.objects.create(
+            title="Intro", category="cs", youtube_url="https://youtu.be/abc"
+        )
+        context = VideoContext.objects.create(video=self.video)
+        VideoContextSegment.objects.create(
+            context=context, start_seconds=0, end_seconds=10, title="Basics", content="."
+        )
+        VideoContextSegment.objects.create(
+            context=context, start_seconds=20, end_seconds=30, title="Loops", content="."
+        )
+
+    def item(self, progress, **kwargs):
+        return ClassroomItem.objects.create(
+            classroom=self.classroom, video=self.video, progress_seconds=progress,
+            last_watched_at=timezone.now(), **kwargs,
+        )
+
+    def segment_title(self):
+        with self.assertNumQueries(1):
+            return [item.segment_title for item in continue_watching(self.user.pk, 10)]
+
+    def test_segment_covering_the_resume_second(self):
+        self.item(25)
+        self.assertEqual(self.segment_title(), ["Loops"])
+
+    def test_gap_between_segments_has_no_title(self):
+        self.item(15)
+        self.assertEqual(self.segment_title(), [None])
+
+    def test_completed_and_unwatched_items_are_left_out(self):
+        self.item(5, completed=True)
+        self.assertEqual(self.segment_title(), [])
+
+    def test_view(self):
+        self.item(5)
+        response = cookie_client(self.client, self.user).get("/api/classroom/continue/", secure=True)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+from ..dbrouters import ReplicaRouter
+from ..models import ChatMessage, CourseVideo, Field, UserProfile
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.router.replicas = ["replica_1", "replica_2"]
+
+    def test_catalog_reads_go_to_a_replica(self):
+        for model in (CourseVideo, Field, CourseVideo.fields.through):
+            with self.subTest(model=model):
+                self.assertIn(self.router.db_for_read(model), self.router.replicas)
+
+    def test_user_data_stays_on_default(self):
+        for model in (UserProfile, ChatMessage):
+            with self.subTest(model=model):
+                self.assertIsNone(self.router.db_for_read(model))
+
+    def test_no_replicas_configured(self):
+        self.router.replicas = []
+        self.assertIsNone(self.router.db_for_read(CourseVideo))
+
+    def test_reads_inside_a_transaction_stay_on_default(self):
+        with mock.patch.object(connections["default"], "in_atomic_block", True):
+            self.assertEqual(self.router.db_for_read(CourseVideo), "default")
+
+    def test_related_lookups_follow_the_instance(self):
+        video = CourseVideo()
+        video._state.db = "default"
+        self.assertEqual(self.router.db_for_read(Field, instance=video), "default")
+
+    def test_writes_and_migrations(self):
+        self.assertEqual(self.router.db_for_write(CourseVideo), "default")
+        self.assertFalse(self.router.allow_migrate("replica_1", "canteenApp"))
+        self.assertIsNone(self.router.allow_migrate("default", "canteenApp"))
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+from django.test import RequestFactory, SimpleTestCase
+
+from ..fileserving import byte_range, serve_file
+
+
+class ByteRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(byte_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(byte_range("bytes=-500", 100), (0, 99))
+        self.assertEqual(byte_range("bytes=95-500", 100), (95, 99))
+
+    def test_ignored(self):
+        self.assertIsNone(byte_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(byte_range("items=0-1", 100))
+        self.assertIsNone(byte_range("bytes=-", 100))
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=100-", "bytes=5-2", "bytes=-0"):
+            with self.assertRaises(ValueError):
+                byte_range(header, 100)
+
+
+class ServeFileTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        with open(os.path.join(self.root, "a.txt"), "wb") as fh:
+            fh.write(b"0123456789")
+        self.factory = RequestFactory()
+
+    def serve(self, **headers):
+        return serve_file(self.factory.get("/a.txt", headers=headers), "a.txt", self.root, "no-cache")
+
+    def test_full_then_not_modified(self):
+        response = self.serve()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(self.serve(**{"If-None-Match": response["ETag"]}).status_code, 304)
+        self.assertEqual(self.serve(**{"If-None-Match": '"other"'}).status_code, 200)
+
+    def test_partial(self):
+        response = self.serve(Range="bytes=2-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+
+    def test_range_not_satisfiable(self):
+        response = self.serve(Range="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.serve(Range="bytes=2-4", **{"If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
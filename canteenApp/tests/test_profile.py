@@ -0,0 +1,185 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.client import MULTIPART_CONTENT
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from .. import taxonomy
+from ..images import FULL, WEBP, photo_url, render_photo, save_rendered, store_profile_photo
+from ..models import Field, Skill2, UserProfile
+from .helpers import LOCMEM, cookie_client
+
+User = get_user_model()
+
+
+def png(size=(40, 30), color=(200, 30, 30)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, "PNG")
+    return SimpleUploadedFile("me.png", buf.getvalue(), content_type="image/png")
+
+
+def jpeg_with_exif(size=(200, 100)):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90° clockwise to display
+    exif[0x010F] = "SecretCam"  # make
+    buf = io.BytesIO()
+    Image.new("RGB", size, (10, 120, 200)).save(buf, "JPEG", exif=exif.tobytes())
+    return buf.getvalue()
+
+
+def opened(data):
+    return Image.open(io.BytesIO(data))
+
+
+@override_settings(PROFILE_PHOTO_MAX_DIMENSION=120, PROFILE_PHOTO_SIZES={"thumb": 16, "small": 40})
+class PhotoPipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+
+    def test_rotated_downsized_and_stripped(self):
+        rendered = render_photo(jpeg_with_exif())
+        self.assertEqual(set(rendered), {FULL, "thumb", "small"})
+        self.assertEqual(set(rendered[FULL]), {"jpeg", WEBP})
+        with opened(rendered[FULL]["jpeg"]) as full:
+            self.assertEqual(full.size, (60, 120))  # rotated upright, then fit in 120
+            self.assertFalse(full.getexif())
+        with opened(rendered["thumb"][WEBP]) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ("WEBP", (16, 16)))
+
+    def test_transparency_kept_as_png(self):
+        buf = io.BytesIO()
+        Image.new("RGBA", (30, 30), (0, 0, 0, 0)).save(buf, "PNG")
+        rendered = render_photo(buf.getvalue())
+        self.assertEqual(set(rendered["small"]), {"png", WEBP})
+        with opened(rendered["small"]["png"]) as small:
+            self.assertEqual(small.mode, "RGBA")
+
+    def test_names_are_content_hashed(self):
+        rendered = render_photo(png().read())
+        names = save_rendered(rendered)
+        self.assertEqual(save_rendered(rendered), names)
+        self.assertTrue(names["thumb"]["jpeg"].startswith("profile_photos/thumb/"))
+        self.assertEqual(photo_url(None, names, "thumb"), f"/media/{names['thumb']['jpeg']}")
+        self.assertIsNone(photo_url(None, {}))
+
+    def test_stale_job_does_not_overwrite_a_newer_upload(self):
+        profile = User.objects.create_user("slow").profile
+        profile.photo_source = "newer upload"
+        profile.save(update_fields=["photo_source"])
+        store_profile_photo(profile.pk, png().read())
+        profile.refresh_from_db()
+        self.assertEqual((profile.photo.name, profile.photo_variants), ("", {}))
+
+
+@override_settings(CACHES=LOCMEM, BACKGROUND_WORKERS=0)
+class ProfilePhotoUpdateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.user = User.objects.create_user("photo")
+        self.client = cookie_client(self.client, self.user)
+
+    def profile(self):
+        return UserProfile.objects.get(user=self.user)
+
+    def patch(self, path, data, multipart=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            if multipart:
+                # the test client only encodes multipart bodies for POST
+                response = self.client.generic(
+                    "PATCH", path, self.client._encode_data(data, MULTIPART_CONTENT),
+                    content_type=MULTIPART_CONTENT, secure=True,
+                )
+            else:
+                response = self.client.patch(path, data, content_type="application/json", secure=True)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        return response
+
+    def assert_processed(self):
+        profile = self.profile()
+        self.assertTrue(profile.photo_source)
+        self.assertTrue(profile.photo.name.startswith("profile_photos/"))
+        self.assertIn("thumb", profile.photo_variants)
+
+    def assert_cleared(self):
+        profile = self.profile()
+        self.assertFalse(profile.photo)
+        self.assertEqual((profile.photo_variants, profile.photo_source), ({}, ""))
+
+    def test_update_profile_upload_then_null_clears(self):
+        response = self.patch("/update-profile/", {"photo": png(), "bio": "hi"}, multipart=True)
+        self.assertTrue(response.json()["photo_pending"])
+        self.assert_processed()
+        response = self.patch("/update-profile/", {"photo": None})
+        self.assertEqual(response.json()["updated"], ["photo"])
+        self.assert_cleared()
+
+    def test_update_profile_null_without_photo_writes_nothing(self):
+        response = self.patch("/update-profile/", {"photo": None})
+        self.assertEqual(response.json()["updated"], [])
+
+    def test_my_profile_uses_the_same_pipeline(self):
+        self.patch("/my-profile/", {"photo": png()}, multipart=True)
+        self.assert_processed()
+        self.patch("/my-profile/", {"photo": None})
+        self.assert_cleared()
+
+
+@override_settings(CACHES=LOCMEM)
+class ProfileBootstrapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.object(taxonomy, "_snapshot", None))
+        self.user = User.objects.create_user("boot")
+        web = Field.objects.create(name="Web", slug="web")
+        Skill2.objects.create(name="Vue", field=web)
+        self.client = cookie_client(self.client, self.user)
+
+    def get(self, path):
+        response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def save_selection(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/save-skills-interests/",
+                {"field": "Web", "interests": ["APIs", "Frontend"], "skills": ["CSS", "React"],
+                 "skill_level": {"React": "Advanced"}},
+                content_type="application/json", secure=True,
+            )
+        return response.json()
+
+    def test_selection_matches_the_save_response(self):
+        saved = self.save_selection()
+        self.assertEqual(self.get("/api/my-selection/"), saved)
+        self.assertEqual(self.get("/api/profile/bootstrap/")["selection"], saved)
+
+    def test_bootstrap_payload(self):
+        self.save_selection()
+        body = self.get("/api/profile/bootstrap/")
+        self.assertEqual(body["profile"]["username"], "boot")
+        self.assertEqual([s["name"] for s in body["catalog"]["skills"]], ["CSS", "React", "Vue"])
+        self.assertEqual([i["name"] for i in body["catalog"]["interests"]], ["APIs", "Frontend"])
+
+    def test_cached_until_the_profile_changes(self):
+        self.get("/api/profile/bootstrap/")
+        with CaptureQueriesContext(connection) as queries:
+            self.get("/api/profile/bootstrap/")
+        self.assertFalse([q for q in queries.captured_queries if "userprofile" in q["sql"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/update-profile/", {"bio": "new"}, content_type="application/json", secure=True)
+        self.assertEqual(self.get("/api/profile/bootstrap/")["profile"]["bio"], "new")
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import (
+    ChatMessage,
+    Classroom,
+    ClassroomItem,
+    CourseVideo,
+    Field,
+    Interest2,
+    Skill2,
+    UserInterest,
+)
+from ..profiling import QueryBudgetExceeded
+from .helpers import LOCMEM, cookie_client
+
+User = get_user_model()
+
+PROFILING = "canteenApp.profiling.RequestProfilingMiddleware"
+
+
+def with_profiling():
+    middleware = [name for name in settings.MIDDLEWARE if name != PROFILING]
+    return [PROFILING, *middleware]
+
+
+@override_settings(CACHES=LOCMEM, MIDDLEWARE=with_profiling(), QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("budget")
+        friend = User.objects.create_user("friend")
+        field = Field.objects.create(name="Computing")
+        interest = Interest2.objects.create(name="Web", field=field)
+        Skill2.objects.create(name="Python", field=field)
+        UserInterest.objects.create(user=self.user, interest=interest)
+        self.video = CourseVideo.objects.create(
+            title="Intro", category="cs", youtube_url="https://youtu.be/abc"
+        )
+        self.video.fields.add(field)
+        classroom = Classroom.objects.create(user=self.user)
+        ClassroomItem.objects.create(
+            classroom=classroom, video=self.video, last_watched_at=timezone.now()
+        )
+        ChatMessage.objects.create(sender=friend, receiver=self.user, message="hi")
+        self.friend = friend
+        self.client = cookie_client(self.client, self.user)
+
+    def test_budgeted_views_stay_within_budget(self):
+        requests = [
+            ("get", "/auth/status/", {}),
+            ("get", "/api/videos/", {}),
+            ("get", f"/api/videos/{self.video.slug}/", {}),
+            ("get", "/api/videos/recommended/", {}),
+            ("get", "/api/catalog/fields/", {}),
+            ("get", "/api/catalog/interests/", {"field": "Computing"}),
+            ("get", "/api/catalog/skills/", {"field": "Computing"}),
+            ("get", "/api/catalog/suggest/", {"q": "py"}),
+            ("get", "/api/classroom/", {}),
+            ("get", "/api/classroom/items/list/", {}),
+            ("get", "/api/classroom/continue/", {}),
+            ("get", "/api/chat/history/", {"user": self.friend.pk}),
+            ("get", "/api/chat/inbox/", {}),
+            ("get", "/my-profile/", {}),
+            ("get", "/api/my-selection/", {}),
+            ("get", "/api/profile/bootstrap/", {}),
+        ]
+        # twice: once cold, once from the caches
+        for method, path, params in requests * 2:
+            with self.subTest(path=path):
+                response = getattr(self.client, method)(path, params, secure=True)
+                self.assertEqual(response.status_code, 200, response.content[:200])
+        response = self.client.patch(
+            "/update-profile/", {"bio": "hello"}, content_type="application/json", secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={"my-profile": 0})
+    def test_strict_mode_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/my-profile/", secure=True)
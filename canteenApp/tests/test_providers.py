@@ -0,0 +1,51 @@
+import os
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from ..providers import FakeGeminiProvider, GeminiProvider, Registry, registry
+
+FAKE_ENV = {"AI_FAKE_PROVIDERS": "1", "FAKE_PROVIDER_LATENCY_MS": "0", "GEMINI_API_KEY": ""}
+
+
+@override_settings(ENV_FILE="/nonexistent/.env")
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.dict(os.environ, FAKE_ENV))
+        self.registry = Registry(registry.providers, registry.fakes)
+
+    def test_fakes_answer_offline(self):
+        gemini = self.registry.get("gemini")
+        self.assertIsInstance(gemini, FakeGeminiProvider)
+        payload = {"contents": [{"parts": [{"text": "hi"}]}]}
+        self.assertEqual(gemini.generate(payload), "(offline reply) You asked: hi")
+        self.assertEqual(async_to_sync(gemini.agenerate)(payload), "(offline reply) You asked: hi")
+        self.assertTrue(self.registry.get("elevenlabs").speech("hello").startswith(b"ID3"))
+
+    def test_same_config_same_instance(self):
+        self.assertIs(self.registry.get("gemini"), self.registry.get("gemini"))
+
+    def test_config_change_rebuilds(self):
+        fake = self.registry.get("gemini")
+        with mock.patch.dict(os.environ, {"AI_FAKE_PROVIDERS": "0", "GEMINI_API_KEY": "k"}):
+            real = self.registry.get("gemini")
+        self.assertIs(type(real), GeminiProvider)
+        self.assertEqual(real.setting("GEMINI_API_KEY"), "k")
+        self.assertIsNot(self.registry.get("gemini"), fake)
+
+    def test_replaced_client_closed_after_its_last_request(self):
+        old = self.registry.get("gemini")
+        with old.lease() as client:
+            with mock.patch.dict(os.environ, {"GEMINI_MODEL": "other"}):
+                self.assertIsNot(self.registry.get("gemini"), old)
+            self.assertFalse(client.is_closed)
+        self.assertTrue(client.is_closed)
+
+    def test_idle_replaced_client_closed_at_once(self):
+        old = self.registry.get("gemini")
+        with old.lease() as client:
+            pass
+        with mock.patch.dict(os.environ, {"GEMINI_MODEL": "other"}):
+            self.registry.get("gemini")
+        self.assertTrue(client.is_closed)
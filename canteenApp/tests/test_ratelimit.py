@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..ratelimit import TokenBucket, limit_ai_tutor
+from .helpers import LOCMEM
+
+
+@override_settings(CACHES=LOCMEM)
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.bucket = TokenBucket("tests", per_minute=6, burst=3)
+        self.t0 = 1_000_000.0
+
+    def test_steady_rate_never_refused(self):
+        self.assertEqual(
+            [self.bucket.take("a", self.t0 + 10 * i) for i in range(30)], [None] * 30
+        )
+
+    def test_burst_then_retry_after(self):
+        self.assertEqual([self.bucket.take("a", self.t0) for _ in range(3)], [None] * 3)
+        self.assertEqual(self.bucket.take("a", self.t0), 10)
+        self.assertEqual(self.bucket.take("a", self.t0 + 6), 4)
+        self.assertIsNone(self.bucket.take("a", self.t0 + 10))
+
+    def test_clients_are_independent(self):
+        for _ in range(3):
+            self.bucket.take("a", self.t0)
+        self.assertIsNotNone(self.bucket.take("a", self.t0))
+        self.assertIsNone(self.bucket.take("b", self.t0))
+
+
+@override_settings(CACHES=LOCMEM)
+class LimitAiTutorTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = limit_ai_tutor(lambda request: HttpResponse("ok"))
+        self.factory = RequestFactory()
+
+    def test_429_with_retry_after(self):
+        statuses = [self.view(self.factory.post("/", REMOTE_ADDR="10.0.0.1")).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 200])
+        response = self.view(self.factory.post("/", REMOTE_ADDR="10.0.0.1"))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "10")
+        self.assertEqual(self.view(self.factory.post("/", REMOTE_ADDR="10.0.0.2")).status_code, 200)
+
+    def test_get_not_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.view(self.factory.get("/", REMOTE_ADDR="10.0.0.3")).status_code, 200)
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from .. import sqlite
+from ..sqlite import SingleWriter
+
+
+class SingleWriterTests(SimpleTestCase):
+    def setUp(self):
+        self.writer = SingleWriter("test-writer")
+        self.addCleanup(lambda: self.writer.executor and self.writer.executor.shutdown())
+
+    def test_writes_run_one_at_a_time_on_the_writer_thread(self):
+        running, peak, threads = 0, 0, set()
+        guard = threading.Lock()
+
+        def job(i):
+            nonlocal running, peak
+            with guard:
+                running += 1
+                peak = max(peak, running)
+                threads.add(threading.current_thread().name)
+            with guard:
+                running -= 1
+            return i
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: self.writer.run(job, i), range(50)))
+        self.assertEqual(results, list(range(50)))
+        self.assertEqual(peak, 1)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith("test-writer"))
+
+    def test_nested_write_runs_inline(self):
+        outer = self.writer.run(lambda: self.writer.run(threading.current_thread))
+        self.assertTrue(outer.name.startswith("test-writer"))
+
+    def test_errors_reach_the_caller(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.writer.run(lambda: 1 / 0)
+        self.assertEqual(self.writer.run(lambda: "still running"), "still running")
+
+
+class WriteTests(SimpleTestCase):
+    def setUp(self):
+        self.writer = SingleWriter("test-writer")
+        self.addCleanup(lambda: self.writer.executor and self.writer.executor.shutdown())
+        self.enterContext(mock.patch.object(sqlite, "writer", self.writer))
+
+    def test_disabled_runs_in_place(self):
+        with mock.patch.object(sqlite, "enabled", return_value=False):
+            self.assertIs(sqlite.write(threading.current_thread), threading.current_thread())
+
+    def test_enabled_goes_through_the_writer(self):
+        with mock.patch.object(sqlite, "enabled", return_value=True):
+            self.assertTrue(sqlite.write(threading.current_thread).name.startswith("test-writer"))
+            # inside a transaction the writer would wait on this thread's lock
+            with mock.patch.object(connection, "in_atomic_block", True):
+                self.assertIs(sqlite.write(threading.current_thread), threading.current_thread())
+
+    @override_settings(SQLITE_BUSY_TIMEOUT_MS=1234, SQLITE_MMAP_SIZE=0)
+    def test_pragmas(self):
+        self.assertIn("PRAGMA journal_mode=WAL", sqlite.pragmas())
+        self.assertIn("PRAGMA busy_timeout=1234", sqlite.pragmas())
@@ -0,0 +1,242 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from .. import taxonomy
+from ..completeprofileserializer import FieldSerializer, InterestSerializer
+from ..models import Field, Interest2, Skill2, UserInterest, UserSkill, VideoKeyword, normalize_name
+from ..taxonomy import (
+    TOP_PREFIX_SIZE,
+    FieldEntry,
+    SuggestIndex,
+    TagEntry,
+    TaxonomySnapshot,
+    resolve_names,
+    snapshot,
+)
+from .helpers import LOCMEM, cookie_client
+
+User = get_user_model()
+
+
+class MergeTaxonomyNameKeysMigrationTests(TransactionTestCase):
+    """0015 folds names that only differ in case/spacing into the oldest row."""
+
+    migrate_from = [("canteenApp", "0014_taxonomy_name_key")]
+    migrate_to = [("canteenApp", "0015_merge_taxonomy_name_keys")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes()
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        Field = apps.get_model("canteenApp", "Field")
+        Interest2 = apps.get_model("canteenApp", "Interest2")
+        VideoKeyword = apps.get_model("canteenApp", "VideoKeyword")
+        UserInterest = apps.get_model("canteenApp", "UserInterest")
+        CourseVideo = apps.get_model("canteenApp", "CourseVideo")
+        HistoricalUser = apps.get_model("auth", "User")
+
+        self.web = Field.objects.create(name="Web Dev", slug="web-dev")
+        web_dup = Field.objects.create(name="web  dev", slug="web-dev-2")
+        self.ml = Interest2.objects.create(name="Machine Learning", field=self.web)
+        ml_dup = Interest2.objects.create(name="machine  learning", field=web_dup)
+        self.react = VideoKeyword.objects.create(name="React")
+        react_dup = VideoKeyword.objects.create(name="react")
+
+        user = HistoricalUser.objects.create(username="alice")
+        UserInterest.objects.create(user_id=user.pk, interest_id=ml_dup.pk)
+        self.video = CourseVideo.objects.create(
+            title="V", slug="v", youtube_url="https://youtube.com/watch?v=v", is_published=True
+        )
+        self.video.fields.add(self.web, web_dup)
+        self.video.interests.add(self.ml, ml_dup)
+        self.video.keywords.add(react_dup)
+        self.user_id = user.pk
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    def test_duplicates_merged_into_oldest(self):
+        Field = self.apps.get_model("canteenApp", "Field")
+        Interest2 = self.apps.get_model("canteenApp", "Interest2")
+        VideoKeyword = self.apps.get_model("canteenApp", "VideoKeyword")
+        self.assertEqual(list(Field.objects.values_list("pk", "name_key")), [(self.web.pk, "web dev")])
+        self.assertEqual(
+            list(Interest2.objects.values_list("pk", "field_id", "name_key")),
+            [(self.ml.pk, self.web.pk, "machine learning")],
+        )
+        self.assertEqual(list(VideoKeyword.objects.values_list("pk", "name_key")), [(self.react.pk, "react")])
+
+    def test_references_repointed(self):
+        UserInterest = self.apps.get_model("canteenApp", "UserInterest")
+        CourseVideo = self.apps.get_model("canteenApp", "CourseVideo")
+        self.assertEqual(
+            list(UserInterest.objects.filter(user_id=self.user_id).values_list("interest_id", flat=True)),
+            [self.ml.pk],
+        )
+        video = CourseVideo.objects.get(pk=self.video.pk)
+        self.assertEqual(list(video.fields.values_list("pk", flat=True)), [self.web.pk])
+        self.assertEqual(list(video.interests.values_list("pk", flat=True)), [self.ml.pk])
+        self.assertEqual(list(video.keywords.values_list("pk", flat=True)), [self.react.pk])
+
+
+@override_settings(CACHES=LOCMEM)
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # the cleared cache restarts the namespace at the version an earlier test's snapshot has
+        self.enterContext(mock.patch.object(taxonomy, "_snapshot", None))
+        self.web = Field.objects.create(name="Web", slug="web")
+        Field.objects.create(name="Data", slug="data")
+        Interest2.objects.create(name="React", field=self.web)
+        Interest2.objects.create(name="CSS", field=self.web)
+
+    def test_payloads_match_the_serializers(self):
+        snap = snapshot()
+        self.assertEqual(
+            snap.field_payload, FieldSerializer(Field.objects.order_by("name"), many=True).data
+        )
+        self.assertEqual(
+            snap.interest_payload[self.web.pk],
+            InterestSerializer(Interest2.objects.filter(field=self.web).order_by("name"), many=True).data,
+        )
+
+    def test_views_answer_without_queries(self):
+        snapshot()
+        with self.assertNumQueries(0):
+            fields = self.client.get("/api/catalog/fields/", secure=True)
+            interests = self.client.get("/api/catalog/interests/", {"field": " web "}, secure=True)
+            unfiltered = self.client.get("/api/catalog/interests/", secure=True)
+        self.assertEqual([f["name"] for f in fields.json()], ["Data", "Web"])
+        self.assertEqual([i["name"] for i in interests.json()], ["CSS", "React"])
+        self.assertEqual(unfiltered.json(), [])
+
+    def test_write_reloads_after_commit(self):
+        before = snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            Field.objects.create(name="Design", slug="design")
+        self.assertIsNot(snapshot(), before)
+        self.assertIn("Design", [f["name"] for f in snapshot().field_payload])
+
+
+class ResolveNamesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.field = Field.objects.create(name="Web", slug="web")
+        self.existing = Interest2.objects.create(name="React", field=self.field)
+
+    def test_existing_and_new(self):
+        rows = resolve_names(Interest2, ["  react ", "Vue", "VUE", ""], field=self.field)
+        self.assertEqual([r.name for r in rows], ["React", "Vue"])
+        self.assertEqual(rows[0].pk, self.existing.pk)
+        self.assertEqual(Interest2.objects.get(pk=rows[1].pk).name_key, "vue")
+        self.assertEqual(Interest2.objects.filter(field=self.field).count(), 2)
+
+    def test_scope(self):
+        other = Field.objects.create(name="Data", slug="data")
+        rows = resolve_names(Interest2, ["React"], field=other)
+        self.assertNotEqual(rows[0].pk, self.existing.pk)
+        self.assertEqual(rows[0].field_id, other.pk)
+
+    def test_repeat_is_stable(self):
+        first = resolve_names(VideoKeyword, ["Django", "ORM"])
+        again = resolve_names(VideoKeyword, ["orm", "django"])
+        self.assertEqual({r.pk for r in first}, {r.pk for r in again})
+        self.assertEqual(VideoKeyword.objects.count(), 2)
+
+
+class SaveSelectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("picker")
+        self.field = Field.objects.create(name="Web", slug="web")
+        self.react = Skill2.objects.create(name="React", field=self.field)
+        self.client = cookie_client(self.client, self.user)
+
+    def save(self, interests, skills, levels):
+        response = self.client.post(
+            "/api/save-skills-interests/",
+            {"field": "web", "interests": interests, "skills": skills, "skill_level": levels},
+            content_type="application/json", secure=True,
+        )
+        self.assertIn(response.status_code, (200, 201), response.content[:200])
+
+    def selection(self):
+        interests = set(
+            UserInterest.objects.filter(user=self.user).values_list("interest__name", flat=True)
+        )
+        skills = dict(UserSkill.objects.filter(user=self.user).values_list("skill__name", "level"))
+        return interests, skills
+
+    def test_save_reuses_names_and_applies_the_diff(self):
+        self.save(["Frontend", "APIs"], ["react", "CSS"], {"REACT": "Advanced"})
+        self.assertEqual(
+            self.selection(), ({"Frontend", "APIs"}, {"React": "Advanced", "CSS": "Beginner"})
+        )
+        self.assertEqual(Field.objects.count(), 1)
+        self.assertEqual(Skill2.objects.filter(name_key="react").count(), 1)
+
+        kept = UserSkill.objects.get(user=self.user, skill=self.react).pk
+        self.save(["frontend", "Testing"], ["React"], {"React": "Intermediate"})
+        self.assertEqual(self.selection(), ({"Frontend", "Testing"}, {"React": "Intermediate"}))
+        self.assertEqual(UserSkill.objects.get(user=self.user, skill=self.react).pk, kept)
+
+
+def tag(id, name, field_id=None):
+    return TagEntry(id, name, normalize_name(name), field_id)
+
+
+class SuggestIndexTests(SimpleTestCase):
+    def setUp(self):
+        fields = [FieldEntry(1, "Web", "web", "web"), FieldEntry(2, "Data", "data", "data")]
+        interests = [tag(10, "Web Development", 1), tag(11, "Data Engineering", 2)]
+        skills = [tag(20, "React", 1), tag(21, "Redux", 1), tag(22, "Regression", 2)]
+        keywords = [tag(30, "react native")]
+        self.snap = TaxonomySnapshot(1, fields, interests, skills, keywords)
+        self.index = SuggestIndex(self.snap, {("skill", 21): 5, ("keyword", 30): 2})
+
+    def names(self, q, **kwargs):
+        return [hit["name"] for hit in self.index.suggest(q, **kwargs)]
+
+    def test_any_word_matches_most_used_first(self):
+        self.assertEqual(self.names("re"), ["Redux", "react native", "React", "Regression"])
+        self.assertEqual(self.names("dev"), ["Web Development"])
+        self.assertEqual(self.names("  REA "), ["react native", "React"])
+        self.assertEqual(self.names(""), [])
+
+    def test_filters(self):
+        self.assertEqual(self.names("re", kinds=("skill",), field_id=1), ["Redux", "React"])
+        self.assertEqual(self.names("re", limit=1), ["Redux"])
+        hit = self.index.suggest("react", kinds=("skill",))[0]
+        self.assertEqual(hit["field"], {"id": 1, "name": "Web", "slug": "web"})
+
+    def test_filtered_short_prefix_looks_past_the_precomputed_best(self):
+        keywords = [tag(100 + i, f"a{i:03d}") for i in range(TOP_PREFIX_SIZE + 10)]
+        snap = TaxonomySnapshot(1, [FieldEntry(1, "Web", "web", "web")], [], [tag(1, "Azure", 1)], keywords)
+        index = SuggestIndex(snap, {("keyword", k.id): 1 for k in keywords})
+        self.assertEqual([hit["name"] for hit in index.suggest("a", kinds=("skill",))], ["Azure"])
+
+
+@override_settings(CACHES=LOCMEM)
+class CatalogSuggestViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.object(taxonomy, "_snapshot", None))
+        self.enterContext(mock.patch.object(taxonomy, "_suggest", None))
+        web = Field.objects.create(name="Web", slug="web")
+        Skill2.objects.create(name="React", field=web)
+
+    def test_suggest(self):
+        response = self.client.get("/api/catalog/suggest/", {"q": "rea", "type": "skill"}, secure=True)
+        self.assertEqual([hit["name"] for hit in response.json()["results"]], ["React"])
+        response = self.client.get("/api/catalog/suggest/", {"q": "rea", "field": "nope"}, secure=True)
+        self.assertEqual(response.json(), {"q": "rea", "results": []})
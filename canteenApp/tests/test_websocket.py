@@ -0,0 +1,80 @@
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+
+from canteen.asgi import application
+
+from ..models import ChatMessage
+from ..tokenserializer import CustomTokenSerializer
+
+User = get_user_model()
+
+ORIGIN = (b"origin", b"http://localhost:3000")
+IN_MEMORY = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+def headers(user=None):
+    """Handshake headers (minting the token writes, so outside the event loop)."""
+    if user is None:
+        return [ORIGIN]
+    token = CustomTokenSerializer.get_token(user).access_token
+    return [ORIGIN, (b"cookie", f"access_token={token}".encode())]
+
+
+def socket(headers):
+    return WebsocketCommunicator(application, "/ws/chat/", headers=headers)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY)
+class ChatConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+
+    def test_anonymous_refused(self):
+        async def run():
+            ws = socket(headers())
+            connected, code = await ws.connect()
+            await ws.disconnect()
+            return connected, code
+        self.assertEqual(async_to_sync(run)(), (False, 4401))
+
+    def test_private_message_reaches_both_sides(self):
+        alice_headers, bob_headers = headers(self.alice), headers(self.bob)
+
+        async def run():
+            alice, bob = socket(alice_headers), socket(bob_headers)
+            self.assertTrue((await alice.connect())[0])
+            self.assertTrue((await bob.connect())[0])
+            await alice.send_json_to({"receiver": self.bob.pk, "message": " hi ", "client_id": "c1"})
+            to_alice = [await alice.receive_json_from(), await alice.receive_json_from()]
+            to_bob = await bob.receive_json_from()
+            await alice.disconnect()
+            await bob.disconnect()
+            return to_alice, to_bob
+
+        to_alice, to_bob = async_to_sync(run)()
+        saved = ChatMessage.objects.get()
+        ack = next(event for event in to_alice if event["type"] == "ack")
+        self.assertEqual(ack, {"type": "ack", "id": saved.pk, "client_id": "c1"})
+        self.assertEqual(to_bob["type"], "message")
+        self.assertEqual((to_bob["message"]["id"], to_bob["message"]["message"]), (saved.pk, "hi"))
+
+    def test_errors_answer_the_sender_only(self):
+        alice_headers = headers(self.alice)
+
+        async def run():
+            alice = socket(alice_headers)
+            await alice.connect()
+            replies = []
+            for content in ({"receiver": self.alice.pk, "message": "me"}, {"message": "  "},
+                            {"receiver": "x", "message": "hi"}, {"team": 99, "message": "hi"}):
+                await alice.send_json_to({**content, "client_id": "c"})
+                replies.append(await alice.receive_json_from())
+            await alice.disconnect()
+            return replies
+
+        replies = async_to_sync(run)()
+        self.assertEqual({reply["type"] for reply in replies}, {"error"})
+        self.assertFalse(ChatMessage.objects.exists())
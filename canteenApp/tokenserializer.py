@@ -1,9 +1,21 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .authentication import USER_CLAIMS
+from .blacklist import CheckedRefreshToken
+
+
+def set_user_claims(token, user):
+    """Write the user's current USER_CLAIMS into `token`."""
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
 
 class CustomTokenSerializer(TokenObtainPairSerializer):
+    token_class = CheckedRefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token['is_staff'] = user.is_staff
-        token['is_superuser'] = user.is_superuser
-        return token
+        # copied into every access token minted from this refresh token, so
+        # authentication can describe the user without a query
+        return set_user_claims(token, user)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from . import views
 from .import auth_views
@@ -10,8 +11,10 @@ from .completeprofileviews import (
     FieldListView,
     InterestListByFieldView,
     SkillListByFieldView,
+    CatalogSuggestView,
     SaveSkillsInterestsView,
     GetMySelectionView,
+    ProfileBootstrapView,
 )
 
 from .youtubevideoviews import (
@@ -22,20 +25,48 @@ from .youtubevideoviews import (
 
 from .classroomviews import (
     ClassroomMeView,
-    ClassroomItemAddView, ClassroomItemListView,
+    ClassroomItemAddView, ClassroomItemListView, ClassroomContinueView,
     ClassroomItemDeleteView, ClassroomItemProgressView,
     ClassroomSetActiveVideoView,
 )
 from .context_views import VideoContextRetrieveView, VideoContextUpsertView
+from .chatviews import ChatHistoryView, ChatInboxView, ChatMarkReadView
+from .chatuploadviews import ChatUploadInitView, ChatUploadChunkView, ChatUploadFinalizeView
+from .profiling import metrics_view
+
+# Same URLs either way; ASYNC_VIEWS swaps in the async_views variants (GET on
+# the event loop, other methods still reach the DRF views below).
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    from .ai_views import transcribe_and_reply_2_async
+
+    auth_status_view = async_views.auth_status
+    github_login_view = github_auth_views.github_login_async
+    ai_reply_view = transcribe_and_reply_2_async
+    video_list_view = async_views.video_list
+    video_detail_view = async_views.video_detail
+    classroom_me_view = async_views.classroom_me
+    classroom_items_view = async_views.classroom_items
+    classroom_continue_view = async_views.classroom_continue
+else:
+    auth_status_view = auth_views.AuthStatusView.as_view()
+    github_login_view = github_auth_views.GitHubCookieLogin.as_view()
+    ai_reply_view = transcribe_and_reply_2
+    video_list_view = CourseVideoListCreateView.as_view()
+    video_detail_view = CourseVideoDetailView.as_view()
+    classroom_me_view = ClassroomMeView.as_view()
+    classroom_items_view = ClassroomItemListView.as_view()
+    classroom_continue_view = ClassroomContinueView.as_view()
 
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path("metrics", metrics_view, name="metrics"),
     # drf jwt auth urls
     path("auth/login/", CookieLoginView.as_view(), name="rest_login"),
     path("auth/logout/", CookieLogoutView.as_view(), name="rest_logout"),
     path("auth/", include("dj_rest_auth.registration.urls")),  # Signup
-    path("auth/status/", auth_views.AuthStatusView.as_view(), name="auth-status"),
+    path("auth/status/", auth_status_view, name="auth-status"),
     path("token/refresh/", auth_views.RefreshTokenView.as_view(), name="token-refresh"),
     path(
         "auth/google/",
@@ -44,13 +75,13 @@ urlpatterns = [
     ),
     path(
         "auth/github/",
-        github_auth_views.GitHubCookieLogin.as_view(),
+        github_login_view,
         name="github-login",
     ),
     # ai
     path(
         "api/transcribe-and-reply-2/",
-        transcribe_and_reply_2,
+        ai_reply_view,
         name="transcribe-and-reply_2",
     ),
     # MVP urls for app logics -----------------------------------------------------------
@@ -105,6 +136,7 @@ urlpatterns = [
         SkillListByFieldView.as_view(),
         name="catalog-skills-by-field",
     ),
+    path("api/catalog/suggest/", CatalogSuggestView.as_view(), name="catalog-suggest"),
     # User selection
     path(
         "api/save-skills-interests/",
@@ -112,17 +144,19 @@ urlpatterns = [
         name="save-skills-interests",
     ),
     path("api/my-selection/", GetMySelectionView.as_view(), name="get-my-selection"),
+    path("api/profile/bootstrap/", ProfileBootstrapView.as_view(), name="profile-bootstrap"),
     # youtube video urls
     path(
         "api/videos/recommended/", RecommendedVideosView.as_view(), name="video-recommended"
     ),
-    path("api/videos/", CourseVideoListCreateView.as_view(), name="video-list-create"),
-    path("api/videos/<slug:slug>/", CourseVideoDetailView.as_view(), name="video-detail"),
+    path("api/videos/", video_list_view, name="video-list-create"),
+    path("api/videos/<slug:slug>/", video_detail_view, name="video-detail"),
     
     # one-classroom-per-user
-    path("api/classroom/", ClassroomMeView.as_view(), name="classroom-me"),
+    path("api/classroom/", classroom_me_view, name="classroom-me"),
     path("api/classroom/items/", ClassroomItemAddView.as_view(), name="classroom-item-add"),
-    path("api/classroom/items/list/", ClassroomItemListView.as_view(), name="classroom-item-list"),
+    path("api/classroom/items/list/", classroom_items_view, name="classroom-item-list"),
+    path("api/classroom/continue/", classroom_continue_view, name="classroom-continue"),
     path("api/classroom/items/<int:item_id>/", ClassroomItemDeleteView.as_view(), name="classroom-item-delete"),
     path("api/classroom/items/<int:item_id>/progress/", ClassroomItemProgressView.as_view(), name="classroom-item-progress"),
     path("api/classroom/set-active/", ClassroomSetActiveVideoView.as_view(), name="classroom-set-active"),
@@ -131,5 +165,13 @@ urlpatterns = [
     path("api/videos/<slug:slug>/context/", VideoContextRetrieveView.as_view(), name="video-context"),
     path("api/videos/<slug:slug>/context/edit/", VideoContextUpsertView.as_view(), name="video-context-upsert"),
 
+    # chat
+    path("api/chat/history/", ChatHistoryView.as_view(), name="chat-history"),
+    path("api/chat/inbox/", ChatInboxView.as_view(), name="chat-inbox"),
+    path("api/chat/read/", ChatMarkReadView.as_view(), name="chat-mark-read"),
+    path("api/chat/uploads/", ChatUploadInitView.as_view(), name="chat-upload-init"),
+    path("api/chat/uploads/<uuid:upload_id>/", ChatUploadChunkView.as_view(), name="chat-upload-chunk"),
+    path("api/chat/uploads/<uuid:upload_id>/finalize/", ChatUploadFinalizeView.as_view(), name="chat-upload-finalize"),
+
     
 ]
@@ -9,6 +9,8 @@ from rest_framework.views import APIView
 from rest_framework import generics, permissions
 from rest_framework.exceptions import NotFound
 from rest_framework.decorators import api_view
+from .sqlite import write
+from .images import set_profile_photo
 
 
 User = get_user_model()
@@ -27,22 +29,37 @@ class UserProfileDetailUpdateView(generics.RetrieveUpdateAPIView):
         except UserProfile.DoesNotExist:
             raise NotFound("Profile not found for the logged-in user.")
 
-@api_view(['PUT'])
+    def perform_update(self, serializer):
+        # photos go through the same pipeline as /update-profile/
+        if "photo" not in serializer.validated_data:
+            serializer.save()
+            return
+        # one save for the other columns and the photo
+        data = serializer.validated_data
+        photo = data.pop("photo")
+        for name, value in data.items():
+            setattr(serializer.instance, name, value)
+        set_profile_photo(serializer.instance, photo, list(data))
+
+@api_view(['PUT', 'PATCH'])
 def update_profile(request):
-    user = request.user
-    profile = user.profile
-
-    # Update all fields except 'user'
-    for field, value in request.data.items():
-        if field == "user":
-            continue
-        if field == "photo" and 'photo' in request.FILES:
-            setattr(profile, field, request.FILES['photo'])
-        elif hasattr(profile, field):
-            setattr(profile, field, value)
-
-    profile.save()
-    return Response({"message": "Profile updated successfully"}, status=status.HTTP_200_OK)
+    """
+    PUT/PATCH /update-profile/ (JSON or multipart) → {"message", "updated": [changed fields],
+    "photo_pending": bool}. Unknown keys are ignored; nothing is written when
+    no value changed; a new photo is saved in the background.
+    """
+    profile, _ = UserProfile.objects.get_or_create(user_id=request.user.pk)
+    serializer = UserProfileUpdateSerializer(profile, data=request.data, partial=True)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return Response(
+        {
+            "message": "Profile updated successfully",
+            "updated": serializer.changed,
+            "photo_pending": serializer.photo_pending,
+        },
+        status=status.HTTP_200_OK,
+    )
 
 # ------------------ List & Send Friend Requests ------------------
 class FriendRequestListCreateAPIView(generics.ListCreateAPIView):
@@ -75,8 +92,8 @@ class FriendRequestListCreateAPIView(generics.ListCreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        friend_request = FriendRequest.objects.create(
-            sender=request.user, receiver=receiver
+        friend_request = write(
+            FriendRequest.objects.create, sender=request.user, receiver=receiver
         )
         return Response(
             FriendRequestSerializer(friend_request).data, status=status.HTTP_201_CREATED
@@ -105,7 +122,7 @@ class FriendRequestRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAP
             )
 
         friend_request.status = status_update
-        friend_request.save()
+        write(friend_request.save)
         return Response(FriendRequestSerializer(friend_request).data)
 
 
@@ -179,7 +196,7 @@ class TeamJoinRequestAPIView(generics.ListCreateAPIView):
         ).exists():
             return Response({"error": "Join request already sent."}, status=400)
 
-        join_request = TeamJoinRequest.objects.create(team=team, user=request.user)
+        join_request = write(TeamJoinRequest.objects.create, team=team, user=request.user)
         return Response(TeamJoinRequestSerializer(join_request).data, status=201)
 
 
@@ -213,7 +230,7 @@ class TeamInvitationAPIView(generics.ListCreateAPIView):
         ).exists():
             return Response({"error": "Invitation already sent."}, status=400)
 
-        invitation = TeamInvitation.objects.create(team=team, invited_user=invited_user)
+        invitation = write(TeamInvitation.objects.create, team=team, invited_user=invited_user)
         return Response(TeamInvitationSerializer(invitation).data, status=201)
 
 
@@ -240,10 +257,10 @@ class TeamInvitationUpdateAPIView(generics.UpdateAPIView):
         if status_update == "accepted":
             if TeamMember.objects.filter(user=request.user).exists():
                 return Response({"error": "You are already in a team."}, status=400)
-            TeamMember.objects.create(team=invitation.team, user=request.user)
+            write(TeamMember.objects.create, team=invitation.team, user=request.user)
 
         invitation.status = status_update
-        invitation.save()
+        write(invitation.save)
         return Response(TeamInvitationSerializer(invitation).data)
 
 
@@ -263,7 +280,7 @@ class LeaveTeamAPIView(generics.DestroyAPIView):
         obj = self.get_object()
         if not obj:
             return Response({"error": "You are not in any team."}, status=400)
-        obj.delete()
+        write(obj.delete)
         return Response({"success": "You have left the team."}, status=204)
 
 
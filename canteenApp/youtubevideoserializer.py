@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from .models import CourseVideo, VideoKeyword
 from .models import Field, Interest2, Skill2
+from .taxonomy import resolve_names
 
 
 class KeywordSerializer(serializers.ModelSerializer):
@@ -108,17 +109,7 @@ class CourseVideoWriteSerializer(serializers.ModelSerializer):
         if skills_ids:
             video.skills.set(Skill2.objects.filter(id__in=skills_ids))
         if keywords:
-            from .models import VideoKeyword
-
-            kw_objs = []
-            for k in keywords:
-                obj, _ = VideoKeyword.objects.get_or_create(
-                    name__iexact=k, defaults={"name": k}
-                )
-                if isinstance(obj, tuple):  # safety if using this pattern elsewhere
-                    obj = VideoKeyword.objects.get(name__iexact=k)
-                kw_objs.append(obj)
-            video.keywords.set(kw_objs)
+            video.keywords.set(resolve_names(VideoKeyword, keywords))
 
         return video
 
@@ -139,14 +130,6 @@ class CourseVideoWriteSerializer(serializers.ModelSerializer):
         if skills_ids is not None:
             instance.skills.set(Skill2.objects.filter(id__in=skills_ids))
         if keywords is not None:
-            kw_objs = []
-            for k in [x.strip() for x in keywords if x.strip()]:
-                obj, _ = VideoKeyword.objects.get_or_create(
-                    name__iexact=k, defaults={"name": k}
-                )
-                if isinstance(obj, tuple):
-                    obj = VideoKeyword.objects.get(name__iexact=k)
-                kw_objs.append(obj)
-            instance.keywords.set(kw_objs)
+            instance.keywords.set(resolve_names(VideoKeyword, keywords))
 
         return instance
@@ -6,12 +6,54 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.db import models
 
-from .models import CourseVideo, VideoKeyword
+from .models import CourseVideo, VideoKeyword, normalize_name
 from .youtubevideoserializer import (
     CourseVideoSerializer,
     CourseVideoWriteSerializer,
 )
 from .models import UserInterest, UserSkill
+from .cache import CATALOG_NAMESPACE, cache_aside, params_key
+from .taxonomy import snapshot
+
+# Everything CourseVideoSerializer touches, so serializing never queries
+# (and can run inside the async views).
+VIDEO_PREFETCH = ("fields", "interests__field", "skills__field", "keywords")
+
+VIDEO_FILTER_PARAMS = ("q", "category", "keyword", "is_published")
+
+
+def video_list_key(params):
+    return f"videos:{params_key(params, VIDEO_FILTER_PARAMS)}"
+
+
+def video_detail_key(slug):
+    return f"video:{slug}"
+
+
+def filter_videos(qs, params, taxonomy=None):
+    """
+    Apply the ?q / category / keyword / is_published list filters. Async
+    callers pass the taxonomy snapshot in (loading it may query).
+    """
+    q = params.get("q")
+    category = params.get("category")
+    keyword = params.get("keyword")
+    published = params.get("is_published")
+
+    if q:
+        qs = qs.filter(Q(title__icontains=q) | Q(description__icontains=q))
+    if category:
+        qs = qs.filter(category__iexact=category)
+    if keyword:
+        # known keyword: filter on the link table alone; unknown: no match
+        taxonomy = taxonomy or snapshot()
+        keyword_id = taxonomy.keyword_by_key.get(normalize_name(keyword))
+        qs = qs.filter(keywords__id=keyword_id) if keyword_id else qs.none()
+    if published in ("true", "false"):
+        qs = qs.filter(is_published=(published == "true"))
+
+    return qs.distinct()
+
 
 # --- CRUD / Catalog ---
 
@@ -24,9 +66,7 @@ class CourseVideoListCreateView(generics.ListCreateAPIView):
       ?q=react&category=Frontend&keyword=hooks&is_published=true
     """
 
-    queryset = CourseVideo.objects.filter(is_published=True).prefetch_related(
-        "fields", "interests", "skills", "keywords"
-    )
+    queryset = CourseVideo.objects.filter(is_published=True).prefetch_related(*VIDEO_PREFETCH)
     permission_classes = [permissions.AllowAny]
 
     def get_serializer_class(self):
@@ -35,28 +75,19 @@ class CourseVideoListCreateView(generics.ListCreateAPIView):
         return CourseVideoSerializer
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        q = self.request.query_params.get("q")
-        category = self.request.query_params.get("category")
-        keyword = self.request.query_params.get("keyword")
-        published = self.request.query_params.get("is_published")
-
-        if q:
-            qs = qs.filter(Q(title_icontains=q) | Q(description_icontains=q))
-        if category:
-            qs = qs.filter(category__iexact=category)
-        if keyword:
-            qs = qs.filter(keywords_name_iexact=keyword)
-        if published in ("true", "false"):
-            qs = qs.filter(is_published=(published == "true"))
+        return filter_videos(super().get_queryset(), self.request.query_params)
 
-        return qs.distinct()
+    def list(self, request, *args, **kwargs):
+        data = cache_aside(
+            CATALOG_NAMESPACE,
+            video_list_key(request.query_params),
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+        )
+        return Response(data)
 
 
 class CourseVideoDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = CourseVideo.objects.all().prefetch_related(
-        "fields", "interests", "skills", "keywords"
-    )
+    queryset = CourseVideo.objects.all().prefetch_related(*VIDEO_PREFETCH)
     lookup_field = "slug"  # or 'pk'
     permission_classes = [permissions.AllowAny]
 
@@ -65,6 +96,14 @@ class CourseVideoDetailView(generics.RetrieveUpdateDestroyAPIView):
             return CourseVideoWriteSerializer
         return CourseVideoSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        data = cache_aside(
+            CATALOG_NAMESPACE,
+            video_detail_key(kwargs[self.lookup_field]),
+            lambda: self.get_serializer(self.get_object()).data,
+        )
+        return Response(data)
+
 
 # --- Recommendations ---
 
@@ -187,24 +226,23 @@ class RecommendedVideosView(APIView):
         q = request.query_params.get("q")
         category = request.query_params.get("category")
 
-        # Pull user's signals
-        interest_names = list(
-            UserInterest.objects.filter(user=user).values_list("interest__name", flat=True)
-        )
-        skill_names = list(
-            UserSkill.objects.filter(user=user).values_list("skill__name", flat=True)
-        )
-        field_ids_from_interests = list(
-            UserInterest.objects.filter(user=user).values_list("interest__field_id", flat=True)
-        )
-        field_ids_from_skills = list(
-            UserSkill.objects.filter(user=user).values_list("skill__field_id", flat=True)
-        )
-        target_field_ids = list(set(field_ids_from_interests) | set(field_ids_from_skills))
-
-        qs = CourseVideo.objects.filter(is_published=True).prefetch_related(
-            "fields", "interests", "skills", "keywords"
-        )
+        # Pull user's signals (ids only; names and fields from the taxonomy snapshot)
+        taxonomy = snapshot()
+        interests = [
+            taxonomy.interests[pk]
+            for pk in UserInterest.objects.filter(user=user).values_list("interest_id", flat=True)
+            if pk in taxonomy.interests
+        ]
+        skills = [
+            taxonomy.skills[pk]
+            for pk in UserSkill.objects.filter(user=user).values_list("skill_id", flat=True)
+            if pk in taxonomy.skills
+        ]
+        interest_keys = [t.name_key for t in interests]
+        skill_keys = [t.name_key for t in skills]
+        target_field_ids = list({t.field_id for t in interests} | {t.field_id for t in skills})
+
+        qs = CourseVideo.objects.filter(is_published=True).prefetch_related(*VIDEO_PREFETCH)
 
         # Optional UI filters
         if q:
@@ -213,24 +251,24 @@ class RecommendedVideosView(APIView):
             qs = qs.filter(category__iexact=category)
 
         # If user has no signals and no text/category filters, short-circuit to empty
-        if not (interest_names or skill_names or target_field_ids):
+        if not (interest_keys or skill_keys or target_field_ids):
             return Response({"count": 0, "results": []})
 
         # Matching condition (correct lookups)
         cond = (
             Q(fields__id__in=target_field_ids) |
-            Q(interests__name__in=interest_names) |
-            Q(skills__name__in=skill_names) |
-            Q(keywords__name__in=(interest_names + skill_names))
+            Q(interests__name_key__in=interest_keys) |
+            Q(skills__name_key__in=skill_keys) |
+            Q(keywords__name_key__in=(interest_keys + skill_keys))
         )
         qs = qs.filter(cond).distinct()
 
         # Score overlaps (use distinct to avoid overcount due to M2M joins)
         qs = qs.annotate(
             field_hits=Count("fields", filter=Q(fields__id__in=target_field_ids), distinct=True),
-            interest_hits=Count("interests", filter=Q(interests__name__in=interest_names), distinct=True),
-            skill_hits=Count("skills", filter=Q(skills__name__in=skill_names), distinct=True),
-            keyword_hits=Count("keywords", filter=Q(keywords__name__in=(interest_names + skill_names)), distinct=True),
+            interest_hits=Count("interests", filter=Q(interests__name_key__in=interest_keys), distinct=True),
+            skill_hits=Count("skills", filter=Q(skills__name_key__in=skill_keys), distinct=True),
+            keyword_hits=Count("keywords", filter=Q(keywords__name_key__in=(interest_keys + skill_keys)), distinct=True),
         ).annotate(
             score=Coalesce(F("field_hits"), 0)
                 + Coalesce(F("interest_hits"), 0)